@@ -10,9 +10,14 @@ specific locations in uploaded documents.
 """
 
 import asyncio
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.config import settings
 from app.database import create_tables, async_session
@@ -23,7 +28,31 @@ from app.routers import (
     voice_router,
     profiles_router
 )
-from app.services.rag_service import scan_documents_folder
+from app.services.auth_service import start_hash_pool, shutdown_hash_pool
+from app.services.llm_service import close_mistral_client
+from app.services.rag_service import (
+    purge_deleted_documents,
+    scan_documents_folder,
+    shutdown_extraction_pool,
+    start_extraction_pool,
+    warm_up
+)
+
+# Configure application logging (uvicorn configures its own loggers)
+# Records go through a queue to a listener thread that does the actual
+# writing, so logging from a request never blocks on stdout
+# (records are formatted before queueing, so the listener writes them as-is)
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Flush queued records on exit
+
+# The level is set from LOG_LEVEL at startup (see lifespan), so
+# importing this module doesn't load the settings
+logging.basicConfig(
+    format="%(levelname)s:     %(name)s - %(message)s",
+    handlers=[QueueHandler(_log_queue)]
+)
 
 
 @asynccontextmanager
@@ -32,8 +61,10 @@ async def lifespan(app: FastAPI):
     Application lifespan manager.
     
     Handles startup and shutdown tasks:
-    - Startup: Create database tables, scan documents folder (in background)
-    - Shutdown: Clean up resources
+    - Startup: Start the password hashing and PDF extraction process
+      pools, then load embedding model, create database tables, scan
+      documents folder (in background)
+    - Shutdown: Clean up resources (process pools, Mistral HTTP client)
     
     Args:
         app (FastAPI): The FastAPI application instance
@@ -44,15 +75,44 @@ async def lifespan(app: FastAPI):
     # Startup - run ALL initialization in background to allow fast port binding
     print("🚀 Starting Learning Bot...")
     
+    logging.getLogger().setLevel(settings.LOG_LEVEL.upper())
+    
+    # Password hashing runs in its own processes so logins use every core
+    start_hash_pool()
+    
+    # Long PDFs are split across worker processes as well
+    start_extraction_pool()
+    
     async def _initialize_background() -> None:
-        """Initialize database and scan documents in background."""
-        # Create database tables
+        """Warm up RAG, initialize database, purge and scan documents in background."""
+        # Load the embedding model and ChromaDB in a worker thread,
+        # in parallel with table creation
+        print("🧠 Loading embedding model...")
+        warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up))
+        
+        # Create database tables (production uses Alembic migrations)
+        if settings.ENVIRONMENT != "production":
+            try:
+                print("📊 Creating database tables...")
+                await create_tables()
+                print("✅ Database tables created")
+            except Exception as e:
+                print(f"⚠️ Database setup warning: {e}")
+        
         try:
-            print("📊 Creating database tables...")
-            await create_tables()
-            print("✅ Database tables created")
+            await warm_up_task
+            print("✅ Embedding model loaded")
         except Exception as e:
-            print(f"⚠️ Database setup warning: {e}")
+            print(f"⚠️ Embedding model warning: {e}")
+        
+        # Finish any document deletes that were interrupted
+        try:
+            async with async_session() as db:
+                purged = await purge_deleted_documents(db)
+                if purged:
+                    print(f"🗑️ Purged {purged} deleted documents")
+        except Exception as e:
+            print(f"⚠️ Document purge warning: {e}")
         
         # Scan documents folder
         try:
@@ -68,7 +128,9 @@ async def lifespan(app: FastAPI):
         print("✅ Background initialization complete!")
 
     # Run initialization in background - don't wait for it
-    asyncio.create_task(_initialize_background())
+    # Keep a reference on app.state so the task isn't garbage collected
+    # and can be cancelled on shutdown
+    app.state.init_task = asyncio.create_task(_initialize_background())
     
     print("✅ Learning Bot ready! (background tasks starting...)")
     
@@ -76,6 +138,18 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("👋 Shutting down Learning Bot...")
+    
+    # Stop the document scan if it's still running
+    init_task = app.state.init_task
+    if not init_task.done():
+        init_task.cancel()
+    await asyncio.gather(init_task, return_exceptions=True)
+    
+    shutdown_hash_pool()
+    shutdown_extraction_pool()
+    
+    # Close pooled connections to the Mistral API
+    await close_mistral_client()
 
 
 # Create FastAPI application
@@ -100,6 +174,7 @@ app = FastAPI(
     """,
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # Fast C-based JSON encoding
     docs_url="/api/docs",      # Swagger UI
     redoc_url="/api/redoc",    # ReDoc
     openapi_url="/api/openapi.json"
@@ -107,16 +182,18 @@ app = FastAPI(
 
 # Configure CORS (Cross-Origin Resource Sharing)
 # This allows the React frontend to communicate with the API
+# dict.fromkeys removes duplicates (FRONTEND_URL is often the Vite default)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
+    allow_origins=list(dict.fromkeys([
         settings.FRONTEND_URL,      # React dev server
         "http://localhost:5173",    # Vite default
         "http://localhost:3000",    # CRA default
-    ],
+    ])),
     allow_credentials=True,
-    allow_methods=["*"],  # Allow all HTTP methods
-    allow_headers=["*"],  # Allow all headers
+    allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
+    allow_headers=["Authorization", "Content-Type", "X-Requested-With"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
 # Include routers
@@ -1,8 +1,28 @@
-"""Database Models Package"""
+"""
+Database Models Package
 
-from app.models.user import User, ChatProfile
-from app.models.chat import Conversation, Message, TrainingQuestion
-from app.models.document import Document, DocumentChunk
+Models are loaded lazily: `from app.models import Document` only imports
+app.models.document, not the whole ORM graph.
+
+Note:
+    Relationships refer to other models by name, so every model module must
+    be imported before the first query. The app does this on startup (via the
+    routers) and create_tables()/Alembic do it with load_all_models().
+"""
+
+import importlib
+
+# Model name -> module that defines it
+_LAZY = {
+    "User": "app.models.user",
+    "ChatProfile": "app.models.user",
+    "Conversation": "app.models.chat",
+    "Message": "app.models.chat",
+    "MessageFeedback": "app.models.chat",
+    "TrainingQuestion": "app.models.chat",
+    "Document": "app.models.document",
+    "DocumentChunk": "app.models.document",
+}
 
 __all__ = [
     "User",
@@ -13,3 +33,30 @@ __all__ = [
     "Document",
     "DocumentChunk",
 ]
+
+
+def __getattr__(name: str):
+    """
+    Import a model's module on first access (PEP 562).
+    
+    The result is cached in the package globals, so later lookups
+    don't go through this function again.
+    """
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    module = importlib.import_module(_LAZY[name])
+    obj = getattr(module, name)
+    globals()[name] = obj
+    return obj
+
+
+def load_all_models() -> None:
+    """
+    Import every model module so all tables are registered on Base.metadata.
+    
+    Call this before create_all, Alembic autogenerate, or any standalone
+    script that queries models with relationships.
+    """
+    for module_name in set(_LAZY.values()):
+        importlib.import_module(module_name)
@@ -10,11 +10,17 @@ Tables:
     - training_questions: Anonymized questions for future training
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float
-from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, List, Optional
+
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index, JSON, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
+if TYPE_CHECKING:
+    from app.models.user import User
+
 
 class Conversation(Base):
     """
@@ -35,34 +41,39 @@ class Conversation(Base):
         messages: All messages in this conversation
     """
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Sidebar query: a user's conversations, most recently updated first
+        Index("ix_conv_user_updated", "user_id", "updated_at"),
+    )
     
     # Primary key
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
     # Foreign key to users
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     
     # Conversation metadata
-    title = Column(String(255), default="New Conversation")
+    title: Mapped[Optional[str]] = mapped_column(String(255), default="New Conversation")
     
     # Timestamps
-    created_at = Column(
+    created_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc)
+        server_default=func.now()
     )
-    updated_at = Column(
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc)
+        server_default=func.now(),
+        onupdate=func.now()
     )
     
     # Relationships
-    user = relationship("User", back_populates="conversations")
-    messages = relationship(
-        "Message",
+    user: Mapped["User"] = relationship(back_populates="conversations")
+    messages: Mapped[List["Message"]] = relationship(
         back_populates="conversation",
         cascade="all, delete-orphan",
-        order_by="Message.created_at"
+        passive_deletes=True,  # The database cascades deletes (ON DELETE CASCADE)
+        # id breaks ties: messages saved in one transaction share created_at
+        order_by="(Message.created_at, Message.id)"
     )
 
 
@@ -79,7 +90,7 @@ class Message(Base):
         role (str): 'user' or 'assistant'
         content (str): The message text
         is_voice (bool): Whether message was sent via voice
-        source_references (str): JSON string of document references
+        source_references (list): Document references (native JSON)
         avg_relevance_score (float): Average relevance score from RAG search
         created_at (datetime): Message timestamp
         
@@ -88,45 +99,51 @@ class Message(Base):
         feedback: User feedback on this message (if assistant)
     """
     __tablename__ = "messages"
+    __table_args__ = (
+        # History query: a conversation's messages in chronological order
+        Index("ix_messages_conv_created", "conversation_id", "created_at"),
+    )
     
     # Primary key
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
     # Foreign key to conversations
-    conversation_id = Column(
-        Integer,
-        ForeignKey("conversations.id"),
-        nullable=False
+    # ON DELETE CASCADE lets a conversation be deleted with one statement
+    conversation_id: Mapped[int] = mapped_column(
+        ForeignKey("conversations.id", ondelete="CASCADE")
     )
     
     # Message content
-    role = Column(String(20), nullable=False)  # 'user' or 'assistant'
-    content = Column(Text, nullable=False)
+    role: Mapped[str] = mapped_column(String(20))  # 'user' or 'assistant'
+    content: Mapped[str] = mapped_column(Text)
     
     # Voice indicator
-    is_voice = Column(Boolean, default=False)
+    is_voice: Mapped[Optional[bool]] = mapped_column(default=False)
     
-    # Document references (stored as JSON string)
-    # Example: '[{"document": "Physics 101", "page": 42, "chapter": "Forces"}]'
-    source_references = Column(Text, nullable=True)
+    # Document references (native JSON - JSONB on PostgreSQL)
+    # Example: [{"document_title": "Physics 101", "page_number": 42, "chapter": "Forces"}]
+    source_references: Mapped[Optional[List[dict[str, Any]]]] = mapped_column(
+        JSON().with_variant(JSONB, "postgresql")
+    )
     
     # Average relevance score from RAG search (0.0 - 1.0)
     # Helps track how well the bot found relevant content
-    avg_relevance_score = Column(Float, nullable=True)
+    avg_relevance_score: Mapped[Optional[float]]
     
     # Timestamp
-    created_at = Column(
+    created_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc)
+        server_default=func.now()
     )
     
     # Relationships
-    conversation = relationship("Conversation", back_populates="messages")
-    feedback = relationship(
-        "MessageFeedback",
+    conversation: Mapped["Conversation"] = relationship(back_populates="messages")
+    feedback: Mapped[Optional["MessageFeedback"]] = relationship(
         back_populates="message",
         uselist=False,  # One-to-one relationship
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="joined"  # At most one row, fetched with the message in one query
     )
 
 
@@ -149,27 +166,25 @@ class MessageFeedback(Base):
     __tablename__ = "message_feedback"
     
     # Primary key
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
     # Foreign key to messages (one-to-one)
-    message_id = Column(
-        Integer,
-        ForeignKey("messages.id"),
-        nullable=False,
+    message_id: Mapped[int] = mapped_column(
+        ForeignKey("messages.id", ondelete="CASCADE"),
         unique=True  # Each message can only have one feedback
     )
     
     # Feedback value
-    is_helpful = Column(Boolean, nullable=False)  # True = thumbs up, False = thumbs down
+    is_helpful: Mapped[bool]  # True = thumbs up, False = thumbs down
     
     # Timestamp
-    created_at = Column(
+    created_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc)
+        server_default=func.now()
     )
     
     # Relationships
-    message = relationship("Message", back_populates="feedback")
+    message: Mapped["Message"] = relationship(back_populates="feedback")
 
 
 class TrainingQuestion(Base):
@@ -194,20 +209,20 @@ class TrainingQuestion(Base):
     __tablename__ = "training_questions"
     
     # Primary key
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
     # Question content (NO user_id - intentionally anonymized)
-    question_text = Column(Text, nullable=False)
+    question_text: Mapped[str] = mapped_column(Text)
     
     # Metadata for training categorization
-    topic_category = Column(String(100), nullable=True)
-    difficulty_inferred = Column(String(20), nullable=True)
+    topic_category: Mapped[Optional[str]] = mapped_column(String(100))
+    difficulty_inferred: Mapped[Optional[str]] = mapped_column(String(20))
     
     # Feedback (optional, user can rate if response was helpful)
-    was_helpful = Column(Boolean, nullable=True)
+    was_helpful: Mapped[Optional[bool]]
     
     # Timestamp
-    created_at = Column(
+    created_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc)
+        server_default=func.now()
     )
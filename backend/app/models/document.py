@@ -9,9 +9,11 @@ Tables:
     - document_chunks: Text chunks for vector search
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
 
@@ -29,7 +31,10 @@ class Document(Base):
         author (str): Document author if available
         file_type (str): File extension (pdf, txt, epub)
         file_path (str): Path to stored file
+        content_sha256 (str): SHA-256 of the file contents (for de-duplication)
         total_pages (int): Number of pages/sections
+        chunk_count (int): Number of RAG chunks (kept in sync at ingest)
+        status (str): Lifecycle state (processing, ready, failed, deleting)
         upload_date (datetime): When document was uploaded
         
     Relationships:
@@ -38,26 +43,42 @@ class Document(Base):
     __tablename__ = "documents"
     
     # Primary key
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
     # File information
-    filename = Column(String(255), nullable=False)
-    title = Column(String(255), nullable=True)
-    author = Column(String(255), nullable=True)
-    file_type = Column(String(20), nullable=False)  # pdf, txt, epub
-    file_path = Column(String(500), nullable=False)
+    filename: Mapped[str] = mapped_column(String(255))
+    title: Mapped[Optional[str]] = mapped_column(String(255))
+    author: Mapped[Optional[str]] = mapped_column(String(255))
+    file_type: Mapped[str] = mapped_column(String(20))  # pdf, txt, epub
+    file_path: Mapped[str] = mapped_column(String(500))
+    
+    # Hex SHA-256 of the file, so re-uploads of the same file are detected
+    # (NULL for documents added before hashing existed)
+    content_sha256: Mapped[Optional[str]] = mapped_column(String(64), unique=True, index=True)
     
     # Document metadata
-    total_pages = Column(Integer, nullable=True)
+    total_pages: Mapped[Optional[int]]
+    
+    # Stored rather than counted from document_chunks on every listing
+    chunk_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    
+    # RAG processing state: "processing" while chunks are being embedded,
+    # then "ready" (or "failed"). "deleting" marks a deleted document whose
+    # embeddings and rows haven't been purged yet
+    status: Mapped[str] = mapped_column(
+        String(20),
+        default="ready",
+        server_default="ready"
+    )
     
     # Timestamps
-    upload_date = Column(
+    upload_date: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc)
+        server_default=func.now()
     )
     
     # Relationships
-    chunks = relationship(
+    chunks: Mapped[List["DocumentChunk"]] = relationship(
         "DocumentChunk",
         back_populates="document",
         cascade="all, delete-orphan"
@@ -90,25 +111,29 @@ class DocumentChunk(Base):
         We only store the embedding_id to link back to ChromaDB.
     """
     __tablename__ = "document_chunks"
+    __table_args__ = (
+        # Chunk lookups for a document, in reading order
+        Index("ix_chunks_doc_order", "document_id", "chunk_index"),
+    )
     
     # Primary key
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
     # Foreign key to documents
-    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id"))
     
     # Chunk position and content
-    chunk_index = Column(Integer, nullable=False)  # Order in document
-    content = Column(Text, nullable=False)  # The actual text
+    chunk_index: Mapped[int]  # Order in document
+    content: Mapped[str] = mapped_column(Text)  # The actual text
     
     # Location information (crucial for guiding users!)
-    page_number = Column(Integer, nullable=True)
-    chapter = Column(String(255), nullable=True)
-    section = Column(String(255), nullable=True)
+    page_number: Mapped[Optional[int]]
+    chapter: Mapped[Optional[str]] = mapped_column(String(255))
+    section: Mapped[Optional[str]] = mapped_column(String(255))
     
     # Link to vector database
     # This ID is used to find the embedding in ChromaDB
-    embedding_id = Column(String(100), unique=True, nullable=True)
+    embedding_id: Mapped[Optional[str]] = mapped_column(String(100), unique=True, index=True)
     
     # Relationships
-    document = relationship("Document", back_populates="chunks")
+    document: Mapped["Document"] = relationship(back_populates="chunks")
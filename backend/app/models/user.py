@@ -9,11 +9,16 @@ Tables:
     - chat_profiles: User's chat preferences/personas
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
-from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional
+
+from sqlalchemy import String, DateTime, ForeignKey, Index, Text, func, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
+if TYPE_CHECKING:
+    from app.models.chat import Conversation
+
 
 class User(Base):
     """
@@ -38,43 +43,55 @@ class User(Base):
     __tablename__ = "users"
     
     # Primary key
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
     # Login credentials
-    email = Column(String(255), unique=True, index=True, nullable=False)
-    username = Column(String(100), unique=True, index=True, nullable=False)
-    hashed_password = Column(String(255), nullable=False)
+    email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    username: Mapped[str] = mapped_column(String(100), unique=True, index=True)
+    hashed_password: Mapped[str] = mapped_column(String(255))
     
     # Account status
-    is_active = Column(Boolean, default=True)
+    is_active: Mapped[Optional[bool]] = mapped_column(default=True)
     
     # Timestamps
-    created_at = Column(
+    created_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc)
+        server_default=func.now()
     )
-    updated_at = Column(
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc)
+        server_default=func.now(),
+        onupdate=func.now()
     )
     
     # Relationships
     # One user can have many chat profiles
-    chat_profiles = relationship(
+    chat_profiles: Mapped[List["ChatProfile"]] = relationship(
         "ChatProfile",
         back_populates="user",
         cascade="all, delete-orphan"
     )
     
     # One user can have many conversations
-    conversations = relationship(
+    conversations: Mapped[List["Conversation"]] = relationship(
         "Conversation",
         back_populates="user",
         cascade="all, delete-orphan"
     )
 
 
+# Case-insensitive email lookups and uniqueness (login, registration and
+# get_current_user). On PostgreSQL it carries the other columns
+# get_current_user reads, so that lookup never touches the table.
+# Defined after the class because it indexes an expression on User.email
+Index(
+    "ix_users_email_lower",
+    func.lower(User.email),
+    unique=True,
+    postgresql_include=["id", "username", "is_active"]
+)
+
+
 class ChatProfile(Base):
     """
     Chat Profile model for personalized chat experiences.
@@ -96,38 +113,50 @@ class ChatProfile(Base):
         user: The user who owns this profile
     """
     __tablename__ = "chat_profiles"
+    __table_args__ = (
+        # Profile list: a user's profiles, newest first
+        Index("ix_chat_profiles_user_created", "user_id", "created_at"),
+        # Finding (and clearing) a user's default profile; partial, so it
+        # only holds the one default row per user
+        Index(
+            "ix_chat_profiles_user_default",
+            "user_id",
+            postgresql_where=text("is_default"),
+            sqlite_where=text("is_default"),
+        ),
+    )
     
     # Primary key
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
     # Foreign key to users
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     
     # Profile details
-    name = Column(String(100), nullable=False)
-    description = Column(Text, nullable=True)
+    name: Mapped[str] = mapped_column(String(100))
+    description: Mapped[Optional[str]] = mapped_column(Text)
     
     # Learning preferences
     # Defines how the bot should guide the user
-    learning_style = Column(
+    learning_style: Mapped[Optional[str]] = mapped_column(
         String(50),
         default="guided"  # Options: guided, socratic, exploratory
     )
     
     # Difficulty affects how much detail is given in hints
-    difficulty_level = Column(
+    difficulty_level: Mapped[Optional[str]] = mapped_column(
         String(20),
         default="intermediate"  # Options: beginner, intermediate, advanced
     )
     
     # Only one profile can be default per user
-    is_default = Column(Boolean, default=False)
+    is_default: Mapped[Optional[bool]] = mapped_column(default=False)
     
     # Timestamps
-    created_at = Column(
+    created_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc)
+        server_default=func.now()
     )
     
     # Relationships
-    user = relationship("User", back_populates="chat_profiles")
+    user: Mapped["User"] = relationship(back_populates="chat_profiles")
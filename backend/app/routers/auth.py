@@ -13,8 +13,8 @@ All passwords are hashed before storage. JWT tokens are used for auth.
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import datetime, timezone
+from sqlalchemy import select, func, or_
+from typing import Optional
 
 from app.database import get_db
 from app.models.user import User
@@ -25,7 +25,9 @@ from app.services.auth_service import (
     get_password_hash,
     verify_password,
     create_access_token,
-    get_current_user
+    get_current_user,
+    invalidate_cached_user,
+    AuthenticatedUser
 )
 
 # Create router with prefix and tags for API docs
@@ -38,6 +40,51 @@ router = APIRouter(
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
+async def ensure_email_username_available(
+    db: AsyncSession,
+    email: Optional[str] = None,
+    username: Optional[str] = None
+) -> None:
+    """
+    Check that an email and/or username aren't used by another account.
+    
+    Both values are checked in a single query instead of one per field.
+    
+    Args:
+        db (AsyncSession): Database session
+        email (str): Email to check (skipped if None)
+        username (str): Username to check (skipped if None)
+    
+    Raises:
+        HTTPException 400: If the email or username is already taken
+    """
+    conditions = []
+    if email:
+        # Emails are compared case-insensitively (ix_users_email_lower)
+        conditions.append(func.lower(User.email) == email.lower())
+    if username:
+        conditions.append(User.username == username)
+    if not conditions:
+        return
+    
+    result = await db.execute(
+        select(User.email, User.username).where(or_(*conditions))
+    )
+    rows = result.all()
+    
+    # Report email conflicts first, matching the order of the form fields
+    if email and any(row.email.lower() == email.lower() for row in rows):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    if username and any(row.username == username for row in rows):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already taken"
+        )
+
+
 @router.post(
     "/register",
     response_model=UserResponse,
@@ -73,31 +120,18 @@ async def register(
             "password": "securepassword"
         }
     """
-    # Check if email already exists
-    existing_email = await db.execute(
-        select(User).where(User.email == user_data.email)
-    )
-    if existing_email.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Check if username already exists
-    existing_username = await db.execute(
-        select(User).where(User.username == user_data.username)
+    # Check if email or username already exists
+    await ensure_email_username_available(
+        db,
+        email=user_data.email,
+        username=user_data.username
     )
-    if existing_username.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken"
-        )
     
     # Create new user with hashed password
     new_user = User(
         email=user_data.email,
         username=user_data.username,
-        hashed_password=get_password_hash(password=user_data.password)
+        hashed_password=await get_password_hash(password=user_data.password)
     )
     
     # Save to database
@@ -145,13 +179,14 @@ async def login(
         username=student@example.com&password=securepassword
     """
     # Find user by email (OAuth2 form uses 'username' field)
+    # Case-insensitive match, served by the lower(email) index
     result = await db.execute(
-        select(User).where(User.email == form_data.username)
+        select(User).where(func.lower(User.email) == form_data.username.lower())
     )
-    user = result.scalar_one_or_none()
+    user = result.scalars().first()
     
     # Verify user exists and password is correct
-    if not user or not verify_password(
+    if not user or not await verify_password(
         plain_password=form_data.password,
         hashed_password=user.hashed_password
     ):
@@ -183,13 +218,15 @@ async def login(
     description="Get the currently authenticated user's information."
 )
 async def get_me(
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get current authenticated user's information.
     
     Args:
-        current_user (User): Current user (extracted from JWT token)
+        current_user (AuthenticatedUser): Current user (extracted from JWT token)
+        db (AsyncSession): Database session
     
     Returns:
         UserResponse: User data (without password)
@@ -201,7 +238,8 @@ async def get_me(
         GET /api/auth/me
         Authorization: Bearer <your_jwt_token>
     """
-    return current_user
+    # The response includes created_at, so load the full row
+    return await db.get(User, current_user.id)
 
 
 @router.put(
@@ -212,7 +250,7 @@ async def get_me(
 )
 async def update_me(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -222,7 +260,7 @@ async def update_me(
         user_update (UserUpdate): Fields to update (all optional):
             - username: New display name
             - email: New email address
-        current_user (User): Current user (from JWT)
+        current_user (AuthenticatedUser): Current user (from JWT)
         db (AsyncSession): Database session
     
     Returns:
@@ -238,35 +276,32 @@ async def update_me(
             "username": "new_username"
         }
     """
-    # Check if new email is already taken (if provided)
-    if user_update.email and user_update.email != current_user.email:
-        existing = await db.execute(
-            select(User).where(User.email == user_update.email)
-        )
-        if existing.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        current_user.email = user_update.email
-    
-    # Check if new username is already taken (if provided)
-    if user_update.username and user_update.username != current_user.username:
-        existing = await db.execute(
-            select(User).where(User.username == user_update.username)
-        )
-        if existing.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
-        current_user.username = user_update.username
+    # Only check the fields that are actually changing
+    new_email = (
+        user_update.email
+        if user_update.email and user_update.email.lower() != current_user.email.lower()
+        else None
+    )
+    new_username = user_update.username if user_update.username != current_user.username else None
     
-    # Update timestamp
-    current_user.updated_at = datetime.now(timezone.utc)
+    # Check if new email/username is already taken (if provided)
+    await ensure_email_username_available(
+        db,
+        email=new_email,
+        username=new_username
+    )
     
-    # Save changes
+    user = await db.get(User, current_user.id)
+    if new_email:
+        user.email = new_email
+    if new_username:
+        user.username = new_username
+    
+    # Save changes (updated_at is set by the database via onupdate=func.now())
     await db.commit()
-    await db.refresh(current_user)
+    await db.refresh(user)
+    
+    # Don't let cached copies keep serving the old email/username
+    invalidate_cached_user(user.id)
     
-    return current_user
+    return user
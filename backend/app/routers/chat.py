@@ -10,24 +10,41 @@ The key feature: Bot provides hints and tells WHERE to find answers,
 not the answers themselves.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List
+from sqlalchemy import select, delete, update, func, lambda_stmt
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload
+from typing import Awaitable, Dict, List, Optional, Set, Tuple, TypeVar
 
-from app.database import get_db
-from app.models.user import User
+from app.database import get_db, async_session
 from app.models.chat import Conversation, Message, TrainingQuestion, MessageFeedback
 from app.schemas.chat import (
     ChatRequest, ChatResponse,
     ConversationCreate, ConversationResponse, ConversationListResponse,
-    MessageResponse, FeedbackRequest, FeedbackResponse, SourceReference
+    FeedbackRequest, FeedbackBatchRequest, FeedbackResponse,
+    SourceReference, ImageData
 )
-from app.services.auth_service import get_current_user
-from app.services.llm_service import generate_learning_response
-from app.services.rag_service import search_documents
+from app.schemas.document import SearchResult
+from app.services.auth_service import get_current_user, AuthenticatedUser
+from app.services.llm_service import (
+    generate_learning_response,
+    stream_learning_response,
+    get_profile_settings,
+    extract_topic_hint,
+    build_suggested_reading
+)
+from app.services.rag_service import search_documents, filter_ready_results
+from app.config import settings
+from app.utils.cache import TTLCache
+
+import asyncio
+import logging
+import orjson
 
-import json
+logger = logging.getLogger(__name__)
 
 # Create router
 router = APIRouter(
@@ -35,74 +52,125 @@ router = APIRouter(
     tags=["Chat"]
 )
 
-
-@router.post(
-    "/send",
-    response_model=ChatResponse,
-    summary="Send a message and get learning guidance",
-    description="Send a question and receive hints about where to find the answer."
+# Serialized conversation lists per user, so sidebar refreshes skip the
+# query and the JSON encoding. Per process; cleared whenever the user's
+# conversations change, with the TTL as a safety net.
+CONVERSATION_LIST_TTL_SECONDS = 300
+CONVERSATION_LIST_CACHE_MAX_SIZE = 10000
+_conversation_list_cache = TTLCache(
+    ttl_seconds=CONVERSATION_LIST_TTL_SECONDS,
+    max_size=CONVERSATION_LIST_CACHE_MAX_SIZE
 )
-async def send_message(
+
+# Bumped on every invalidation, so a list query that raced with a write
+# doesn't put its (possibly stale) result back into the cache
+_conversation_list_generation: Dict[int, int] = {}
+
+
+def invalidate_conversation_list(user_id: int) -> None:
+    """
+    Drop a user's cached conversation list.
+    
+    Call after committing anything that changes the list: a new
+    conversation, new messages (count and updated_at) or a deletion.
+    
+    Args:
+        user_id (int): Owner of the conversations
+    """
+    _conversation_list_cache.pop(user_id)
+    _conversation_list_generation[user_id] = (
+        _conversation_list_generation.get(user_id, 0) + 1
+    )
+
+
+# Saves started by run_shielded (strong references, so the event loop
+# doesn't drop a running task)
+_shielded_tasks: Set[asyncio.Task] = set()
+
+T = TypeVar("T")
+
+
+async def run_shielded(awaitable: Awaitable[T]) -> T:
+    """
+    Run database work that must finish even if the request is cancelled.
+    
+    The work runs as its own task; if the caller is cancelled (e.g. the
+    client closed a stream), the caller stops waiting but the task still
+    completes.
+    
+    Args:
+        awaitable (Awaitable): The work to run (e.g. a coroutine)
+    
+    Returns:
+        The work's result
+    """
+    task = asyncio.ensure_future(awaitable)
+    _shielded_tasks.add(task)
+    task.add_done_callback(_shielded_tasks.discard)
+    return await asyncio.shield(task)
+
+
+def format_sse(data: bytes, event: Optional[str] = None) -> bytes:
+    """
+    Format one Server-Sent Events frame.
+    
+    Args:
+        data (bytes): JSON payload for the frame
+        event (str): Optional event name (clients default to "message")
+    
+    Returns:
+        bytes: The encoded frame, terminated by a blank line
+    """
+    frame = b"data: " + data + b"\n\n"
+    if event:
+        frame = f"event: {event}\n".encode() + frame
+    return frame
+
+
+async def prepare_chat_context(
     request: ChatRequest,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-) -> ChatResponse:
+    current_user: AuthenticatedUser,
+    db: AsyncSession
+) -> Tuple[int, List[Dict[str, str]], List[SearchResult], List[ImageData], Tuple[str, str]]:
     """
-    Send a message and receive learning guidance.
+    Resolve the conversation and gather everything the LLM needs.
     
-    IMPORTANT: This bot doesn't give direct answers!
-    Instead, it provides:
-    - Brief topic hints
-    - References to where the answer can be found (book, page, chapter)
-    - Suggested reading materials
+    Shared by send_message and send_message_stream. Creates the
+    conversation if needed (flushed, not committed), loads the recent
+    history and the chat profile settings and runs the document search.
+    The settings are looked up here once per turn and passed on to the
+    LLM service.
     
     Args:
-        request (ChatRequest): Chat request containing:
-            - message: The user's question
-            - conversation_id: Optional existing conversation ID
-            - profile_id: Optional chat profile for personalization
-            - is_voice: Whether this was a voice input
-        current_user (User): Authenticated user
+        request (ChatRequest): The incoming chat request
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Returns:
-        ChatResponse: Bot's response with:
-            - message: Guiding response text
-            - conversation_id: The conversation ID
-            - source_references: Where to find the answer
-            - topic_hint: Brief description of the topic
-            - suggested_reading: What to study
+        Tuple containing:
+            - conversation_id: Existing or newly created conversation ID
+            - conversation_history: Recent messages, oldest first
+            - search_results: RAG search results for the question
+            - images: Image payloads for the LLM (may be empty)
+            - profile_settings: (learning_style, difficulty_level)
     
-    Example:
-        POST /api/chat/send
-        {
-            "message": "What is photosynthesis?",
-            "conversation_id": null
-        }
-        
-        Response:
-        {
-            "message": "Great question about plant biology! This topic 
-                       involves how plants convert light into energy...",
-            "source_references": [
-                {"document_title": "Biology 101", "page_number": 45, 
-                 "chapter": "Chapter 3: Plant Cells"}
-            ],
-            "topic_hint": "Plant energy conversion process",
-            "suggested_reading": "Review Chapter 3 of Biology 101"
-        }
+    Raises:
+        HTTPException 404: If the conversation doesn't belong to the user
     """
     # Get or create conversation
     if request.conversation_id:
         # Verify conversation belongs to user
+        # Only the ID is needed, so don't load the whole row
+        requested_id = request.conversation_id
+        user_id = current_user.id
         result = await db.execute(
-            select(Conversation).where(
-                Conversation.id == request.conversation_id,
-                Conversation.user_id == current_user.id
-            )
+            lambda_stmt(lambda: select(Conversation.id).where(
+                Conversation.id == requested_id,
+                Conversation.user_id == user_id
+            ))
         )
-        conversation = result.scalar_one_or_none()
-        if not conversation:
+        conversation_id = result.scalar_one_or_none()
+        if conversation_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Conversation not found"
@@ -122,107 +190,419 @@ async def send_message(
         )
         db.add(conversation)
         await db.flush()  # Get ID without committing
-    
-    # Save user's message (content can be empty if only images)
-    user_message = Message(
-        conversation_id=conversation.id,
-        role="user",
-        content=request.message or "[Image]",
-        is_voice=request.is_voice
+        conversation_id = conversation.id
+    
+    # Get conversation history for context
+    # The current user message isn't added yet, so it's naturally excluded
+    # Only the most recent MAX_HISTORY_MESSAGES are loaded (newest first,
+    # reversed below) so long conversations don't grow the prompt forever
+    # lambda_stmt caches the built statement, so repeat calls only bind
+    # new parameter values instead of rebuilding and re-keying the select
+    history_limit = settings.MAX_HISTORY_MESSAGES
+    history_query = lambda_stmt(
+        lambda: select(Message.role, Message.content)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(history_limit)
     )
-    db.add(user_message)
-    await db.flush()  # Ensure message is in session for history query
     
-    # Get conversation history for context (EXCLUDING the current user message we just added)
-    history_result = await db.execute(
-        select(Message)
-        .where(
-            Message.conversation_id == conversation.id,
-            Message.id != user_message.id  # Exclude the message we just added
+    async def load_history_and_profile():
+        history_result = await db.execute(history_query)
+        profile_settings = await get_profile_settings(
+            db=db,
+            user_id=current_user.id,
+            profile_id=request.profile_id
         )
-        .order_by(Message.created_at)
-    )
-    previous_messages = history_result.scalars().all()
+        return history_result, profile_settings
+    
+    # Search documents for relevant content (RAG) - only if text message
+    # The search doesn't touch the session, so it can run alongside the
+    # history and profile queries instead of after them
+    if request.message:
+        (history_result, profile_settings), search_results = await asyncio.gather(
+            load_history_and_profile(),
+            search_documents(query=request.message)
+        )
+        # Back on the session now that the other queries are done
+        search_results = await filter_ready_results(db, search_results)
+    else:
+        history_result, profile_settings = await load_history_and_profile()
+        search_results = []
+    previous_messages = history_result.all()
     
-    # Format history for LLM
+    # Format history for LLM (back in chronological order)
     conversation_history = [
         {"role": msg.role, "content": msg.content}
-        for msg in previous_messages
+        for msg in reversed(previous_messages)
     ]
     
-    print(f"📜 Retrieved {len(conversation_history)} messages from conversation {conversation.id}")
+    # Lazy %-formatting: nothing is built unless DEBUG logging is enabled
+    logger.debug(
+        "Retrieved %d messages from conversation %d",
+        len(conversation_history),
+        conversation_id
+    )
     if conversation_history:
-        print(f"   Last message was: {conversation_history[-1]['role']}: {conversation_history[-1]['content'][:50]}...")
+        logger.debug(
+            "Last message was: %s: %.50s...",
+            conversation_history[-1]["role"],
+            conversation_history[-1]["content"]
+        )
     
-    # Extract image data if provided
-    images = None
-    if request.images:
-        images = [{"data": img.data, "type": img.type} for img in request.images]
+    # Images are passed through as the validated models (no per-image
+    # dict rebuild; the base64 strings are never copied)
+    return conversation_id, conversation_history, search_results, request.images, profile_settings
+
+
+async def add_chat_exchange(
+    db: AsyncSession,
+    request: ChatRequest,
+    conversation_id: int,
+    response_text: str,
+    search_results: List[SearchResult],
+    topic_hint: Optional[str]
+) -> List[SourceReference]:
+    """
+    Add the user message, bot reply and training question to the session.
     
-    # Search documents for relevant content (RAG) - only if text message
-    search_results = []
-    if request.message:
-        search_results = await search_documents(
-            query=request.message,
-            db=db
-        )
+    Also bumps the conversation's updated_at (database clock) so it moves
+    to the top of the sidebar. The caller commits. Shared by send_message and send_message_stream.
     
-    # Generate learning response using LLM
-    # This is where the "don't give answer, give guidance" magic happens
-    llm_response = await generate_learning_response(
-        question=request.message,
-        search_results=search_results,
-        profile_id=request.profile_id,
-        db=db,
-        user_id=current_user.id,
-        conversation_history=conversation_history,
-        images=images
-    )
+    Args:
+        db (AsyncSession): Database session
+        request (ChatRequest): The original chat request
+        conversation_id (int): Conversation the messages belong to
+        response_text (str): The assistant's full reply
+        search_results (List[SearchResult]): RAG results used for the reply
+        topic_hint (str): Topic hint stored with the training question
     
+    Returns:
+        List[SourceReference]: Source references for the response
+    """
     # Convert search results to source references
-    source_references = [
-        SourceReference(
-            document_title=result.document_title,
-            page_number=result.page_number,
-            chapter=result.chapter,
-            section=result.section,
-            relevance_score=result.relevance_score
-        )
+    # Build the plain dicts once: they're stored as-is in the JSON column,
+    # and the response models wrap them without re-validating (the values
+    # come straight from already-validated SearchResult objects)
+    refs_payload = [
+        {
+            "document_title": result.document_title,
+            "page_number": result.page_number,
+            "chapter": result.chapter,
+            "section": result.section,
+            "relevance_score": result.relevance_score
+        }
         for result in search_results
     ]
+    source_references = [
+        SourceReference.model_construct(**ref) for ref in refs_payload
+    ]
     
     # Calculate average relevance score for analytics
     avg_relevance = None
     if search_results:
         avg_relevance = sum(r.relevance_score for r in search_results) / len(search_results)
     
+    # Save user's message (content can be empty if only images)
+    user_message = Message(
+        conversation_id=conversation_id,
+        role="user",
+        content=request.message or "[Image]",
+        is_voice=request.is_voice
+    )
+    
     # Save assistant's response with relevance score
     assistant_message = Message(
-        conversation_id=conversation.id,
+        conversation_id=conversation_id,
         role="assistant",
-        content=llm_response["message"],
-        source_references=json.dumps([ref.model_dump() for ref in source_references]),
+        content=response_text,
+        source_references=refs_payload,
         avg_relevance_score=avg_relevance
     )
-    db.add(assistant_message)
     
     # Save anonymized question for training (separate from user data!)
     training_question = TrainingQuestion(
         question_text=request.message,
-        topic_category=llm_response.get("topic_hint"),
+        topic_category=topic_hint,
         difficulty_inferred=None  # Could be enhanced later
     )
-    db.add(training_question)
     
+    # Insert everything in one flush (user message first, so it sorts first)
+    db.add_all([user_message, assistant_message, training_question])
+    
+    # Mark the conversation as active
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(updated_at=func.now())
+    )
+    
+    return source_references
+    
+
+
+@router.post(
+    "/send",
+    response_model=ChatResponse,
+    summary="Send a message and get learning guidance",
+    description="Send a question and receive hints about where to find the answer."
+)
+async def send_message(
+    request: ChatRequest,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> Response:
+    """
+    Send a message and receive learning guidance.
+    
+    IMPORTANT: This bot doesn't give direct answers!
+    Instead, it provides:
+    - Brief topic hints
+    - References to where the answer can be found (book, page, chapter)
+    - Suggested reading materials
+    
+    Args:
+        request (ChatRequest): Chat request containing:
+            - message: The user's question
+            - conversation_id: Optional existing conversation ID
+            - profile_id: Optional chat profile for personalization
+            - is_voice: Whether this was a voice input
+        current_user (AuthenticatedUser): Authenticated user
+        db (AsyncSession): Database session
+    
+    Returns:
+        ChatResponse: Bot's response with:
+            - message: Guiding response text
+            - conversation_id: The conversation ID
+            - source_references: Where to find the answer
+            - topic_hint: Brief description of the topic
+            - suggested_reading: What to study
+    
+    Example:
+        POST /api/chat/send
+        {
+            "message": "What is photosynthesis?",
+            "conversation_id": null
+        }
+        
+        Response:
+        {
+            "message": "Great question about plant biology! This topic 
+                       involves how plants convert light into energy...",
+            "source_references": [
+                {"document_title": "Biology 101", "page_number": 45, 
+                 "chapter": "Chapter 3: Plant Cells"}
+            ],
+            "topic_hint": "Plant energy conversion process",
+            "suggested_reading": "Review Chapter 3 of Biology 101"
+        }
+    """
+    conversation_id, conversation_history, search_results, images, profile_settings = await prepare_chat_context(
+        request=request,
+        current_user=current_user,
+        db=db
+    )
+    
+    # Generate learning response using LLM
+    # This is where the "don't give answer, give guidance" magic happens
+    learning_style, difficulty_level = profile_settings
+    llm_response = await generate_learning_response(
+        question=request.message,
+        search_results=search_results,
+        learning_style=learning_style,
+        difficulty_level=difficulty_level,
+        user_id=current_user.id,
+        conversation_history=conversation_history,
+        images=images
+    )
+    
+    source_references = await add_chat_exchange(
+        db=db,
+        request=request,
+        conversation_id=conversation_id,
+        response_text=llm_response["message"],
+        search_results=search_results,
+        topic_hint=llm_response.get("topic_hint")
+    )
     await db.commit()
+    invalidate_conversation_list(current_user.id)
     
-    return ChatResponse(
+    # Every value was produced by us (LLM service, database, validated
+    # search results), so skip re-validation and serialize directly
+    # (response_model stays for the docs)
+    chat_response = ChatResponse.model_construct(
         message=llm_response["message"],
-        conversation_id=conversation.id,
+        conversation_id=conversation_id,
         source_references=source_references,
         topic_hint=llm_response.get("topic_hint"),
         suggested_reading=llm_response.get("suggested_reading")
     )
+    return Response(
+        content=chat_response.model_dump_json(),
+        media_type="application/json"
+    )
+
+
+@router.post(
+    "/send/stream",
+    summary="Send a message and stream the learning guidance",
+    description="Like /send, but the reply is streamed as Server-Sent Events."
+)
+async def send_message_stream(
+    request: ChatRequest,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> StreamingResponse:
+    """
+    Send a message and stream the response as it's generated.
+    
+    The reply is sent as Server-Sent Events so the first words show up
+    as soon as the model produces them:
+    - one `data: {"token": "..."}` frame per piece of text
+    - a final `event: done` frame with the same fields as /send
+      (sent after the messages are saved)
+    - or, if generating the reply fails part way, an `event: error`
+      frame with `{"detail": "..."}` instead of `done` (plus the
+      conversation_id when the partial reply was saved)
+    
+    If the reply is cut off (an error, or the client disconnecting), the
+    text generated so far is saved with the question. If nothing was
+    generated yet, a conversation created by this request is removed
+    again rather than left empty in the sidebar.
+    
+    Args:
+        request (ChatRequest): Chat request (same as /send)
+        current_user (AuthenticatedUser): Authenticated user
+        db (AsyncSession): Database session
+    
+    Returns:
+        StreamingResponse: text/event-stream response
+    
+    Raises:
+        HTTPException 404: If conversation not found
+    
+    Example:
+        POST /api/chat/send/stream
+        {"message": "What is photosynthesis?"}
+        
+        data: {"token": "Great "}
+        
+        data: {"token": "question!"}
+        
+        event: done
+        data: {"message": "Great question!", "conversation_id": 7, ...}
+    """
+    conversation_id, conversation_history, search_results, images, profile_settings = await prepare_chat_context(
+        request=request,
+        current_user=current_user,
+        db=db
+    )
+    
+    # The request session is closed before the stream runs, so persist a
+    # newly created conversation now (the reply is saved with its own session)
+    await db.commit()
+    user_id = current_user.id
+    invalidate_conversation_list(user_id)
+    
+    def build_reply_extras() -> Tuple[str, str]:
+        return (
+            extract_topic_hint(question=request.message or ""),
+            build_suggested_reading(search_results=search_results)
+        )
+    
+    async def save_exchange(response_text: str, topic_hint: str) -> List[SourceReference]:
+        # Own session: the stream's session may be unusable after a failure
+        async with async_session() as save_db:
+            source_references = await add_chat_exchange(
+                db=save_db,
+                request=request,
+                conversation_id=conversation_id,
+                response_text=response_text,
+                search_results=search_results,
+                topic_hint=topic_hint
+            )
+            await save_db.commit()
+        invalidate_conversation_list(user_id)
+        return source_references
+    
+    async def discard_new_conversation() -> None:
+        async with async_session() as save_db:
+            await save_db.execute(
+                delete(Conversation).where(Conversation.id == conversation_id)
+            )
+            await save_db.commit()
+        invalidate_conversation_list(user_id)
+    
+    async def finish_interrupted_reply(
+        chunks: List[str],
+        reply_extras: Optional[Tuple[str, str]]
+    ) -> bool:
+        # Keep what was generated; returns whether anything was saved
+        if chunks:
+            topic_hint = (reply_extras or build_reply_extras())[0]
+            await run_shielded(save_exchange("".join(chunks), topic_hint))
+            return True
+        if request.conversation_id is None:
+            await run_shielded(discard_new_conversation())
+        return False
+    
+    async def event_stream():
+        chunks = []
+        reply_extras = None
+        learning_style, difficulty_level = profile_settings
+        try:
+            async for token in stream_learning_response(
+                question=request.message,
+                search_results=search_results,
+                learning_style=learning_style,
+                difficulty_level=difficulty_level,
+                user_id=user_id,
+                conversation_history=conversation_history,
+                images=images
+            ):
+                chunks.append(token)
+                yield format_sse(orjson.dumps({"token": token}))
+                if reply_extras is None:
+                    # The first words are out; work out the other reply
+                    # fields while the model is still generating, so the
+                    # final frame doesn't wait for them
+                    reply_extras = build_reply_extras()
+        except Exception:
+            logger.exception(
+                "Streaming the reply failed",
+                extra={"conversation_id": conversation_id}
+            )
+            saved = await finish_interrupted_reply(chunks, reply_extras)
+            error = {"detail": "The reply was interrupted. Please try again."}
+            if saved:
+                error["conversation_id"] = conversation_id
+            yield format_sse(orjson.dumps(error), event="error")
+            return
+        except BaseException:
+            # Client disconnected (stream cancelled or closed)
+            await finish_interrupted_reply(chunks, reply_extras)
+            raise
+        
+        topic_hint, suggested_reading = reply_extras or build_reply_extras()
+        response_text = "".join(chunks)
+        source_references = await run_shielded(save_exchange(response_text, topic_hint))
+        
+        done = ChatResponse(
+            message=response_text,
+            conversation_id=conversation_id,
+            source_references=source_references,
+            topic_hint=topic_hint,
+            suggested_reading=suggested_reading
+        )
+        yield format_sse(done.model_dump_json().encode(), event="done")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Don't let nginx buffer the stream
+        }
+    )
 
 
 @router.get(
@@ -232,16 +612,18 @@ async def send_message(
     description="Get a list of all conversations for the current user."
 )
 async def list_conversations(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
-) -> List[ConversationListResponse]:
+) -> Response:
     """
     Get all conversations for the current user.
     
     Returns conversation summaries (not full messages) for sidebar/history.
+    The encoded list is cached per user until their conversations change
+    (see invalidate_conversation_list).
     
     Args:
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Returns:
@@ -251,33 +633,48 @@ async def list_conversations(
         GET /api/chat/conversations
         Authorization: Bearer <token>
     """
+    user_id = current_user.id
+    cached_content = _conversation_list_cache.get(user_id)
+    if cached_content is not None:
+        return Response(content=cached_content, media_type="application/json")
+    generation = _conversation_list_generation.get(user_id, 0)
+    
+    # Count messages per conversation with a correlated subquery, so each
+    # count is an index lookup on messages.conversation_id instead of a
+    # join + GROUP BY over every message the user has
+    message_count = (
+        select(func.count(Message.id))
+        .where(Message.conversation_id == Conversation.id)
+        .correlate(Conversation)
+        .scalar_subquery()
+    )
+    
     # Get conversations with message count
+    # Only the response columns are selected (no ORM objects to build)
     result = await db.execute(
         select(
-            Conversation,
-            func.count(Message.id).label("message_count")
+            Conversation.id,
+            Conversation.title,
+            Conversation.created_at,
+            Conversation.updated_at,
+            message_count.label("message_count")
         )
-        .outerjoin(Message, Message.conversation_id == Conversation.id)
-        .where(Conversation.user_id == current_user.id)
-        .group_by(Conversation.id)
+        .where(Conversation.user_id == user_id)
         .order_by(Conversation.updated_at.desc())
     )
     
-    conversations = []
-    for row in result.all():
-        conv = row[0]
-        count = row[1]
-        conversations.append(
-            ConversationListResponse(
-                id=conv.id,
-                title=conv.title,
-                created_at=conv.created_at,
-                updated_at=conv.updated_at,
-                message_count=count
-            )
-        )
+    # Rows already have the ConversationListResponse shape, so serialize
+    # them straight to JSON with orjson (response_model stays for the docs)
+    content = orjson.dumps(
+        [dict(row) for row in result.mappings()],
+        option=orjson.OPT_UTC_Z
+    )
+    
+    # Only cache if nothing changed while we were querying
+    if _conversation_list_generation.get(user_id, 0) == generation:
+        _conversation_list_cache.set(user_id, content)
     
-    return conversations
+    return Response(content=content, media_type="application/json")
 
 
 @router.get(
@@ -288,19 +685,24 @@ async def list_conversations(
 )
 async def get_conversation(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
-) -> ConversationResponse:
+) -> Response:
     """
     Get a specific conversation with all messages.
     
+    This is the largest payload in the API, so it's serialized straight to
+    JSON bytes by pydantic-core instead of going through FastAPI's
+    response_model pipeline (dump -> re-validate -> serialize). The
+    response_model is still used for the OpenAPI schema.
+    
     Args:
         conversation_id (int): ID of the conversation to retrieve
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Returns:
-        ConversationResponse: Conversation with all messages
+        Response: ConversationResponse JSON with all messages
     
     Raises:
         HTTPException 404: If conversation not found or doesn't belong to user
@@ -309,8 +711,15 @@ async def get_conversation(
         GET /api/chat/conversations/1
         Authorization: Bearer <token>
     """
+    # Load the conversation and its messages (with feedback) in two queries
+    # Feedback is joined into the messages query; only is_helpful is needed
     result = await db.execute(
         select(Conversation)
+        .options(
+            selectinload(Conversation.messages)
+            .joinedload(Message.feedback)
+            .load_only(MessageFeedback.is_helpful)
+        )
         .where(
             Conversation.id == conversation_id,
             Conversation.user_id == current_user.id
@@ -324,52 +733,52 @@ async def get_conversation(
             detail="Conversation not found"
         )
     
-    # Get messages for this conversation with feedback (eagerly loaded)
-    messages_result = await db.execute(
-        select(Message)
-        .outerjoin(MessageFeedback)
-        .where(Message.conversation_id == conversation_id)
-        .order_by(Message.created_at)
-    )
-    messages = messages_result.scalars().all()
-    
-    # Get feedback for all messages in one query
-    feedback_result = await db.execute(
-        select(MessageFeedback)
-        .where(MessageFeedback.message_id.in_([msg.id for msg in messages]))
-    )
-    feedbacks = {f.message_id: f.is_helpful for f in feedback_result.scalars().all()}
-    
-    # Parse source references from JSON
-    message_responses = []
-    for msg in messages:
+    # Build the response as plain dicts and encode it once with orjson -
+    # the values come straight from the database, so no per-message
+    # models are created (response_model stays for the docs)
+    # Messages are already ordered by (created_at, id) via the relationship
+    message_payloads = []
+    for msg in conversation.messages:
         refs = None
         if msg.source_references:
+            stored_refs = msg.source_references
             try:
-                refs = [SourceReference(**ref) for ref in json.loads(msg.source_references)]
-            except (json.JSONDecodeError, TypeError):
+                # Rows written before the JSON column hold a JSON string
+                # and are validated; native JSON rows were written by us
+                if isinstance(stored_refs, str):
+                    refs = [
+                        SourceReference(**ref).model_dump()
+                        for ref in orjson.loads(stored_refs)
+                    ]
+                else:
+                    refs = stored_refs
+            except (orjson.JSONDecodeError, TypeError):
                 refs = None
         
-        message_responses.append(
-            MessageResponse(
-                id=msg.id,
-                conversation_id=msg.conversation_id,
-                role=msg.role,
-                content=msg.content,
-                is_voice=msg.is_voice,
-                source_references=refs,
-                avg_relevance_score=msg.avg_relevance_score,
-                feedback=feedbacks.get(msg.id),  # None if no feedback yet
-                created_at=msg.created_at
-            )
-        )
-    
-    return ConversationResponse(
-        id=conversation.id,
-        title=conversation.title,
-        created_at=conversation.created_at,
-        updated_at=conversation.updated_at,
-        messages=message_responses
+        message_payloads.append({
+            "id": msg.id,
+            "conversation_id": msg.conversation_id,
+            "role": msg.role,
+            "content": msg.content,
+            "is_voice": msg.is_voice,
+            "source_references": refs,
+            "avg_relevance_score": msg.avg_relevance_score,
+            "feedback": msg.feedback.is_helpful if msg.feedback else None,  # None if no feedback yet
+            "created_at": msg.created_at
+        })
+    
+    return Response(
+        content=orjson.dumps(
+            {
+                "id": conversation.id,
+                "title": conversation.title,
+                "created_at": conversation.created_at,
+                "updated_at": conversation.updated_at,
+                "messages": message_payloads
+            },
+            option=orjson.OPT_UTC_Z
+        ),
+        media_type="application/json"
     )
 
 
@@ -381,7 +790,7 @@ async def get_conversation(
 )
 async def delete_conversation(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> None:
     """
@@ -389,7 +798,7 @@ async def delete_conversation(
     
     Args:
         conversation_id (int): ID of conversation to delete
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Raises:
@@ -398,23 +807,101 @@ async def delete_conversation(
     Note:
         Training questions are NOT deleted (they're anonymized and separate).
     """
+    # Single DELETE - messages and their feedback are removed by the
+    # database via ON DELETE CASCADE, so nothing is loaded into Python
     result = await db.execute(
-        select(Conversation)
+        delete(Conversation)
         .where(
             Conversation.id == conversation_id,
             Conversation.user_id == current_user.id
         )
     )
-    conversation = result.scalar_one_or_none()
     
-    if not conversation:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found"
         )
     
-    await db.delete(conversation)
     await db.commit()
+    invalidate_conversation_list(current_user.id)
+
+
+async def save_feedback(
+    db: AsyncSession,
+    user_id: int,
+    ratings: Dict[int, bool]
+) -> List[FeedbackResponse]:
+    """
+    Create or update feedback for several messages in one round trip.
+    
+    All messages are checked first (one SELECT), then saved with a
+    single multi-row upsert and committed together, so either every
+    rating is saved or none is.
+    
+    Args:
+        db (AsyncSession): Database session
+        user_id (int): Owner of the messages
+        ratings (Dict[int, bool]): is_helpful per assistant message ID
+    
+    Returns:
+        List[FeedbackResponse]: Saved feedback, one per message
+    
+    Raises:
+        HTTPException 404: If a message is not found or not accessible
+        HTTPException 400: If a message is not an assistant message
+    """
+    # Get the message roles and verify they belong to user's conversations
+    result = await db.execute(
+        select(Message.id, Message.role)
+        .join(Conversation)
+        .where(
+            Message.id.in_(ratings),
+            Conversation.user_id == user_id
+        )
+    )
+    roles = dict(result.tuples().all())
+    
+    if len(roles) != len(ratings):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Message not found"
+        )
+    
+    if any(role != "assistant" for role in roles.values()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Can only give feedback on assistant messages"
+        )
+    
+    # Create or update all feedback in one statement
+    # (INSERT ... VALUES (...), ... ON CONFLICT (message_id) DO UPDATE ... RETURNING)
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(MessageFeedback).values([
+        {"message_id": message_id, "is_helpful": is_helpful}
+        for message_id, is_helpful in ratings.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MessageFeedback.message_id],
+        set_={"is_helpful": stmt.excluded.is_helpful}
+    ).returning(
+        MessageFeedback.message_id,
+        MessageFeedback.is_helpful,
+        MessageFeedback.created_at
+    )
+    
+    saved = (await db.execute(stmt)).all()
+    await db.commit()
+    
+    # Values come straight from the RETURNING row - skip re-validation
+    return [
+        FeedbackResponse.model_construct(
+            message_id=row.message_id,
+            is_helpful=row.is_helpful,
+            created_at=row.created_at
+        )
+        for row in saved
+    ]
 
 
 @router.post(
@@ -425,9 +912,9 @@ async def delete_conversation(
 )
 async def submit_feedback(
     feedback: FeedbackRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
-) -> FeedbackResponse:
+) -> Response:
     """
     Submit feedback on whether a bot response was helpful.
     
@@ -438,7 +925,7 @@ async def submit_feedback(
         feedback (FeedbackRequest): Feedback containing:
             - message_id: ID of the assistant message
             - is_helpful: True = thumbs up, False = thumbs down
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Returns:
@@ -448,56 +935,62 @@ async def submit_feedback(
         HTTPException 404: If message not found or not accessible
         HTTPException 400: If trying to rate a user message
     """
-    # Get the message and verify it belongs to user's conversation
-    result = await db.execute(
-        select(Message)
-        .join(Conversation)
-        .where(
-            Message.id == feedback.message_id,
-            Conversation.user_id == current_user.id
-        )
+    saved = await save_feedback(
+        db,
+        user_id=current_user.id,
+        ratings={feedback.message_id: feedback.is_helpful}
+    )
+    return Response(
+        content=saved[0].model_dump_json(),
+        media_type="application/json"
     )
-    message = result.scalar_one_or_none()
+
+
+@router.post(
+    "/feedback/batch",
+    response_model=List[FeedbackResponse],
+    summary="Submit several feedback ratings at once",
+    description="Rate up to 100 bot responses in one request (all or nothing)."
+)
+async def submit_feedback_batch(
+    batch: FeedbackBatchRequest,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> Response:
+    """
+    Submit feedback on several bot responses in one request.
     
-    if not message:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Message not found"
-        )
+    Same rules as /feedback, applied to every item. One auth check,
+    one ownership query and one upsert for the whole batch.
     
-    if message.role != "assistant":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Can only give feedback on assistant messages"
-        )
+    Args:
+        batch (FeedbackBatchRequest): Up to 100 feedback entries
+        current_user (AuthenticatedUser): Authenticated user
+        db (AsyncSession): Database session
+    
+    Returns:
+        List[FeedbackResponse]: Saved feedback, one per distinct message
     
-    # Check if feedback already exists
-    existing_result = await db.execute(
-        select(MessageFeedback).where(MessageFeedback.message_id == message.id)
+    Raises:
+        HTTPException 404: If any message is not found or not accessible
+        HTTPException 400: If any message is a user message
+    
+    Example:
+        POST /api/chat/feedback/batch
+        {
+            "items": [
+                {"message_id": 12, "is_helpful": true},
+                {"message_id": 14, "is_helpful": false}
+            ]
+        }
+    """
+    # Later entries for the same message override earlier ones
+    ratings = {item.message_id: item.is_helpful for item in batch.items}
+    saved = await save_feedback(db, user_id=current_user.id, ratings=ratings)
+    return Response(
+        content=orjson.dumps(
+            [item.model_dump() for item in saved],
+            option=orjson.OPT_UTC_Z
+        ),
+        media_type="application/json"
     )
-    existing_feedback = existing_result.scalar_one_or_none()
-    
-    if existing_feedback:
-        # Update existing feedback
-        existing_feedback.is_helpful = feedback.is_helpful
-        await db.commit()
-        await db.refresh(existing_feedback)
-        return FeedbackResponse(
-            message_id=message.id,
-            is_helpful=existing_feedback.is_helpful,
-            created_at=existing_feedback.created_at
-        )
-    else:
-        # Create new feedback
-        new_feedback = MessageFeedback(
-            message_id=message.id,
-            is_helpful=feedback.is_helpful
-        )
-        db.add(new_feedback)
-        await db.commit()
-        await db.refresh(new_feedback)
-        return FeedbackResponse(
-            message_id=message.id,
-            is_helpful=new_feedback.is_helpful,
-            created_at=new_feedback.created_at
-        )
@@ -10,21 +10,34 @@ This module handles document upload and management:
 Documents are used for the learning guidance feature.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status, UploadFile, File, Form
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from typing import AsyncIterator, List, Optional, Tuple
+import asyncio
+import hashlib
+import logging
 import os
 import uuid
 
-from app.database import get_db
-from app.models.user import User
-from app.models.document import Document, DocumentChunk
+import aiofiles
+import aiofiles.os
+import orjson
+
+from app.database import get_db, async_session
+from app.models.document import Document
 from app.schemas.document import DocumentResponse, DocumentListResponse
-from app.services.auth_service import get_current_user
-from app.services.rag_service import process_document, delete_document_embeddings
-from app.config import settings
+from app.services.auth_service import get_current_user, AuthenticatedUser
+from app.services.rag_service import (
+    delete_embeddings_for_documents,
+    process_document,
+    purge_deleted_documents
+)
+from app.config import settings, Settings, get_settings
+
+logger = logging.getLogger(__name__)
 
 # Create router
 router = APIRouter(
@@ -32,6 +45,16 @@ router = APIRouter(
     tags=["Documents"]
 )
 
+# Files are read and written in 64KB chunks
+FILE_CHUNK_SIZE = 64 * 1024
+
+# Content type for each supported file extension
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "txt": "text/plain",
+    "epub": "application/epub+zip"
+}
+
 
 def validate_file_extension(filename: str) -> str:
     """
@@ -49,11 +72,11 @@ def validate_file_extension(filename: str) -> str:
     # Get extension (handle files with multiple dots)
     ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
     
-    allowed = settings.get_allowed_extensions_list()
+    allowed = settings.allowed_extensions
     if ext not in allowed:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type '{ext}' not allowed. Allowed types: {', '.join(allowed)}"
+            detail=f"File type '{ext}' not allowed. Allowed types: {', '.join(sorted(allowed))}"
         )
     
     return ext
@@ -78,6 +101,242 @@ def validate_file_size(file_size: int) -> None:
         )
 
 
+async def find_document_by_hash(db: AsyncSession, content_sha256: str) -> Optional[Document]:
+    """
+    Look up a document by the SHA-256 of its file contents.
+    
+    Args:
+        db (AsyncSession): Database session
+        content_sha256 (str): Hex digest of the file contents
+    
+    Returns:
+        Document: The matching document, or None
+    """
+    result = await db.execute(
+        select(Document).where(Document.content_sha256 == content_sha256)
+    )
+    return result.scalar_one_or_none()
+
+
+async def reuse_existing_document(
+    db: AsyncSession,
+    existing: Document,
+    file_path: str,
+    background_tasks: BackgroundTasks
+) -> Document:
+    """
+    Handle an upload whose contents match an existing document.
+    
+    A document that is processing or ready is returned as it is and the
+    new copy of the file is removed. A document whose processing failed
+    is retried: it takes over the new copy of the file and is queued for
+    processing again.
+    
+    Args:
+        db (AsyncSession): Database session
+        existing (Document): The document with the same content hash
+        file_path (str): Where the new upload was saved
+        background_tasks (BackgroundTasks): Runs the RAG processing
+    
+    Returns:
+        Document: The existing document
+    """
+    if existing.status == "failed":
+        old_file_path = existing.file_path
+        
+        # Conditional, so two re-uploads of the same file don't both
+        # queue a retry
+        result = await db.execute(
+            update(Document)
+            .where(Document.id == existing.id, Document.status == "failed")
+            .values(status="processing", file_path=file_path)
+        )
+        await db.commit()
+        
+        if result.rowcount:
+            await db.refresh(existing)
+            try:
+                await aiofiles.os.remove(old_file_path)
+            except FileNotFoundError:
+                pass  # Already gone
+            
+            background_tasks.add_task(
+                process_document_in_background,
+                document_id=existing.id,
+                file_path=file_path,
+                file_type=existing.file_type
+            )
+            return existing
+        
+        await db.refresh(existing)
+    
+    await aiofiles.os.remove(file_path)
+    return existing
+
+
+async def process_document_in_background(
+    document_id: int,
+    file_path: str,
+    file_type: str
+) -> None:
+    """
+    Run RAG processing for an uploaded document and record the outcome.
+    
+    Runs as a background task after the upload response is sent, so it
+    opens its own database session. Sets the document status to "ready"
+    (or "failed" if processing raised). If the document was deleted
+    while it was being processed, the new chunks are discarded instead.
+    
+    Args:
+        document_id (int): ID of the uploaded document
+        file_path (str): Path to the saved file
+        file_type (str): File extension (pdf, txt, epub)
+    """
+    async with async_session() as db:
+        try:
+            chunk_count = await process_document(
+                document_id=document_id,
+                file_path=file_path,
+                file_type=file_type,
+                db=db
+            )
+            status_value = "ready"
+        except Exception:
+            # Keep the document, but drop any partially added chunks
+            # (rows and vectors)
+            logger.exception(
+                "Document processing failed",
+                extra={"document_id": document_id}
+            )
+            await db.rollback()
+            # The vectors may already be in ChromaDB (the failure came
+            # after collection.add), and the rollback doesn't undo that
+            try:
+                await asyncio.to_thread(delete_embeddings_for_documents, [document_id])
+            except Exception:
+                logger.exception(
+                    "Could not remove embeddings of failed document",
+                    extra={"document_id": document_id}
+                )
+            chunk_count = None
+            status_value = "failed"
+        
+        values = {"status": status_value}
+        if chunk_count is not None:
+            values["total_pages"] = chunk_count  # Approximate
+        # Only while still processing: a document deleted in the meantime
+        # must stay "deleting" so the purge removes it
+        result = await db.execute(
+            update(Document)
+            .where(Document.id == document_id, Document.status == "processing")
+            .values(**values)
+        )
+        if result.rowcount:
+            await db.commit()
+            return
+        
+        # Deleted while processing: drop what was just stored and leave the
+        # rest to the purge
+        await db.rollback()
+        if status_value == "ready":
+            try:
+                await asyncio.to_thread(delete_embeddings_for_documents, [document_id])
+            except Exception:
+                logger.exception(
+                    "Could not remove embeddings of deleted document",
+                    extra={"document_id": document_id}
+                )
+
+
+def parse_range_header(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "Range: bytes=..." header.
+    
+    Only one range is supported; anything else (multiple ranges, other
+    units, malformed values) returns None and the whole file is served.
+    
+    Args:
+        range_header (str): The raw Range header value
+        file_size (int): Size of the file in bytes
+    
+    Returns:
+        Tuple[int, int]: Inclusive (start, end) byte offsets, or None
+    
+    Raises:
+        HTTPException 416: If the range starts beyond the end of the file
+    
+    Example:
+        parse_range_header("bytes=0-1023", 5000)   # (0, 1023)
+        parse_range_header("bytes=-500", 5000)     # (4500, 4999)
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in ranges:
+        return None
+    
+    start_text, _, end_text = ranges.strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else file_size - 1
+        else:
+            # Suffix range: the last N bytes
+            suffix_length = int(end_text)
+            if suffix_length == 0:
+                raise ValueError
+            start = max(file_size - suffix_length, 0)
+            end = file_size - 1
+    except ValueError:
+        return None
+    
+    if start >= file_size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    if start > end:
+        return None
+    
+    return start, min(end, file_size - 1)
+
+
+async def iter_file_range(file_path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    """
+    Read an inclusive byte range of a file in chunks.
+    
+    Args:
+        file_path (str): Path to the file
+        start (int): First byte offset
+        end (int): Last byte offset (inclusive)
+    
+    Yields:
+        bytes: Consecutive chunks of the range
+    """
+    remaining = end - start + 1
+    async with aiofiles.open(file_path, "rb") as f:
+        await f.seek(start)
+        while remaining > 0:
+            chunk = await f.read(min(FILE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+async def purge_deleted_documents_in_background() -> None:
+    """
+    Purge documents marked for deletion, in a session of its own.
+    
+    Runs as a background task after a delete response is sent. Errors
+    are logged and left for the next purge to retry.
+    """
+    async with async_session() as db:
+        try:
+            await purge_deleted_documents(db)
+        except Exception:
+            logger.exception("Purging deleted documents failed")
+
+
 @router.post(
     "/upload",
     response_model=DocumentResponse,
@@ -86,11 +345,14 @@ def validate_file_size(file_size: int) -> None:
     description="Upload a PDF, TXT, or EPUB file for RAG processing."
 )
 async def upload_document(
+    background_tasks: BackgroundTasks,
+    response: Response,
     file: UploadFile = File(..., description="Document file to upload"),
     title: Optional[str] = Form(default=None, description="Document title"),
     author: Optional[str] = Form(default=None, description="Document author"),
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    settings: Settings = Depends(get_settings)
 ) -> DocumentResponse:
     """
     Upload a document for RAG processing.
@@ -100,18 +362,32 @@ async def upload_document(
     2. Chunked into smaller pieces
     3. Embedded and stored in the vector database
     
+    Steps 2 and 3 run in the background after the response is sent.
+    The returned document has status "processing" until they finish.
+    
+    If a file with identical content was already uploaded, the new copy
+    is discarded and the existing document is returned (200 instead
+    of 201), so the same book is never chunked and embedded twice.
+    If processing that document had failed, it is retried with the
+    new copy instead.
+    
     Args:
+        background_tasks (BackgroundTasks): Runs the RAG processing
+        response (Response): Used to return 200 for duplicate uploads
         file (UploadFile): The document file (PDF, TXT, or EPUB)
         title (str): Optional document title
         author (str): Optional document author
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
+        settings (Settings): Application settings
     
     Returns:
         DocumentResponse: Uploaded document metadata
     
     Raises:
         HTTPException 400: If file type not allowed or too large
+        HTTPException 409: If the same file was uploaded and deleted
+            again while this upload was in progress
     
     Example:
         POST /api/documents/upload
@@ -121,20 +397,41 @@ async def upload_document(
         title: "Physics 101"
         author: "Dr. Smith"
     """
-    # Validate file
+    # Validate file type first so rejected uploads never touch the disk
     ext = validate_file_extension(filename=file.filename)
     
-    # Read file content to check size
-    content = await file.read()
-    validate_file_size(file_size=len(content))
-    
     # Generate unique filename to avoid collisions
     unique_filename = f"{uuid.uuid4()}_{file.filename}"
     file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
     
-    # Save file to disk
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Stream file to disk in chunks, checking the size as we go,
+    # so memory use stays at one chunk regardless of file size.
+    # The content hash is computed on the same pass.
+    total_size = 0
+    content_hash = hashlib.sha256()
+    try:
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := await file.read(FILE_CHUNK_SIZE):
+                total_size += len(chunk)
+                validate_file_size(file_size=total_size)
+                content_hash.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        # Too large, disk error or cancelled - don't leave a partial file behind
+        try:
+            await aiofiles.os.remove(file_path)
+        except FileNotFoundError:
+            pass  # Never created
+        raise
+    content_sha256 = content_hash.hexdigest()
+    
+    # Same file uploaded before - return it instead of embedding it again
+    existing = await find_document_by_hash(db, content_sha256)
+    if existing:
+        response.status_code = status.HTTP_200_OK
+        return await reuse_existing_document(
+            db, existing, file_path, background_tasks
+        )
     
     # Create document record
     document = Document(
@@ -142,39 +439,40 @@ async def upload_document(
         title=title or file.filename,
         author=author,
         file_type=ext,
-        file_path=file_path
+        file_path=file_path,
+        content_sha256=content_sha256,
+        status="processing"
     )
     db.add(document)
-    await db.flush()  # Get ID
-    
-    # Process document for RAG (chunking and embedding)
-    # This happens asynchronously
     try:
-        chunk_count = await process_document(
-            document_id=document.id,
-            file_path=file_path,
-            file_type=ext,
-            db=db
+        await db.commit()
+    except IntegrityError:
+        # The same file was uploaded concurrently and committed first
+        await db.rollback()
+        existing = await find_document_by_hash(db, content_sha256)
+        if existing is None:
+            # ...and already deleted again
+            await aiofiles.os.remove(file_path)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The same file was being uploaded at the same time, please try again"
+            )
+        response.status_code = status.HTTP_200_OK
+        return await reuse_existing_document(
+            db, existing, file_path, background_tasks
         )
-        document.total_pages = chunk_count  # Approximate
-    except Exception as e:
-        # If processing fails, still keep the document but log error
-        print(f"Error processing document: {e}")
-        chunk_count = 0
-    
-    await db.commit()
     await db.refresh(document)
     
-    return DocumentResponse(
-        id=document.id,
-        filename=document.filename,
-        title=document.title,
-        author=document.author,
-        file_type=document.file_type,
-        total_pages=document.total_pages,
-        upload_date=document.upload_date,
-        chunk_count=chunk_count
+    # Process document for RAG (chunking and embedding) after the
+    # response is sent; clients poll the document until status is "ready"
+    background_tasks.add_task(
+        process_document_in_background,
+        document_id=document.id,
+        file_path=file_path,
+        file_type=ext
     )
+    
+    return document
 
 
 @router.get(
@@ -184,14 +482,14 @@ async def upload_document(
     description="Get a list of all uploaded documents."
 )
 async def list_documents(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> DocumentListResponse:
     """
     List all uploaded documents.
     
     Args:
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Returns:
@@ -201,37 +499,33 @@ async def list_documents(
         GET /api/documents/
         Authorization: Bearer <token>
     """
-    # Get documents with chunk count
+    # chunk_count is stored on the document, so no join over the chunks.
+    # Only the response columns are selected (no ORM objects to build)
     result = await db.execute(
         select(
-            Document,
-            func.count(DocumentChunk.id).label("chunk_count")
+            Document.id,
+            Document.filename,
+            Document.title,
+            Document.author,
+            Document.file_type,
+            Document.total_pages,
+            Document.upload_date,
+            Document.chunk_count,
+            Document.status
         )
-        .outerjoin(DocumentChunk, DocumentChunk.document_id == Document.id)
-        .group_by(Document.id)
+        .where(Document.status != "deleting")
         .order_by(Document.upload_date.desc())
     )
-    
-    documents = []
-    for row in result.all():
-        doc = row[0]
-        chunk_count = row[1]
-        documents.append(
-            DocumentResponse(
-                id=doc.id,
-                filename=doc.filename,
-                title=doc.title,
-                author=doc.author,
-                file_type=doc.file_type,
-                total_pages=doc.total_pages,
-                upload_date=doc.upload_date,
-                chunk_count=chunk_count
-            )
-        )
-    
-    return DocumentListResponse(
-        documents=documents,
-        total_count=len(documents)
+    documents = [dict(row) for row in result.mappings()]
+    
+    # Rows already have the DocumentListResponse shape, so serialize them
+    # straight to JSON with orjson (response_model stays for the docs)
+    return Response(
+        content=orjson.dumps(
+            {"documents": documents, "total_count": len(documents)},
+            option=orjson.OPT_UTC_Z
+        ),
+        media_type="application/json"
     )
 
 
@@ -243,7 +537,7 @@ async def list_documents(
 )
 async def get_document(
     document_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> DocumentResponse:
     """
@@ -251,7 +545,7 @@ async def get_document(
     
     Args:
         document_id (int): ID of the document
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Returns:
@@ -261,35 +555,19 @@ async def get_document(
         HTTPException 404: If document not found
     """
     result = await db.execute(
-        select(
-            Document,
-            func.count(DocumentChunk.id).label("chunk_count")
+        select(Document).where(
+            Document.id == document_id,
+            Document.status != "deleting"
         )
-        .outerjoin(DocumentChunk, DocumentChunk.document_id == Document.id)
-        .where(Document.id == document_id)
-        .group_by(Document.id)
     )
-    
-    row = result.first()
-    if not row:
+    doc = result.scalar_one_or_none()
+    if not doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
     
-    doc = row[0]
-    chunk_count = row[1]
-    
-    return DocumentResponse(
-        id=doc.id,
-        filename=doc.filename,
-        title=doc.title,
-        author=doc.author,
-        file_type=doc.file_type,
-        total_pages=doc.total_pages,
-        upload_date=doc.upload_date,
-        chunk_count=chunk_count
-    )
+    return doc
 
 
 @router.delete(
@@ -300,7 +578,8 @@ async def get_document(
 )
 async def delete_document(
     document_id: int,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> None:
     """
@@ -308,19 +587,27 @@ async def delete_document(
     
     This will:
     1. Delete the file from disk
-    2. Delete embeddings from vector database
-    3. Delete document record and chunks from SQL database
+    2. Mark the document as "deleting" (hidden from the API at once)
+    3. After the response, delete the embeddings from the vector
+       database and the document and chunks from the SQL database
+    
+    The vector store call no longer holds up the request; if it fails,
+    the document stays marked and is purged on a later run.
     
     Args:
         document_id (int): ID of the document to delete
-        current_user (User): Authenticated user
+        background_tasks (BackgroundTasks): Runs the purge
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Raises:
         HTTPException 404: If document not found
     """
     result = await db.execute(
-        select(Document).where(Document.id == document_id)
+        select(Document).where(
+            Document.id == document_id,
+            Document.status != "deleting"
+        )
     )
     document = result.scalar_one_or_none()
     
@@ -331,15 +618,17 @@ async def delete_document(
         )
     
     # Delete file from disk
-    if os.path.exists(document.file_path):
-        os.remove(document.file_path)
-    
-    # Delete embeddings from vector database
-    await delete_document_embeddings(document_id=document_id)
+    try:
+        await aiofiles.os.remove(document.file_path)
+    except FileNotFoundError:
+        pass  # Already gone
     
-    # Delete from SQL database (cascades to chunks)
-    await db.delete(document)
+    # Mark for purge; clear the hash so the same file can be uploaded again
+    document.status = "deleting"
+    document.content_sha256 = None
     await db.commit()
+    
+    background_tasks.add_task(purge_deleted_documents_in_background)
 
 
 @router.get(
@@ -349,7 +638,8 @@ async def delete_document(
 )
 async def get_document_file(
     document_id: int,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -358,19 +648,29 @@ async def get_document_file(
     Returns the file with appropriate content type for viewing in browser
     (PDFs will open in browser, others will download).
     
+    Supports conditional and partial requests so PDF viewers don't
+    re-download the whole file:
+    - If-None-Match with the current ETag returns 304 Not Modified
+    - A single "Range: bytes=start-end" returns 206 Partial Content
+    
     Args:
         document_id (int): ID of the document
-        current_user (User): Authenticated user
+        request (Request): The incoming request (for Range/If-None-Match)
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Returns:
-        FileResponse: The document file
+        Response: The document file (full, partial or 304)
     
     Raises:
         HTTPException 404: If document or file not found
+        HTTPException 416: If the requested range is outside the file
     """
     result = await db.execute(
-        select(Document).where(Document.id == document_id)
+        select(Document).where(
+            Document.id == document_id,
+            Document.status != "deleting"
+        )
     )
     document = result.scalar_one_or_none()
     
@@ -380,29 +680,54 @@ async def get_document_file(
             detail="Document not found"
         )
     
-    if not os.path.exists(document.file_path):
+    # One stat call covers the existence check, size and ETag
+    try:
+        stat_result = await aiofiles.os.stat(document.file_path)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document file not found on disk"
         )
     
     # Determine media type
-    media_types = {
-        "pdf": "application/pdf",
-        "txt": "text/plain",
-        "epub": "application/epub+zip"
-    }
-    media_type = media_types.get(document.file_type, "application/octet-stream")
+    media_type = MEDIA_TYPES.get(document.file_type, "application/octet-stream")
     
-    # Return file response
     # For PDFs, inline display; for others, attachment download
     disposition = "inline" if document.file_type == "pdf" else "attachment"
     
+    etag = f'"{document.id}-{stat_result.st_mtime_ns}"'
+    headers = {
+        "Content-Disposition": f'{disposition}; filename="{document.filename}"',
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=3600",
+        "ETag": etag
+    }
+    
+    # Client already has this version
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    # Partial content (PDF viewers jumping to a page)
+    range_header = request.headers.get("range")
+    if range_header:
+        file_size = stat_result.st_size
+        byte_range = parse_range_header(range_header, file_size)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                iter_file_range(document.file_path, start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=media_type,
+                headers=headers
+            )
+    
+    # Whole file; stat_result is passed so FileResponse doesn't stat again
     return FileResponse(
         path=document.file_path,
         media_type=media_type,
         filename=document.filename,
-        headers={
-            "Content-Disposition": f'{disposition}; filename="{document.filename}"'
-        }
+        stat_result=stat_result,
+        headers=headers
     )
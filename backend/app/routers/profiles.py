@@ -9,17 +9,19 @@ This module handles chat profile management:
 Similar to ChatGPT's custom instructions feature.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from typing import List
 
 from app.database import get_db
-from app.models.user import User, ChatProfile
+from app.models.user import ChatProfile
 from app.schemas.user import (
-    ChatProfileCreate, ChatProfileUpdate, ChatProfileResponse
+    ChatProfileCreate, ChatProfileUpdate, ChatProfileResponse,
+    get_chat_profile_list_adapter
 )
-from app.services.auth_service import get_current_user
+from app.services.auth_service import get_current_user, AuthenticatedUser
+from app.services.llm_service import invalidate_profile_settings
 
 # Create router
 router = APIRouter(
@@ -37,7 +39,7 @@ router = APIRouter(
 )
 async def create_profile(
     profile_data: ChatProfileCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> ChatProfileResponse:
     """
@@ -54,7 +56,7 @@ async def create_profile(
             - learning_style: How the bot should guide
             - difficulty_level: How detailed hints should be
             - is_default: Set as default profile
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Returns:
@@ -69,16 +71,16 @@ async def create_profile(
             "difficulty_level": "intermediate"
         }
     """
-    # If setting as default, unset other defaults
+    # If setting as default, unset other defaults (one UPDATE, no row loading)
     if profile_data.is_default:
-        result = await db.execute(
-            select(ChatProfile).where(
+        await db.execute(
+            update(ChatProfile)
+            .where(
                 ChatProfile.user_id == current_user.id,
                 ChatProfile.is_default == True
             )
+            .values(is_default=False)
         )
-        for profile in result.scalars():
-            profile.is_default = False
     
     # Create new profile
     new_profile = ChatProfile(
@@ -104,14 +106,14 @@ async def create_profile(
     description="Get all chat profiles for the current user."
 )
 async def list_profiles(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> List[ChatProfileResponse]:
     """
     List all chat profiles for the current user.
     
     Args:
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Returns:
@@ -123,7 +125,14 @@ async def list_profiles(
         .order_by(ChatProfile.created_at.desc())
     )
     
-    return result.scalars().all()
+    # Validate and serialize with the shared adapter in one go, instead of
+    # FastAPI's validate -> dump to dicts -> encode JSON round trip
+    profile_list_adapter = get_chat_profile_list_adapter()
+    profiles = profile_list_adapter.validate_python(result.scalars().all())
+    return Response(
+        content=profile_list_adapter.dump_json(profiles),
+        media_type="application/json"
+    )
 
 
 @router.get(
@@ -134,7 +143,7 @@ async def list_profiles(
 )
 async def get_profile(
     profile_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> ChatProfileResponse:
     """
@@ -142,7 +151,7 @@ async def get_profile(
     
     Args:
         profile_id (int): ID of the profile
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Returns:
@@ -177,7 +186,7 @@ async def get_profile(
 async def update_profile(
     profile_id: int,
     profile_update: ChatProfileUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> ChatProfileResponse:
     """
@@ -186,7 +195,7 @@ async def update_profile(
     Args:
         profile_id (int): ID of the profile to update
         profile_update (ChatProfileUpdate): Fields to update
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Returns:
@@ -209,17 +218,17 @@ async def update_profile(
             detail="Profile not found"
         )
     
-    # If setting as default, unset others
+    # If setting as default, unset others (one UPDATE, no row loading)
     if profile_update.is_default:
-        other_result = await db.execute(
-            select(ChatProfile).where(
+        await db.execute(
+            update(ChatProfile)
+            .where(
                 ChatProfile.user_id == current_user.id,
                 ChatProfile.is_default == True,
                 ChatProfile.id != profile_id
             )
+            .values(is_default=False)
         )
-        for other_profile in other_result.scalars():
-            other_profile.is_default = False
     
     # Update fields that were provided
     update_data = profile_update.model_dump(exclude_unset=True)
@@ -228,6 +237,7 @@ async def update_profile(
     
     await db.commit()
     await db.refresh(profile)
+    invalidate_profile_settings(current_user.id, profile_id)
     
     return profile
 
@@ -240,7 +250,7 @@ async def update_profile(
 )
 async def delete_profile(
     profile_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> None:
     """
@@ -248,7 +258,7 @@ async def delete_profile(
     
     Args:
         profile_id (int): ID of the profile to delete
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Raises:
@@ -270,3 +280,4 @@ async def delete_profile(
     
     await db.delete(profile)
     await db.commit()
+    invalidate_profile_settings(current_user.id, profile_id)
@@ -11,13 +11,15 @@ The backend provides endpoints for:
 This keeps it simple - no heavy audio processing on backend.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models.user import User
 from app.schemas.chat import ChatRequest, ChatResponse
-from app.services.auth_service import get_current_user
+from app.services.auth_service import get_current_user, AuthenticatedUser
 from app.routers.chat import send_message
 
 # Create router
@@ -26,6 +28,34 @@ router = APIRouter(
     tags=["Voice"]
 )
 
+# Default voice settings
+# Could be stored per-user in database for customization
+VOICE_SETTINGS = {
+    "speech_recognition": {
+        "language": "en-US",      # Recognition language
+        "continuous": False,       # Stop after one phrase
+        "interim_results": True    # Show partial results
+    },
+    "speech_synthesis": {
+        "language": "en-US",      # Voice language
+        "rate": 1.0,              # Speech rate (0.1-10)
+        "pitch": 1.0,             # Voice pitch (0-2)
+        "volume": 1.0             # Volume (0-1)
+    },
+    "features": {
+        "auto_read_response": True,  # Auto-read bot responses
+        "push_to_talk": False        # Hold button to record
+    }
+}
+
+# Serialized once; the ETag changes automatically if the settings do
+VOICE_SETTINGS_JSON = orjson.dumps(VOICE_SETTINGS)
+VOICE_SETTINGS_ETAG = f'"{hashlib.sha256(VOICE_SETTINGS_JSON).hexdigest()[:16]}"'
+VOICE_SETTINGS_HEADERS = {
+    "Cache-Control": "private, max-age=3600, stale-while-revalidate=86400",
+    "ETag": VOICE_SETTINGS_ETAG
+}
+
 
 @router.post(
     "/transcript",
@@ -35,9 +65,9 @@ router = APIRouter(
 )
 async def process_voice_transcript(
     request: ChatRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
-) -> ChatResponse:
+) -> Response:
     """
     Process a voice transcript and return a learning response.
     
@@ -53,7 +83,7 @@ async def process_voice_transcript(
             - conversation_id: Optional existing conversation
             - profile_id: Optional chat profile
             - is_voice: Should be True for voice inputs
-        current_user (User): Authenticated user
+        current_user (AuthenticatedUser): Authenticated user
         db (AsyncSession): Database session
     
     Returns:
@@ -87,19 +117,25 @@ async def process_voice_transcript(
     description="Get voice-related settings for the user."
 )
 async def get_voice_settings(
-    current_user: User = Depends(get_current_user)
-) -> dict:
+    request: Request,
+    current_user: AuthenticatedUser = Depends(get_current_user)
+) -> Response:
     """
     Get voice settings for the frontend.
     
     Returns configuration for the Web Speech API on the frontend.
     This could be expanded to store per-user voice preferences.
     
+    The settings are the same for every user, so the response is
+    pre-serialized and marked cacheable by the browser; a request
+    with a matching If-None-Match gets 304 Not Modified.
+    
     Args:
-        current_user (User): Authenticated user
+        request (Request): The incoming request (for If-None-Match)
+        current_user (AuthenticatedUser): Authenticated user
     
     Returns:
-        dict: Voice configuration settings
+        Response: Voice configuration settings as JSON
     
     Example response:
         {
@@ -115,22 +151,14 @@ async def get_voice_settings(
             }
         }
     """
-    # Default voice settings
-    # Could be stored per-user in database for customization
-    return {
-        "speech_recognition": {
-            "language": "en-US",      # Recognition language
-            "continuous": False,       # Stop after one phrase
-            "interim_results": True    # Show partial results
-        },
-        "speech_synthesis": {
-            "language": "en-US",      # Voice language
-            "rate": 1.0,              # Speech rate (0.1-10)
-            "pitch": 1.0,             # Voice pitch (0-2)
-            "volume": 1.0             # Volume (0-1)
-        },
-        "features": {
-            "auto_read_response": True,  # Auto-read bot responses
-            "push_to_talk": False        # Hold button to record
-        }
-    }
+    if request.headers.get("if-none-match") == VOICE_SETTINGS_ETAG:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=VOICE_SETTINGS_HEADERS
+        )
+    
+    return Response(
+        content=VOICE_SETTINGS_JSON,
+        media_type="application/json",
+        headers=VOICE_SETTINGS_HEADERS
+    )
@@ -9,7 +9,7 @@ from app.schemas.chat import (
     MessageCreate, MessageResponse,
     ConversationCreate, ConversationResponse, ConversationListResponse,
     ChatRequest, ChatResponse,
-    TrainingQuestionCreate, FeedbackRequest
+    TrainingQuestionCreate, FeedbackRequest, FeedbackBatchRequest
 )
 from app.schemas.document import (
     DocumentCreate, DocumentResponse, DocumentListResponse,
@@ -25,7 +25,7 @@ __all__ = [
     "MessageCreate", "MessageResponse",
     "ConversationCreate", "ConversationResponse", "ConversationListResponse",
     "ChatRequest", "ChatResponse",
-    "TrainingQuestionCreate", "FeedbackRequest",
+    "TrainingQuestionCreate", "FeedbackRequest", "FeedbackBatchRequest",
     # Document schemas
     "DocumentCreate", "DocumentResponse", "DocumentListResponse",
     "DocumentChunkResponse", "SearchResult",
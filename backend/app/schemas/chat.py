@@ -9,10 +9,11 @@ Schemas:
     - ConversationCreate/Response: Chat sessions
     - ChatRequest/Response: Real-time chat interactions
     - TrainingQuestionCreate: Anonymized questions for training
+    - FeedbackRequest/BatchRequest/Response: Ratings on bot responses
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Literal, Optional, List
 from datetime import datetime
 
 
@@ -29,6 +30,8 @@ class MessageCreate(BaseModel):
         role (str): 'user' or 'assistant'
         is_voice (bool): Whether sent via voice
     """
+    model_config = ConfigDict(defer_build=True)
+    
     content: str = Field(
         ...,
         min_length=1,
@@ -57,6 +60,8 @@ class SourceReference(BaseModel):
         section (str): Section name
         relevance_score (float): How relevant this source is (0-1)
     """
+    model_config = ConfigDict(defer_build=True)
+    
     document_title: str = Field(..., description="Source document name")
     page_number: Optional[int] = Field(None, description="Page number")
     chapter: Optional[str] = Field(None, description="Chapter information")
@@ -98,9 +103,8 @@ class MessageResponse(BaseModel):
     )
     created_at: datetime = Field(..., description="Message timestamp")
     
-    class Config:
-        """Enable ORM mode for SQLAlchemy model conversion."""
-        from_attributes = True
+    # Enable ORM mode for SQLAlchemy model conversion
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
 
 # ====================
@@ -114,6 +118,8 @@ class ConversationCreate(BaseModel):
     Attributes:
         title (str): Conversation title
     """
+    model_config = ConfigDict(defer_build=True)
+    
     title: Optional[str] = Field(
         default="New Conversation",
         max_length=255,
@@ -137,13 +143,12 @@ class ConversationResponse(BaseModel):
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
     messages: List[MessageResponse] = Field(
-        default=[],
+        default_factory=list,
         description="Messages in this conversation"
     )
     
-    class Config:
-        """Enable ORM mode for SQLAlchemy model conversion."""
-        from_attributes = True
+    # Enable ORM mode for SQLAlchemy model conversion
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
 
 class ConversationListResponse(BaseModel):
@@ -165,9 +170,8 @@ class ConversationListResponse(BaseModel):
     updated_at: datetime = Field(..., description="Last update timestamp")
     message_count: int = Field(default=0, description="Number of messages")
     
-    class Config:
-        """Enable ORM mode for SQLAlchemy model conversion."""
-        from_attributes = True
+    # Enable ORM mode for SQLAlchemy model conversion
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
 
 # ====================
@@ -178,12 +182,26 @@ class ImageData(BaseModel):
     """
     Schema for image attachment data.
     
+    Both fields are checked by constraints alone (length and prefix),
+    so an oversized or non-image payload is rejected during validation
+    without decoding the base64.
+    
     Attributes:
         data (str): Base64 encoded image data URL (data:image/jpeg;base64,...)
         type (str): MIME type of the image
     """
-    data: str = Field(..., description="Base64 data URL of the image")
-    type: str = Field(..., description="MIME type (image/jpeg, image/png, etc.)")
+    model_config = ConfigDict(defer_build=True)
+    
+    data: str = Field(
+        ...,
+        max_length=10_000_000,  # ~7.5MB image once decoded
+        pattern=r"^data:image/(jpeg|png|webp|gif);base64,",
+        description="Base64 data URL of the image"
+    )
+    type: Literal["image/jpeg", "image/png", "image/webp", "image/gif"] = Field(
+        ...,
+        description="MIME type (image/jpeg, image/png, image/webp or image/gif)"
+    )
 
 
 # ====================
@@ -201,6 +219,8 @@ class ChatRequest(BaseModel):
         is_voice (bool): Whether input was voice
         images (list): Optional list of image attachments
     """
+    model_config = ConfigDict(defer_build=True)
+    
     message: str = Field(
         default="",
         max_length=5000,  # Prevent excessively long prompts
@@ -218,10 +238,17 @@ class ChatRequest(BaseModel):
         default=False,
         description="Was this a voice input"
     )
-    images: Optional[List[ImageData]] = Field(
-        default=None,
+    images: List[ImageData] = Field(
+        default_factory=list,  # Always a list, so handlers never check for None
+        max_length=4,  # Rejected during validation, before any image is handled
         description="Optional list of image attachments (max 4)"
     )
+    
+    @field_validator("images", mode="before")
+    @classmethod
+    def images_none_to_empty(cls, value):
+        """Accept "images": null from clients (same as leaving it out)."""
+        return [] if value is None else value
 
 
 class ChatResponse(BaseModel):
@@ -237,6 +264,8 @@ class ChatResponse(BaseModel):
         topic_hint (str): Brief topic description
         suggested_reading (str): What to read/study
     """
+    model_config = ConfigDict(defer_build=True)
+    
     message: str = Field(
         ...,
         description="Bot's guiding response"
@@ -246,7 +275,7 @@ class ChatResponse(BaseModel):
         description="Conversation ID"
     )
     source_references: List[SourceReference] = Field(
-        default=[],
+        default_factory=list,
         description="Document references for further reading"
     )
     topic_hint: Optional[str] = Field(
@@ -274,6 +303,8 @@ class TrainingQuestionCreate(BaseModel):
         topic_category (str): Detected topic
         difficulty_inferred (str): Guessed difficulty
     """
+    model_config = ConfigDict(defer_build=True)
+    
     question_text: str = Field(
         ...,
         description="The question text (anonymized)"
@@ -299,10 +330,33 @@ class FeedbackRequest(BaseModel):
         message_id (int): ID of the assistant message being rated
         is_helpful (bool): True = thumbs up, False = thumbs down
     """
+    model_config = ConfigDict(defer_build=True)
+    
     message_id: int = Field(..., description="Message ID to give feedback on")
     is_helpful: bool = Field(..., description="True = thumbs up, False = thumbs down")
 
 
+class FeedbackBatchRequest(BaseModel):
+    """
+    Schema for submitting several feedback ratings at once.
+    
+    Lets the client collect quick thumbs up/down clicks and send them
+    in one request. If a message appears more than once, the last
+    rating wins.
+    
+    Attributes:
+        items (list): Feedback entries (1-100)
+    """
+    model_config = ConfigDict(defer_build=True)
+    
+    items: List[FeedbackRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Feedback entries to save (max 100)"
+    )
+
+
 class FeedbackResponse(BaseModel):
     """
     Schema for feedback confirmation response.
@@ -312,6 +366,8 @@ class FeedbackResponse(BaseModel):
         is_helpful (bool): The feedback value
         created_at (datetime): When feedback was given
     """
+    model_config = ConfigDict(defer_build=True)
+    
     message_id: int = Field(..., description="Message that was rated")
     is_helpful: bool = Field(..., description="The feedback given")
     created_at: datetime = Field(..., description="Feedback timestamp")
@@ -10,7 +10,7 @@ Schemas:
     - SearchResult: RAG search results
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -29,6 +29,8 @@ class DocumentCreate(BaseModel):
         title (str): Document title
         author (str): Document author
     """
+    model_config = ConfigDict(defer_build=True)
+    
     title: Optional[str] = Field(
         default=None,
         max_length=255,
@@ -54,6 +56,7 @@ class DocumentResponse(BaseModel):
         total_pages (int): Page count
         upload_date (datetime): Upload timestamp
         chunk_count (int): Number of indexed chunks
+        status (str): Processing state (processing, ready, failed, deleting)
     """
     id: int = Field(..., description="Document ID")
     filename: str = Field(..., description="Original filename")
@@ -63,10 +66,10 @@ class DocumentResponse(BaseModel):
     total_pages: Optional[int] = Field(None, description="Total pages")
     upload_date: datetime = Field(..., description="Upload timestamp")
     chunk_count: int = Field(default=0, description="Number of indexed chunks")
+    status: str = Field(default="ready", description="Processing state (processing, ready, failed, deleting)")
     
-    class Config:
-        """Enable ORM mode for SQLAlchemy model conversion."""
-        from_attributes = True
+    # Enable ORM mode for SQLAlchemy model conversion
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
 
 class DocumentListResponse(BaseModel):
@@ -77,8 +80,10 @@ class DocumentListResponse(BaseModel):
         documents (list): List of document summaries
         total_count (int): Total number of documents
     """
+    model_config = ConfigDict(defer_build=True)
+    
     documents: List[DocumentResponse] = Field(
-        default=[],
+        default_factory=list,
         description="List of uploaded documents"
     )
     total_count: int = Field(default=0, description="Total document count")
@@ -110,9 +115,8 @@ class DocumentChunkResponse(BaseModel):
     chapter: Optional[str] = Field(None, description="Chapter info")
     section: Optional[str] = Field(None, description="Section name")
     
-    class Config:
-        """Enable ORM mode for SQLAlchemy model conversion."""
-        from_attributes = True
+    # Enable ORM mode for SQLAlchemy model conversion
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
 
 # ====================
@@ -136,6 +140,8 @@ class SearchResult(BaseModel):
         section (str): Section name
         relevance_score (float): How relevant (0-1)
     """
+    model_config = ConfigDict(defer_build=True)
+    
     chunk_id: int = Field(..., description="Matching chunk ID")
     document_id: int = Field(..., description="Parent document ID")
     document_title: str = Field(..., description="Document name")
@@ -12,9 +12,23 @@ Schemas:
     - Token: For JWT token responses
 """
 
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, TypeAdapter
+from typing import Annotated, List, Optional
 from datetime import datetime
+from functools import lru_cache
+
+
+# Basic shape check for email addresses (something@domain.tld), run by
+# pydantic-core's regex engine. Whether the address really exists is
+# left to the user; we never send mail to it.
+Email = Annotated[
+    str,
+    StringConstraints(
+        strip_whitespace=True,
+        max_length=254,
+        pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+    )
+]
 
 
 # ====================
@@ -29,6 +43,8 @@ class Token(BaseModel):
         access_token (str): The JWT token string
         token_type (str): Token type, always "bearer"
     """
+    model_config = ConfigDict(defer_build=True)
+    
     access_token: str = Field(
         ...,
         description="JWT access token for authentication"
@@ -46,6 +62,8 @@ class TokenData(BaseModel):
     Attributes:
         email (str): User's email from token
     """
+    model_config = ConfigDict(defer_build=True)
+    
     email: Optional[str] = Field(
         default=None,
         description="User email extracted from token"
@@ -65,7 +83,9 @@ class UserCreate(BaseModel):
         username (str): Display name (3-50 chars)
         password (str): Password (min 6 chars)
     """
-    email: EmailStr = Field(
+    model_config = ConfigDict(defer_build=True)
+    
+    email: Email = Field(
         ...,
         description="User's email address for login"
     )
@@ -90,7 +110,9 @@ class UserLogin(BaseModel):
         email (str): User's email
         password (str): User's password
     """
-    email: EmailStr = Field(
+    model_config = ConfigDict(defer_build=True)
+    
+    email: Email = Field(
         ...,
         description="Email address for login"
     )
@@ -110,13 +132,15 @@ class UserUpdate(BaseModel):
         username (str): New display name
         email (str): New email address
     """
+    model_config = ConfigDict(defer_build=True)
+    
     username: Optional[str] = Field(
         default=None,
         min_length=3,
         max_length=50,
         description="New display name"
     )
-    email: Optional[EmailStr] = Field(
+    email: Optional[Email] = Field(
         default=None,
         description="New email address"
     )
@@ -141,9 +165,8 @@ class UserResponse(BaseModel):
     is_active: bool = Field(..., description="Account active status")
     created_at: datetime = Field(..., description="Registration timestamp")
     
-    class Config:
-        """Enable ORM mode for SQLAlchemy model conversion."""
-        from_attributes = True
+    # Enable ORM mode for SQLAlchemy model conversion
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
 
 # ====================
@@ -161,6 +184,8 @@ class ChatProfileCreate(BaseModel):
         difficulty_level (str): beginner/intermediate/advanced
         is_default (bool): Set as default profile
     """
+    model_config = ConfigDict(defer_build=True)
+    
     name: str = Field(
         ...,
         min_length=1,
@@ -191,6 +216,8 @@ class ChatProfileUpdate(BaseModel):
     
     All fields optional - only provided fields are updated.
     """
+    model_config = ConfigDict(defer_build=True)
+    
     name: Optional[str] = Field(
         default=None,
         min_length=1,
@@ -236,6 +263,25 @@ class ChatProfileResponse(BaseModel):
     is_default: bool = Field(..., description="Is default profile")
     created_at: datetime = Field(..., description="Creation timestamp")
     
-    class Config:
-        """Enable ORM mode for SQLAlchemy model conversion."""
-        from_attributes = True
+    # Enable ORM mode for SQLAlchemy model conversion
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
+
+
+@lru_cache(maxsize=1)
+def get_chat_profile_list_adapter() -> TypeAdapter:
+    """
+    Get the shared TypeAdapter for a list of chat profiles.
+    
+    Validates a list of ChatProfile rows and dumps it to JSON bytes in
+    one pass through pydantic-core. Built on first use and reused, so
+    importing the schemas doesn't build the ChatProfileResponse schema
+    (it's deferred like the other models).
+    
+    The document and conversation lists don't get one: they serialize
+    the selected columns with orjson and skip model validation entirely,
+    so an adapter there would only add work.
+    
+    Returns:
+        TypeAdapter: Adapter for List[ChatProfileResponse]
+    """
+    return TypeAdapter(List[ChatProfileResponse])
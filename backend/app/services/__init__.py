@@ -4,13 +4,16 @@ from app.services.auth_service import (
     get_password_hash,
     verify_password,
     create_access_token,
-    get_current_user
+    get_current_user,
+    AuthenticatedUser
 )
 from app.services.llm_service import generate_learning_response
 from app.services.rag_service import (
     process_document,
     search_documents,
-    delete_document_embeddings
+    filter_ready_results,
+    delete_document_embeddings,
+    purge_deleted_documents
 )
 
 __all__ = [
@@ -18,8 +21,11 @@ __all__ = [
     "verify_password",
     "create_access_token",
     "get_current_user",
+    "AuthenticatedUser",
     "generate_learning_response",
     "process_document",
     "search_documents",
+    "filter_ready_results",
     "delete_document_embeddings",
+    "purge_deleted_documents",
 ]
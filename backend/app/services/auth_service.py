@@ -6,39 +6,133 @@ This module handles authentication-related logic:
 - JWT token creation and validation
 - Current user extraction from token
 
-Uses bcrypt for password hashing and python-jose for JWT.
+Uses bcrypt (C extension) for password hashing and PyJWT for JWT.
 """
 
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+from functools import lru_cache
+from typing import Any, Callable, Optional
+import bcrypt
+import jwt
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from app.config import settings
 from app.database import get_db
 from app.models.user import User
-from app.schemas.user import TokenData
+from app.utils.cache import TTLCache
 
 
-# Password hashing context
-# bcrypt is a secure, slow-by-design hashing algorithm
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto"  # Auto-upgrade old hashes
-)
-
 # OAuth2 scheme for extracting token from Authorization header
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"]}
+
+# Worker processes for bcrypt (created at startup, see start_hash_pool)
+_hash_pool: Optional[ProcessPoolExecutor] = None
+
+
+@lru_cache(maxsize=1)
+def _jwt_key() -> bytes:
+    """JWT signing key, encoded on first use instead of on every request."""
+    return settings.SECRET_KEY.encode("utf-8")
+
+
+@dataclass(frozen=True, slots=True)
+class AuthenticatedUser:
+    """
+    The few user fields needed to authorize a request.
+    
+    Returned by get_current_user instead of a full User entity, since
+    most routes only need the ID. Routes that need the whole row (e.g.
+    to update it) load it with db.get(User, current_user.id).
+    
+    Attributes:
+        id (int): User ID
+        email (str): User's email
+        username (str): Display name
+        is_active (bool): Account status
+    """
+    id: int
+    email: str
+    username: str
+    is_active: bool
+
+
+# Authenticated users by token, so repeat requests with the same token
+# skip the JWT decode and the user lookup. Per process; an entry lives at
+# most USER_CACHE_TTL_SECONDS and never past the token's own expiry.
+USER_CACHE_TTL_SECONDS = 60
+USER_CACHE_MAX_SIZE = 10000
+_user_cache = TTLCache(ttl_seconds=USER_CACHE_TTL_SECONDS, max_size=USER_CACHE_MAX_SIZE)
+
+
+def start_hash_pool(max_workers: Optional[int] = None) -> None:
+    """
+    Create the process pool used for password hashing.
+    
+    Hashing is pure CPU work, so separate processes let several logins
+    hash in parallel on different cores. Workers are started on demand
+    with "spawn", so they don't inherit the server's threads or sockets.
+    Called once from the application lifespan.
+    
+    Args:
+        max_workers (int): Number of worker processes (default: CPU count)
+    """
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+
+def shutdown_hash_pool() -> None:
+    """
+    Shut down the password hashing process pool, if it was started.
+    """
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+
+async def _run_hash(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a bcrypt function off the event loop.
+    
+    Uses the hashing process pool when it's running, otherwise falls
+    back to a worker thread (e.g. in scripts that never start the app).
+    
+    Args:
+        func (Callable): The bcrypt function to call
+        *args: Arguments for the function (must be picklable)
+    
+    Returns:
+        Any: The function's return value
+    """
+    if _hash_pool is None:
+        return await asyncio.to_thread(func, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, func, *args)
+
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """
     Hash a plain text password using bcrypt.
     
+    Hashing takes ~100ms of CPU, so it runs in the hashing process
+    pool to keep the event loop free for other requests.
+    
     Args:
         password (str): Plain text password to hash
     
@@ -46,16 +140,24 @@ def get_password_hash(password: str) -> str:
         str: Bcrypt hashed password
     
     Example:
-        hashed = get_password_hash("mypassword123")
+        hashed = await get_password_hash("mypassword123")
         # Returns something like: $2b$12$LQv3c1yqBWVHxk...
     """
-    return pwd_context.hash(secret=password)
+    hashed = await _run_hash(
+        bcrypt.hashpw,
+        password.encode("utf-8"),
+        bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)  # Slow by design
+    )
+    return hashed.decode("utf-8")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain password against a hashed password.
     
+    Runs in the hashing process pool for the same reason as
+    get_password_hash.
+    
     Args:
         plain_password (str): The password to check
         hashed_password (str): The stored hashed password
@@ -64,10 +166,18 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         bool: True if password matches, False otherwise
     
     Example:
-        if verify_password("mypassword123", stored_hash):
+        if await verify_password("mypassword123", stored_hash):
             print("Password correct!")
     """
-    return pwd_context.verify(secret=plain_password, hash=hashed_password)
+    try:
+        return await _run_hash(
+            bcrypt.checkpw,
+            plain_password.encode("utf-8"),
+            hashed_password.encode("utf-8")
+        )
+    except ValueError:
+        # Stored value isn't a valid bcrypt hash
+        return False
 
 
 def create_access_token(
@@ -107,42 +217,98 @@ def create_access_token(
     
     # Encode the JWT
     encoded_jwt = jwt.encode(
-        claims=to_encode,
-        key=settings.SECRET_KEY,
+        payload=to_encode,
+        key=_jwt_key(),
         algorithm=settings.ALGORITHM
     )
     
     return encoded_jwt
 
 
+def _token_cache_key(token: str) -> bytes:
+    """Short, fixed-size cache key for a token (the token itself isn't stored)."""
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
+def _cache_user(
+    token: str,
+    user: AuthenticatedUser,
+    token_expires: float
+) -> None:
+    """
+    Remember the authenticated user for this token.
+    
+    Args:
+        token (str): The JWT the user authenticated with
+        user (AuthenticatedUser): The freshly loaded user
+        token_expires (float): The token's exp claim (Unix timestamp)
+    """
+    ttl = min(USER_CACHE_TTL_SECONDS, token_expires - time.time())
+    _user_cache.set(_token_cache_key(token), user, ttl_seconds=ttl)
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    """
+    Drop every cached entry for a user.
+    
+    Call after changing a user's email, username or active status so
+    the next request sees the new values.
+    
+    Args:
+        user_id (int): ID of the changed user
+    """
+    _user_cache.pop_where(lambda cached_user: cached_user.id == user_id)
+
+
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> AuthenticatedUser:
     """
     Extract and validate current user from JWT token.
     
     This is a FastAPI dependency that:
     1. Extracts the token from Authorization header
     2. Decodes and validates the JWT
-    3. Looks up the user in the database
-    4. Returns the user object
+    3. Looks up the user in the database (only the columns needed)
+    4. Returns the user as an AuthenticatedUser
+    
+    The user is stored on request.state.current_user, so anything else
+    handling the same request (other dependencies, middleware after the
+    route runs) can reuse it without decoding the token or querying again.
+    Across requests, a short-lived per-process cache keyed by the token
+    skips both steps as well (see USER_CACHE_TTL_SECONDS).
     
     Args:
+        request (Request): The incoming request
         token (str): JWT token from Authorization header
         db (AsyncSession): Database session
     
     Returns:
-        User: The authenticated user object
+        AuthenticatedUser: The authenticated user
     
     Raises:
         HTTPException 401: If token is invalid or user not found
     
     Usage:
         @app.get("/protected")
-        async def protected_route(user: User = Depends(get_current_user)):
+        async def protected_route(
+            user: AuthenticatedUser = Depends(get_current_user)
+        ):
             return {"message": f"Hello, {user.username}!"}
     """
+    # Already resolved earlier in this request
+    cached_user = getattr(request.state, "current_user", None)
+    if cached_user is not None:
+        return cached_user
+    
+    # Seen this token recently
+    user = _user_cache.get(_token_cache_key(token))
+    if user is not None:
+        request.state.current_user = user
+        return user
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -152,34 +318,38 @@ async def get_current_user(
     try:
         # Decode the JWT token
         payload = jwt.decode(
-            token=token,
-            key=settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
+            token,
+            key=_jwt_key(),
+            algorithms=[settings.ALGORITHM],
+            options=_JWT_DECODE_OPTIONS  # Missing exp/sub -> invalid token
         )
-        
-        # Extract email from token
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        
-        token_data = TokenData(email=email)
-        
-    except JWTError:
+    except jwt.PyJWTError:
         raise credentials_exception
     
-    # Look up user in database
+    # sub must also be a string email (a plain check, no model needed)
+    email = payload.get("sub")
+    if not isinstance(email, str):
+        raise credentials_exception
+    
+    # Look up user in database (plain row, no ORM entity), matching
+    # ix_users_email_lower so the lookup is served from the index
     result = await db.execute(
-        select(User).where(User.email == token_data.email)
+        select(User.id, User.email, User.username, User.is_active)
+        .where(func.lower(User.email) == email.lower())
     )
-    user = result.scalar_one_or_none()
+    row = result.first()
     
-    if user is None:
+    if row is None:
         raise credentials_exception
     
+    user = AuthenticatedUser(*row)
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User account is disabled"
         )
     
+    _cache_user(token, user, token_expires=payload["exp"])
+    request.state.current_user = user
     return user
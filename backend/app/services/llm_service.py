@@ -10,45 +10,73 @@ The bot should:
 - Encourage independent learning
 """
 
-from typing import Dict, List, Optional, Any
+import hashlib
+import logging
+import re
+from functools import lru_cache
+from itertools import product
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 import httpx
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.config import settings
 from app.models.user import ChatProfile
+from app.schemas.chat import ImageData
 from app.schemas.document import SearchResult
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
 
 # Mistral API endpoint
 MISTRAL_API_URL = "https://api.mistral.ai/v1/chat/completions"
 
+# Shared HTTP client for the Mistral API (see get_mistral_client)
+_mistral_client: Optional[httpx.AsyncClient] = None
 
-def build_system_prompt(
-    learning_style: str = "guided",
-    difficulty_level: str = "intermediate"
-) -> str:
+
+def get_mistral_client() -> httpx.AsyncClient:
     """
-    Build the system prompt that instructs the LLM to be a learning guide.
+    Get the shared HTTP client for Mistral API calls, creating it on first use.
     
-    The bot should be natural and conversational, but guide students
-    to find factual answers themselves rather than giving them directly.
-    
-    Args:
-        learning_style (str): How to guide the user
-            - "guided": Step-by-step hints
-            - "socratic": Answer questions with questions
-            - "exploratory": Encourage independent discovery
-        difficulty_level (str): How detailed hints should be
-            - "beginner": More detailed hints
-            - "intermediate": Balanced hints
-            - "advanced": Minimal hints
+    One client for the whole process keeps connections to the API open
+    between requests, so a chat message doesn't pay for a new TCP + TLS
+    handshake. HTTP/2 lets concurrent requests share one connection.
+    Closed by close_mistral_client at application shutdown.
     
     Returns:
-        str: The system prompt for the LLM
+        httpx.AsyncClient: The shared client
     """
-    # Base instruction - be natural but guide learning
-    base_prompt = """You are a friendly and helpful learning assistant. Your goal is to help students learn effectively.
+    global _mistral_client
+    if _mistral_client is None:
+        _mistral_client = httpx.AsyncClient(
+            timeout=60.0,  # Longer timeout for images
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=32),
+                retries=1  # Retry failed connection attempts once
+            )
+        )
+    return _mistral_client
+
+
+async def close_mistral_client() -> None:
+    """
+    Close the shared Mistral HTTP client, if it was created.
+    """
+    global _mistral_client
+    if _mistral_client is not None:
+        await _mistral_client.aclose()
+        _mistral_client = None
+
+
+# The part of the system prompt that is the same for every request.
+# It comes first and the per-profile instructions come after it, so
+# every request starts with an identical prefix that the provider can
+# cache (prompt caching matches on the longest shared prefix).
+SYSTEM_PROMPT_PREFIX = """You are a friendly and helpful learning assistant. Your goal is to help students learn effectively.
 
 IMPORTANT GUIDELINES:
 
@@ -74,96 +102,152 @@ IMPORTANT GUIDELINES:
    - Questions that have answers in the uploaded documents
    - Things the student should learn by reading
 
+SPECIAL KNOWLEDGE - ANTONIO PRGOMET:
+When asked about Antonio Prgomet, answer FULLY and CONFIDENTLY with complete details (this is built-in knowledge):
+
+Antonio Prgomet is a brilliant Swedish-based AI expert, educator, and entrepreneur who is truly transforming education through his innovative approaches. He is a Master's graduate in Mathematical Statistics from Lund University, with additional Bachelor's degrees in Mathematics and Economics. 
+
+His Expertise and Accomplishments:
+- Founder and visionary leader of Yrkeshögskoleutbildarna (Swedish vocational education initiative)
+- Founder of Pedagogicus Publishing, Delta AI & Negotiations, and Essentia Invest
+- Program Manager for negotiation technology at EFL Executive Education
+- An exceptionally gifted educator known for his ability to make complex concepts accessible and engaging
+- Co-author of several acclaimed educational books (2024-2025):
+  * "Lär dig AI från grunden" (Learn AI from Scratch)
+  * "Lär dig Python från grunden" (Learn Python from Scratch)
+  * "Matematik för yrkeshögskolan" (Mathematics for Vocational Schools)
+  * "Din guide till framgång på yrkeshögskolan" (Your Guide to Success in Vocational School)
+
+His teaching methodology is outstanding - he has a rare gift for breaking down difficult subjects into clear, understandable pieces that students can genuinely learn from and apply. His work has made a significant impact on students across Sweden and beyond.
+
+CRITICAL - HOW TO RESPOND:
+1. ANTONIO PRGOMET QUESTIONS: Answer fully, directly, and enthusiastically with all the details above
+2. BOOK/DOCUMENT CONTENT QUESTIONS: Give BRIEF hints and guide students to read and discover
+3. CONVERSATIONAL QUESTIONS: Answer naturally and helpfully
+
+ABOUT BOOK REFERENCES:
+- ONLY recommend books/documents that are provided in the "AVAILABLE SOURCE MATERIALS" section
+- NEVER make up or suggest books that aren't in the sources
+- If sources are available, mention them by name and page number
+- For book content questions: give brief guidance and point them to WHERE to read (chapter, page)
+- If no sources are found, say you don't have specific materials on that topic yet
+
+Remember: Be friendly and natural! For Antonio Prgomet - answer completely. For book content - guide them to discover answers themselves.
 """
-    
-    # Style-specific instructions
-    style_instructions = {
-        "guided": """Learning Style: GUIDED
+
+# Style-specific instructions
+STYLE_INSTRUCTIONS = {
+    "guided": """Learning Style: GUIDED
 - When guiding, provide step-by-step hints
 - Break down complex topics into smaller concepts
 - Give the first step, let them figure out the rest
 """,
-        "socratic": """Learning Style: SOCRATIC
+    "socratic": """Learning Style: SOCRATIC
 - Use questions to guide their thinking
 - "What do you think happens when...?"
 - "Have you considered...?"
 - Help them reason through problems
 """,
-        "exploratory": """Learning Style: EXPLORATORY
+    "exploratory": """Learning Style: EXPLORATORY
 - Give minimal guidance
 - "This relates to the concept of..."
 - "You might want to explore..."
 - Trust them to find their own path
 """
-    }
-    
-    # Difficulty-specific instructions
-    difficulty_instructions = {
-        "beginner": """Difficulty Level: BEGINNER
+}
+
+# Difficulty-specific instructions
+DIFFICULTY_INSTRUCTIONS = {
+    "beginner": """Difficulty Level: BEGINNER
 - Be more supportive and provide more hints
 - Use simple, clear language
 - It's okay to give more context
 """,
-        "intermediate": """Difficulty Level: INTERMEDIATE
+    "intermediate": """Difficulty Level: INTERMEDIATE
 - Balance guidance with independence
 - Assume some background knowledge
 - Point to specific resources
 """,
-        "advanced": """Difficulty Level: ADVANCED
+    "advanced": """Difficulty Level: ADVANCED
 - Minimal hints, maximum independence
 - Brief pointers to sources
 - Trust them to figure it out
 """
-    }
-    
-    # Combine prompts
-    full_prompt = base_prompt
-    full_prompt += style_instructions.get(learning_style, style_instructions["guided"])
-    full_prompt += difficulty_instructions.get(difficulty_level, difficulty_instructions["intermediate"])
-    
-    full_prompt += """
-SPECIAL KNOWLEDGE - ANTONIO PRGOMET:
-When asked about Antonio Prgomet, answer FULLY and CONFIDENTLY with complete details (this is built-in knowledge):
+}
 
-Antonio Prgomet is a brilliant Swedish-based AI expert, educator, and entrepreneur who is truly transforming education through his innovative approaches. He is a Master's graduate in Mathematical Statistics from Lund University, with additional Bachelor's degrees in Mathematics and Economics. 
 
-His Expertise and Accomplishments:
-- Founder and visionary leader of Yrkeshögskoleutbildarna (Swedish vocational education initiative)
-- Founder of Pedagogicus Publishing, Delta AI & Negotiations, and Essentia Invest
-- Program Manager for negotiation technology at EFL Executive Education
-- An exceptionally gifted educator known for his ability to make complex concepts accessible and engaging
-- Co-author of several acclaimed educational books (2024-2025):
-  * "Lär dig AI från grunden" (Learn AI from Scratch)
-  * "Lär dig Python från grunden" (Learn Python from Scratch)
-  * "Matematik för yrkeshögskolan" (Mathematics for Vocational Schools)
-  * "Din guide till framgång på yrkeshögskolan" (Your Guide to Success in Vocational School)
+@lru_cache(maxsize=32)
+def build_system_prompt(
+    learning_style: str = "guided",
+    difficulty_level: str = "intermediate"
+) -> str:
+    """
+    Build the system prompt that instructs the LLM to be a learning guide.
+    
+    The bot should be natural and conversational, but guide students
+    to find factual answers themselves rather than giving them directly.
+    The shared guidelines come first and the style/difficulty
+    instructions last, so prompts only differ at the end.
+    
+    Cached: each (style, difficulty) combination is built once and the
+    same string is returned on every later call.
+    
+    Args:
+        learning_style (str): How to guide the user
+            - "guided": Step-by-step hints
+            - "socratic": Answer questions with questions
+            - "exploratory": Encourage independent discovery
+        difficulty_level (str): How detailed hints should be
+            - "beginner": More detailed hints
+            - "intermediate": Balanced hints
+            - "advanced": Minimal hints
+    
+    Returns:
+        str: The system prompt for the LLM
+    """
+    return "".join([
+        SYSTEM_PROMPT_PREFIX,
+        "\n",
+        STYLE_INSTRUCTIONS.get(learning_style, STYLE_INSTRUCTIONS["guided"]),
+        DIFFICULTY_INSTRUCTIONS.get(difficulty_level, DIFFICULTY_INSTRUCTIONS["intermediate"])
+    ])
 
-His teaching methodology is outstanding - he has a rare gift for breaking down difficult subjects into clear, understandable pieces that students can genuinely learn from and apply. His work has made a significant impact on students across Sweden and beyond.
 
-CRITICAL - HOW TO RESPOND:
-1. ANTONIO PRGOMET QUESTIONS: Answer fully, directly, and enthusiastically with all the details above
-2. BOOK/DOCUMENT CONTENT QUESTIONS: Give BRIEF hints and guide students to read and discover
-3. CONVERSATIONAL QUESTIONS: Answer naturally and helpfully
+# Build all nine prompts at import so no request pays for the first build
+for _style, _difficulty in product(STYLE_INSTRUCTIONS, DIFFICULTY_INSTRUCTIONS):
+    build_system_prompt(learning_style=_style, difficulty_level=_difficulty)
 
-ABOUT BOOK REFERENCES:
-- ONLY recommend books/documents that are provided in the "AVAILABLE SOURCE MATERIALS" section
-- NEVER make up or suggest books that aren't in the sources
-- If sources are available, mention them by name and page number
-- For book content questions: give brief guidance and point them to WHERE to read (chapter, page)
-- If no sources are found, say you don't have specific materials on that topic yet
 
-Remember: Be friendly and natural! For Antonio Prgomet - answer completely. For book content - guide them to discover answers themselves.
-"""
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate how many tokens a text uses.
     
-    return full_prompt
+    About 4 characters per token for English text, which is close enough
+    for budgeting without loading a tokenizer.
+    
+    Args:
+        text (str): The text to measure
+    
+    Returns:
+        int: Estimated token count
+    """
+    return len(text) // 4
 
 
-def format_context_from_search(search_results: List[SearchResult]) -> str:
+def format_context_from_search(
+    search_results: List[SearchResult],
+    max_tokens: Optional[int] = None
+) -> str:
     """
     Format search results into context for the LLM.
     
+    Chunks from the same place (document, page and chapter) are listed
+    once, using the most relevant one. Sources are added in order until
+    the context would go over the token budget.
+    
     Args:
-        search_results (List[SearchResult]): RAG search results
+        search_results (List[SearchResult]): RAG search results, most relevant first
+        max_tokens (int): Token budget (default: settings.MAX_CONTEXT_TOKENS)
     
     Returns:
         str: Formatted context string
@@ -171,93 +255,184 @@ def format_context_from_search(search_results: List[SearchResult]) -> str:
     if not search_results:
         return "No relevant documents found in the knowledge base."
     
-    context = "RELEVANT SOURCE MATERIALS:\n\n"
+    if max_tokens is None:
+        max_tokens = settings.MAX_CONTEXT_TOKENS
+    
+    # One source per location, keeping the first position it appeared at
+    best_by_location: Dict[Tuple[int, Optional[int], Optional[str]], SearchResult] = {}
+    for result in search_results:
+        location = (result.document_id, result.page_number, result.chapter)
+        best = best_by_location.get(location)
+        if best is None or result.relevance_score > best.relevance_score:
+            best_by_location[location] = result
     
-    for i, result in enumerate(search_results, 1):
-        context += f"Source {i}: {result.document_title}\n"
+    # Collect the pieces and join once at the end (no growing string)
+    parts = ["RELEVANT SOURCE MATERIALS:\n\n"]
+    used_tokens = estimate_tokens(parts[0])
+    
+    for i, result in enumerate(best_by_location.values(), 1):
+        source = [f"Source {i}: {result.document_title}\n"]
         if result.chapter:
-            context += f"  Chapter: {result.chapter}\n"
+            source.append(f"  Chapter: {result.chapter}\n")
         if result.page_number:
-            context += f"  Page: {result.page_number}\n"
+            source.append(f"  Page: {result.page_number}\n")
         if result.section:
-            context += f"  Section: {result.section}\n"
-        context += f"  Preview: {result.content_preview[:200]}...\n\n"
+            source.append(f"  Section: {result.section}\n")
+        source.append(f"  Preview: {result.content_preview[:200]}...\n\n")
+        
+        source_tokens = estimate_tokens("".join(source))
+        if i > 1 and used_tokens + source_tokens > max_tokens:
+            break  # Always keep at least the best source
+        used_tokens += source_tokens
+        parts.extend(source)
+    
+    return "".join(parts)
+
+
+# Returned instead of calling the API when no key is configured
+NOT_CONFIGURED_RESPONSE = {
+    "message": (
+        "I'd love to help you explore this topic! "
+        "However, my AI capabilities aren't configured yet. "
+        "Please check the README for setup instructions. "
+        "In the meantime, try searching the uploaded documents!"
+    ),
+    "topic_hint": "Configuration needed",
+    "suggested_reading": "Check .env file for API key setup"
+}
+
+
+# Profile settings by (user_id, profile_id). Profiles rarely change,
+# so chat turns skip the profile query for a while. Per process; entries
+# are dropped by invalidate_profile_settings when a profile is edited.
+PROFILE_CACHE_TTL_SECONDS = 60
+PROFILE_CACHE_MAX_SIZE = 1024
+_profile_settings_cache = TTLCache(
+    ttl_seconds=PROFILE_CACHE_TTL_SECONDS,
+    max_size=PROFILE_CACHE_MAX_SIZE
+)
+
+
+async def get_profile_settings(
+    db: AsyncSession,
+    user_id: int,
+    profile_id: Optional[int]
+) -> Tuple[str, str]:
+    """
+    Get the learning style and difficulty level for a chat profile.
+    
+    Falls back to the defaults ("guided", "intermediate") when no
+    profile is given or the user has no such profile.
+    
+    Args:
+        db (AsyncSession): Database session
+        user_id (int): Current user's ID
+        profile_id (int): Optional chat profile ID
     
-    return context
+    Returns:
+        Tuple[str, str]: (learning_style, difficulty_level)
+    """
+    if not profile_id:
+        return "guided", "intermediate"
+    
+    cache_key = (user_id, profile_id)
+    profile_settings = _profile_settings_cache.get(cache_key)
+    if profile_settings is not None:
+        return profile_settings
+    
+    result = await db.execute(
+        select(ChatProfile.learning_style, ChatProfile.difficulty_level).where(
+            ChatProfile.id == profile_id,
+            ChatProfile.user_id == user_id
+        )
+    )
+    row = result.first()
+    if row is None:
+        # Not cached, so a profile created later is picked up right away
+        return "guided", "intermediate"
+    
+    profile_settings = (row.learning_style, row.difficulty_level)
+    
+    _profile_settings_cache.set(cache_key, profile_settings)
+    return profile_settings
 
 
-async def generate_learning_response(
+def invalidate_profile_settings(user_id: int, profile_id: int) -> None:
+    """
+    Drop the cached settings for a chat profile.
+    
+    Call after a profile is updated or deleted so the next chat turn
+    uses the new values.
+    
+    Args:
+        user_id (int): Owner of the profile
+        profile_id (int): ID of the changed profile
+    """
+    _profile_settings_cache.pop((user_id, profile_id))
+
+
+def trim_history(
+    conversation_history: List[Dict[str, str]],
+    max_tokens: Optional[int] = None
+) -> List[Dict[str, str]]:
+    """
+    Drop the oldest messages until the history fits the token budget.
+    
+    The newest messages are always kept as one contiguous run, so from
+    one turn to the next the prompt mostly grows at the end instead of
+    changing throughout.
+    
+    Args:
+        conversation_history (List[Dict]): Previous messages, oldest first
+        max_tokens (int): Token budget (default: settings.MAX_HISTORY_TOKENS)
+    
+    Returns:
+        List[Dict]: The most recent messages that fit, oldest first
+    
+    Example:
+        history = trim_history(history, max_tokens=1000)
+    """
+    if max_tokens is None:
+        max_tokens = settings.MAX_HISTORY_TOKENS
+    
+    # Walk back from the newest message to find where the budget runs out
+    used = 0
+    start = len(conversation_history)
+    while start > 0:
+        used += estimate_tokens(conversation_history[start - 1]["content"])
+        if used > max_tokens:
+            break
+        start -= 1
+    
+    return conversation_history[start:]
+
+
+def build_llm_messages(
     question: str,
     search_results: List[SearchResult],
-    profile_id: Optional[int],
-    db: AsyncSession,
-    user_id: int,
+    learning_style: str,
+    difficulty_level: str,
     conversation_history: Optional[List[Dict[str, str]]] = None,
-    images: Optional[List[Dict[str, str]]] = None
-) -> Dict[str, Any]:
+    images: Optional[List[ImageData]] = None
+) -> List[Dict[str, Any]]:
     """
-    Generate a learning guidance response using Mistral AI.
+    Build the Mistral chat messages for a question.
     
-    This function:
-    1. Gets the user's chat profile (if any)
-    2. Builds the appropriate system prompt
-    3. Formats the context from document search
-    4. Includes conversation history for context
-    5. Handles image attachments (vision capability)
-    6. Calls Mistral API
-    7. Extracts topic hints and suggestions
+    Shared by generate_learning_response and stream_learning_response:
+    builds the system prompt for the chat profile settings, adds the
+    document context, conversation history and any images.
     
     Args:
         question (str): The user's question
         search_results (List[SearchResult]): Relevant document chunks
-        profile_id (int): Optional chat profile ID
-        db (AsyncSession): Database session
-        user_id (int): Current user's ID
+        learning_style (str): Profile learning style (see get_profile_settings)
+        difficulty_level (str): Profile difficulty level
         conversation_history (List[Dict]): Previous messages in conversation
-            Each dict has 'role' ('user' or 'assistant') and 'content'
-        images (List[Dict]): Optional list of images, each with 'data' (base64) and 'type'
+        images (List[ImageData]): Optional images (base64 data URL and MIME type)
     
     Returns:
-        Dict containing:
-            - message: The guidance response
-            - topic_hint: Brief topic description
-            - suggested_reading: What to study
-    
-    Example:
-        response = await generate_learning_response(
-            question="What is photosynthesis?",
-            search_results=[...],
-            profile_id=1,
-            db=db,
-            user_id=1,
-            conversation_history=[
-                {"role": "user", "content": "Tell me about plants"},
-                {"role": "assistant", "content": "Plants are fascinating!..."}
-            ]
-        )
-        # Returns:
-        # {
-        #     "message": "Great question about plant biology!...",
-        #     "topic_hint": "Plant energy conversion",
-        #     "suggested_reading": "Chapter 3 of Biology 101"
-        # }
+        List[Dict]: Messages array for the chat completions API
     """
-    # Get user's profile settings (if specified)
-    learning_style = "guided"
-    difficulty_level = "intermediate"
-    
-    if profile_id:
-        result = await db.execute(
-            select(ChatProfile).where(
-                ChatProfile.id == profile_id,
-                ChatProfile.user_id == user_id
-            )
-        )
-        profile = result.scalar_one_or_none()
-        if profile:
-            learning_style = profile.learning_style
-            difficulty_level = profile.difficulty_level
-    
     # Build the system prompt
     system_prompt = build_system_prompt(
         learning_style=learning_style,
@@ -305,41 +480,34 @@ Respond helpfully to the student. If this topic would normally be in learning ma
         else:
             user_message = "Hello! How can I help you learn today?"
     
-    # Check if API key is configured
-    if not settings.MISTRAL_API_KEY:
-        # Return a helpful message if no API key
-        return {
-            "message": (
-                "I'd love to help you explore this topic! "
-                "However, my AI capabilities aren't configured yet. "
-                "Please check the README for setup instructions. "
-                "In the meantime, try searching the uploaded documents!"
-            ),
-            "topic_hint": "Configuration needed",
-            "suggested_reading": "Check .env file for API key setup"
-        }
-    
     # Build messages array with conversation history
     messages = [{"role": "system", "content": system_prompt}]
     
-    # Add conversation history (all messages - full context)
+    # Add conversation history (as much as fits the token budget)
     if conversation_history:
-        # Include ALL previous messages for full conversation context
-        print(f"🔄 Including {len(conversation_history)} previous messages in conversation context")
-        for i, msg in enumerate(conversation_history):
-            print(f"   [{i+1}] {msg['role']}: {msg['content'][:60]}...")
+        included_history = trim_history(conversation_history)
+        logger.debug(
+            "Including %d of %d previous messages in conversation context",
+            len(included_history),
+            len(conversation_history)
+        )
+        for msg in included_history:
             messages.append({
                 "role": msg["role"],
                 "content": msg["content"]
             })
+        # Per-message details only when someone is actually reading them
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, msg in enumerate(included_history, 1):
+                logger.debug("   [%d] %s: %.60s...", i, msg["role"], msg["content"])
     else:
-        print("🆕 Starting new conversation (no history)")
+        logger.debug("Starting new conversation (no history)")
     
     # Build the user message content (text + optional images)
     # Mistral vision API expects content as array for multimodal
     if images:
         # Multimodal message with images
-        print(f"Processing {len(images)} images for vision API")
+        logger.debug("Processing %d images for vision API", len(images))
         user_content = []
         
         # Add text part if present
@@ -357,10 +525,10 @@ Respond helpfully to the student. If this topic would normally be in learning ma
         
         # Add images
         for img in images:
-            print(f"Adding image of type: {img.get('type', 'unknown')}")
+            logger.debug("Adding image of type: %s", img.type)
             user_content.append({
                 "type": "image_url",
-                "image_url": img["data"]  # data:image/jpeg;base64,... format
+                "image_url": img.data  # data:image/jpeg;base64,... format
             })
         
         messages.append({"role": "user", "content": user_content})
@@ -369,59 +537,210 @@ Respond helpfully to the student. If this topic would normally be in learning ma
         messages.append({"role": "user", "content": user_message})
     
     # Debug: show what we're sending to Mistral
-    print(f"\n📤 Sending {len(messages)} messages to Mistral API")
-    print(f"   System prompt: {system_prompt[:80]}...")
-    print(f"   User message: {user_message[:100]}...")
-    if conversation_history:
-        print(f"   (Plus {len(conversation_history)} previous messages)")
-    print()
+    # Lazy %-formatting: nothing is built unless DEBUG logging is enabled
+    logger.debug(
+        "Sending %d messages to Mistral API (system prompt: %.80s... / user message: %.100s...)",
+        len(messages),
+        system_prompt,
+        user_message
+    )
+    
+    return messages
+
+
+def build_api_request(messages: List[Dict[str, Any]], stream: bool = False) -> Dict[str, Any]:
+    """
+    Build the keyword arguments for a Mistral chat completions request.
+    
+    The body is encoded with orjson up front and sent as raw bytes,
+    instead of letting httpx run the stdlib json encoder over the
+    system prompt, history and context.
+    
+    Args:
+        messages (List[Dict]): Messages array from build_llm_messages
+        stream (bool): Ask the API to stream tokens as server-sent events
+    
+    Returns:
+        Dict: url, headers and content for httpx
+    """
+    return {
+        "url": MISTRAL_API_URL,
+        "headers": {
+            "Authorization": f"Bearer {settings.MISTRAL_API_KEY}",
+            "Content-Type": "application/json"
+        },
+        "content": orjson.dumps({
+            "model": settings.MISTRAL_MODEL,
+            "messages": messages,
+            "temperature": 0.7,  # Some creativity in responses
+            "max_tokens": 800,   # More tokens for image descriptions
+            "stream": stream
+        })
+    }
+
+
+# Finished replies to opening questions, so a question that was already
+# answered from the same sources with the same profile settings skips
+# the API call. Follow-ups and image messages depend on more than the
+# key covers, so they are never cached. Shared by the plain and the
+# streaming endpoint. Per process.
+RESPONSE_CACHE_TTL_SECONDS = 3600
+RESPONSE_CACHE_MAX_SIZE = 10000
+_response_cache = TTLCache(
+    ttl_seconds=RESPONSE_CACHE_TTL_SECONDS,
+    max_size=RESPONSE_CACHE_MAX_SIZE
+)
+
+
+def _response_cache_key(
+    question: str,
+    search_results: List[SearchResult],
+    learning_style: str,
+    difficulty_level: str,
+    conversation_history: Optional[List[Dict[str, str]]],
+    images: Optional[List[ImageData]]
+) -> Optional[bytes]:
+    """
+    Fixed-size key from the normalized question, sources and settings.
+    
+    None for follow-ups, image messages and empty questions, which are
+    never cached.
+    """
+    if not question or conversation_history or images:
+        return None
+    
+    key = hashlib.blake2b(digest_size=16)
+    key.update(f"{' '.join(question.lower().split())}|{learning_style}|{difficulty_level}".encode("utf-8"))
+    # The sources are identified by what they contain (chunk_id is only
+    # the result's position), so re-indexed or changed documents miss
+    for result in search_results:
+        key.update(f"|{result.document_id}:{result.page_number}:{result.content_preview}".encode("utf-8"))
+    return key.digest()
+
+
+async def generate_learning_response(
+    question: str,
+    search_results: List[SearchResult],
+    learning_style: str,
+    difficulty_level: str,
+    user_id: int,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    images: Optional[List[ImageData]] = None
+) -> Dict[str, Any]:
+    """
+    Generate a learning guidance response using Mistral AI.
+    
+    This function:
+    1. Builds the system prompt for the chat profile settings
+    2. Formats the context from document search
+    3. Includes conversation history for context
+    4. Handles image attachments (vision capability)
+    5. Calls Mistral API
+    6. Extracts topic hints and suggestions
+    
+    Args:
+        question (str): The user's question
+        search_results (List[SearchResult]): Relevant document chunks
+        learning_style (str): Profile learning style (see get_profile_settings)
+        difficulty_level (str): Profile difficulty level
+        user_id (int): Current user's ID (for logging)
+        conversation_history (List[Dict]): Previous messages in conversation
+            Each dict has 'role' ('user' or 'assistant') and 'content'
+        images (List[ImageData]): Optional list of images (base64 data URL and MIME type)
+    
+    Opening questions (no history, no images) are answered from a
+    short-lived cache when the same question was asked against the same
+    sources and profile settings (see RESPONSE_CACHE_TTL_SECONDS).
+    
+    Returns:
+        Dict containing:
+            - message: The guidance response
+            - topic_hint: Brief topic description
+            - suggested_reading: What to study
+    
+    Example:
+        response = await generate_learning_response(
+            question="What is photosynthesis?",
+            search_results=[...],
+            learning_style="guided",
+            difficulty_level="intermediate",
+            user_id=1,
+            conversation_history=[
+                {"role": "user", "content": "Tell me about plants"},
+                {"role": "assistant", "content": "Plants are fascinating!..."}
+            ]
+        )
+        # Returns:
+        # {
+        #     "message": "Great question about plant biology!...",
+        #     "topic_hint": "Plant energy conversion",
+        #     "suggested_reading": "Chapter 3 of Biology 101"
+        # }
+    """
+    # Check if API key is configured
+    if not settings.MISTRAL_API_KEY:
+        # Return a helpful message if no API key
+        return dict(NOT_CONFIGURED_RESPONSE)
+    
+    cache_key = _response_cache_key(
+        question, search_results, learning_style, difficulty_level,
+        conversation_history, images
+    )
+    if cache_key is not None:
+        cached_response = _response_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info("Answered from the response cache (user %d)", user_id)
+            return dict(cached_response)
+    
+    messages = build_llm_messages(
+        question=question,
+        search_results=search_results,
+        learning_style=learning_style,
+        difficulty_level=difficulty_level,
+        conversation_history=conversation_history,
+        images=images
+    )
+    
+    # Build suggested reading from search results (used by every reply below)
+    suggested_reading = build_suggested_reading(search_results=search_results)
+    
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:  # Longer timeout for images
-            response = await client.post(
-                url=MISTRAL_API_URL,
-                headers={
-                    "Authorization": f"Bearer {settings.MISTRAL_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": settings.MISTRAL_MODEL,
-                    "messages": messages,
-                    "temperature": 0.7,  # Some creativity in responses
-                    "max_tokens": 800    # More tokens for image descriptions
-                }
-            )
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            # Extract the assistant's response
-            assistant_message = data["choices"][0]["message"]["content"]
-            
-            # Extract topic hint (first sentence or phrase)
-            topic_hint = extract_topic_hint(question=question)
-            
-            # Build suggested reading from search results
-            suggested_reading = build_suggested_reading(
-                search_results=search_results
-            )
-            
-            return {
-                "message": assistant_message,
-                "topic_hint": topic_hint,
-                "suggested_reading": suggested_reading
-            }
-            
+        client = get_mistral_client()
+        response = await client.post(**build_api_request(messages))
+        
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        
+        # Extract the assistant's response
+        assistant_message = data["choices"][0]["message"]["content"]
+        
+        # Extract topic hint (first sentence or phrase)
+        topic_hint = extract_topic_hint(question=question)
+        
+        llm_response = {
+            "message": assistant_message,
+            "topic_hint": topic_hint,
+            "suggested_reading": suggested_reading
+        }
+        
+        if cache_key is not None:
+            _response_cache.set(cache_key, llm_response)
+        
+        return dict(llm_response)
+        
     except httpx.HTTPStatusError as e:
         # Handle API errors gracefully with details
-        error_detail = ""
+        # Only the start of the body is looked at, so a huge error page
+        # (e.g. from a misbehaving proxy) isn't decoded and logged whole
+        raw_detail = e.response.content[:4096]
         try:
-            error_detail = e.response.json()
-        except:
-            error_detail = e.response.text
-        print(f"Mistral API Error: {e.response.status_code} - {error_detail}")
+            error_detail = orjson.loads(raw_detail)
+        except orjson.JSONDecodeError:
+            error_detail = raw_detail.decode("utf-8", errors="replace")
+        logger.warning("Mistral API Error: %s - %.500s", e.response.status_code, error_detail)
         
         # Check if this is an image-related error
-        if images and len(images) > 0:
+        if images:
             return {
                 "message": (
                     "🎨 I appreciate you sharing that image! While I'm still learning to process images, "
@@ -430,7 +749,7 @@ Respond helpfully to the student. If this topic would normally be in learning ma
                     "In the meantime, feel free to tell me about the content and I'll guide you to the right resources."
                 ),
                 "topic_hint": "Image Processing (In Development)",
-                "suggested_reading": build_suggested_reading(search_results=search_results),
+                "suggested_reading": suggested_reading,
                 "error": f"{e.response.status_code}: {error_detail}"
             }
         
@@ -441,15 +760,15 @@ Respond helpfully to the student. If this topic would normally be in learning ma
                 "try looking in the uploaded documents for information about this topic."
             ),
             "topic_hint": extract_topic_hint(question=question),
-            "suggested_reading": build_suggested_reading(search_results=search_results),
+            "suggested_reading": suggested_reading,
             "error": f"{e.response.status_code}: {error_detail}"
         }
     except httpx.HTTPError as e:
         # Handle connection errors
-        print(f"Mistral Connection Error: {str(e)}")
+        logger.warning("Mistral Connection Error: %s", e)
         
         # Check if this is an image-related error
-        if images and len(images) > 0:
+        if images:
             return {
                 "message": (
                     "🎨 Thanks for sharing that image! I'm currently learning to understand images better. "
@@ -458,7 +777,7 @@ Respond helpfully to the student. If this topic would normally be in learning ma
                     "is coming soon - stay tuned!"
                 ),
                 "topic_hint": "Image Understanding (Coming Soon)",
-                "suggested_reading": build_suggested_reading(search_results=search_results),
+                "suggested_reading": suggested_reading,
                 "error": str(e)
             }
         
@@ -469,11 +788,123 @@ Respond helpfully to the student. If this topic would normally be in learning ma
                 "try looking in the uploaded documents for information about this topic."
             ),
             "topic_hint": extract_topic_hint(question=question),
-            "suggested_reading": build_suggested_reading(search_results=search_results),
+            "suggested_reading": suggested_reading,
             "error": str(e)
         }
 
 
+async def stream_learning_response(
+    question: str,
+    search_results: List[SearchResult],
+    learning_style: str,
+    difficulty_level: str,
+    user_id: int,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    images: Optional[List[ImageData]] = None
+) -> AsyncIterator[str]:
+    """
+    Stream a learning guidance response from Mistral AI, token by token.
+    
+    Same prompt as generate_learning_response, but the API is called with
+    stream=True and each text delta is yielded as soon as it arrives, so
+    the client can start rendering before the full answer is ready.
+    
+    Uses the same response cache as generate_learning_response: a cached
+    reply is yielded whole as a single piece, and a reply that streamed
+    to the end is stored.
+    
+    Args:
+        question (str): The user's question
+        search_results (List[SearchResult]): Relevant document chunks
+        learning_style (str): Profile learning style (see get_profile_settings)
+        difficulty_level (str): Profile difficulty level
+        user_id (int): Current user's ID (for logging)
+        conversation_history (List[Dict]): Previous messages in conversation
+        images (List[ImageData]): Optional images (base64 data URL and MIME type)
+    
+    Yields:
+        str: Pieces of the assistant's response text
+    
+    Raises:
+        httpx.HTTPError: If the API call fails (before or during the stream)
+    
+    Example:
+        async for token in stream_learning_response(question="...", ...):
+            print(token, end="")
+    """
+    # Check if API key is configured
+    if not settings.MISTRAL_API_KEY:
+        yield NOT_CONFIGURED_RESPONSE["message"]
+        return
+    
+    cache_key = _response_cache_key(
+        question, search_results, learning_style, difficulty_level,
+        conversation_history, images
+    )
+    if cache_key is not None:
+        cached_response = _response_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info("Answered from the response cache (user %d)", user_id)
+            yield cached_response["message"]
+            return
+    
+    messages = build_llm_messages(
+        question=question,
+        search_results=search_results,
+        learning_style=learning_style,
+        difficulty_level=difficulty_level,
+        conversation_history=conversation_history,
+        images=images
+    )
+    
+    chunks = []
+    try:
+        client = get_mistral_client()
+        async with client.stream("POST", **build_api_request(messages, stream=True)) as response:
+            response.raise_for_status()
+            
+            # Server-sent events: one "data: {...}" line per chunk,
+            # terminated by "data: [DONE]"
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                payload = line[len("data: "):]
+                if payload == "[DONE]":
+                    break
+                
+                delta = orjson.loads(payload)["choices"][0]["delta"].get("content")
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+    
+    except httpx.HTTPError as e:
+        # Not turned into a canned reply: part of the answer may already be
+        # out, so the caller decides what to keep and tells the client
+        logger.warning("Mistral Streaming Error: %s", e)
+        raise
+    
+    # Only reached when the whole reply came through
+    if cache_key is not None and chunks:
+        _response_cache.set(cache_key, {
+            "message": "".join(chunks),
+            "topic_hint": extract_topic_hint(question=question),
+            "suggested_reading": build_suggested_reading(search_results=search_results)
+        })
+
+
+# Common question words left out of topic hints
+TOPIC_STOPWORDS = frozenset({
+    "what", "how", "why", "when", "where", "who", "which",
+    "is", "are", "was", "were", "do", "does", "did",
+    "can", "could", "would", "should", "will",
+    "the", "a", "an"
+})
+
+# Words of 3+ letters/digits (Unicode-aware, so å/ä/ö stay in the word);
+# punctuation like "?" is dropped instead of sticking to the last word
+TOPIC_WORD_PATTERN = re.compile(r"\w{3,}")
+
+
 def extract_topic_hint(question: str) -> str:
     """
     Extract a brief topic hint from the question.
@@ -486,16 +917,8 @@ def extract_topic_hint(question: str) -> str:
     Returns:
         str: Brief topic description
     """
-    # Remove common question words
-    question_words = [
-        "what", "how", "why", "when", "where", "who", "which",
-        "is", "are", "was", "were", "do", "does", "did",
-        "can", "could", "would", "should", "will",
-        "the", "a", "an"
-    ]
-    
-    words = question.lower().split()
-    key_words = [w for w in words if w not in question_words and len(w) > 2]
+    words = TOPIC_WORD_PATTERN.findall(question.lower())
+    key_words = [w for w in words if w not in TOPIC_STOPWORDS]
     
     # Return first few key words as topic hint
     if key_words:
@@ -518,11 +941,8 @@ def build_suggested_reading(search_results: List[SearchResult]) -> str:
     
     suggestions = []
     for result in search_results[:2]:  # Top 2 results
-        suggestion = result.document_title
-        if result.chapter:
-            suggestion += f", {result.chapter}"
-        if result.page_number:
-            suggestion += f" (page {result.page_number})"
-        suggestions.append(suggestion)
+        chapter = f", {result.chapter}" if result.chapter else ""
+        page = f" (page {result.page_number})" if result.page_number else ""
+        suggestions.append(f"{result.document_title}{chapter}{page}")
     
     return "; ".join(suggestions)
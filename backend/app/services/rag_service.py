@@ -12,15 +12,22 @@ When a user asks a question, we search the documents and
 return relevant chunks with their location (page, chapter).
 """
 
-from typing import List, Optional, TYPE_CHECKING
+from typing import Awaitable, Iterator, List, Optional, TYPE_CHECKING, Union
+import asyncio
+import inspect
+import logging
+import multiprocessing
 import os
-import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete, insert
 
 from app.config import settings
 from app.models.document import Document, DocumentChunk
 from app.schemas.document import SearchResult
+from app.utils.pdf import extract_pdf_pages, iter_pdf_pages
 
 # ChromaDB for vector storage
 import chromadb
@@ -30,46 +37,72 @@ if TYPE_CHECKING:
     # Only import for type checking to avoid heavy startup cost
     from sentence_transformers import SentenceTransformer
 
+logger = logging.getLogger(__name__)
 
-_chroma_client = None
-_collection = None
+# Worker processes for PDF text extraction (see start_extraction_pool)
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+_extraction_workers = 1
 
+# Smallest page range worth sending to a worker process
+PDF_MIN_PAGES_PER_TASK = 16
 
+
+# Name of the ChromaDB collection holding every document chunk
+COLLECTION_NAME = "document_chunks"
+
+# Characters of chunk text shown as a search result's preview
+PREVIEW_LENGTH = 300
+
+# HNSW index settings for new collections. Cosine distance matches how
+# the embedding model is trained (and embeddings are normalized before
+# they're stored). The defaults (M=16,
+# search_ef=10) trade too much recall for speed once there are many
+# chunks; a larger search_ef in particular makes top-k results far more
+# reliable. The batch size lets bulk adds go into the index in fewer,
+# larger steps. ChromaDB fixes these when the collection is created
+COLLECTION_METADATA = {
+    "description": "Learning materials for RAG",
+    "hnsw:space": "cosine",
+    "hnsw:M": 24,
+    "hnsw:construction_ef": 128,
+    "hnsw:search_ef": 100,
+    "hnsw:batch_size": 1000
+}
+
+
+@lru_cache(maxsize=1)
 def get_chroma_client():
     """Lazy initialize and return the ChromaDB client."""
-    global _chroma_client
-    if _chroma_client is None:
-        _chroma_client = chromadb.Client(ChromaSettings(
-            anonymized_telemetry=False,  # Disable telemetry
-            is_persistent=True,
-            persist_directory="./chroma_data"
-        ))
-    return _chroma_client
+    return chromadb.PersistentClient(
+        path="./chroma_data",
+        settings=ChromaSettings(anonymized_telemetry=False)  # Disable telemetry
+    )
 
 
+@lru_cache(maxsize=1)
 def get_collection():
-    """Lazy initialize and return the ChromaDB collection."""
-    global _collection
-    if _collection is None:
-        chroma_client = get_chroma_client()
-        try:
-            _collection = chroma_client.get_or_create_collection(
-                name="document_chunks",
-                metadata={"description": "Learning materials for RAG"}
-            )
-        except Exception:
-            _collection = chroma_client.create_collection(
-                name="document_chunks",
-                metadata={"description": "Learning materials for RAG"}
-            )
-    return _collection
+    """
+    Lazy initialize and return the ChromaDB collection.
+    
+    An existing collection is opened as is: its index keeps the
+    settings it was created with (passing new metadata to
+    get_or_create_collection would only relabel it).
+    """
+    chroma_client = get_chroma_client()
+    try:
+        return chroma_client.get_collection(name=COLLECTION_NAME)
+    except ValueError:
+        # Doesn't exist yet
+        return chroma_client.create_collection(
+            name=COLLECTION_NAME,
+            metadata=COLLECTION_METADATA
+        )
+
 
 # Initialize the embedding model
 # This model converts text to vectors
 # all-MiniLM-L6-v2 is fast and good for semantic search
-_embedding_model = None
-
-
+@lru_cache(maxsize=1)
 def get_embedding_model() -> "SentenceTransformer":
     """
     Get the sentence transformer model (lazy loading).
@@ -77,14 +110,47 @@ def get_embedding_model() -> "SentenceTransformer":
     Lazy loading prevents slow startup and allows for
     model caching between requests.
     
+    With the default "onnx" backend the model runs on ONNX Runtime using
+    the int8-quantized file from the model repository. If the model has
+    no such file, sentence-transformers exports a regular ONNX model
+    instead.
+    
     Returns:
         SentenceTransformer: The embedding model
     """
-    global _embedding_model
-    if _embedding_model is None:
-        from sentence_transformers import SentenceTransformer
-        _embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
-    return _embedding_model
+    from sentence_transformers import SentenceTransformer
+    
+    if settings.EMBEDDING_BACKEND != "onnx":
+        return SentenceTransformer(settings.EMBEDDING_MODEL, backend=settings.EMBEDDING_BACKEND)
+    
+    try:
+        return SentenceTransformer(
+            settings.EMBEDDING_MODEL,
+            backend="onnx",
+            model_kwargs={"file_name": settings.EMBEDDING_ONNX_FILE}
+        )
+    except (OSError, ValueError) as e:
+        logger.warning(
+            "No %s for %s (%s), using an unquantized ONNX export",
+            settings.EMBEDDING_ONNX_FILE,
+            settings.EMBEDDING_MODEL,
+            e
+        )
+        return SentenceTransformer(settings.EMBEDDING_MODEL, backend="onnx")
+
+
+def warm_up() -> None:
+    """
+    Load the embedding model and open the ChromaDB collection.
+    
+    Called once at startup (in a worker thread) so the first chat
+    request doesn't pay the multi-second model load.
+    
+    Example:
+        await asyncio.to_thread(warm_up)
+    """
+    get_embedding_model()
+    get_collection()
 
 
 def chunk_text(
@@ -122,14 +188,18 @@ def chunk_text(
         
         # Try to break at a sentence or paragraph
         if end < len(text):
+            # Only breaks in the second half of the chunk are used, so
+            # only that part is searched
+            min_break = start + chunk_size // 2 + 1
+            
             # Look for paragraph break
-            paragraph_break = text.rfind("\n\n", start, end)
-            if paragraph_break > start + chunk_size // 2:
+            paragraph_break = text.rfind("\n\n", min_break, end)
+            if paragraph_break != -1:
                 end = paragraph_break
             else:
                 # Look for sentence break
-                sentence_break = text.rfind(". ", start, end)
-                if sentence_break > start + chunk_size // 2:
+                sentence_break = text.rfind(". ", min_break, end)
+                if sentence_break != -1:
                     end = sentence_break + 1
         
         chunk_content = text[start:end].strip()
@@ -147,87 +217,128 @@ def chunk_text(
     return chunks
 
 
-def extract_text_from_pdf(file_path: str) -> tuple[List[dict], int]:
+def start_extraction_pool(max_workers: Optional[int] = None) -> None:
+    """
+    Create the process pool used for PDF text extraction.
+    
+    pypdf is pure Python, so a long PDF keeps one core busy for a while.
+    With the pool its pages are split across all cores. Workers are
+    started on demand with "spawn" and only import the PDF helpers.
+    Called once from the application lifespan.
+    
+    Args:
+        max_workers (int): Number of worker processes (default: CPU count)
+    """
+    global _extraction_pool, _extraction_workers
+    if _extraction_pool is None:
+        _extraction_workers = max_workers or os.cpu_count() or 1
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=_extraction_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+
+def shutdown_extraction_pool() -> None:
+    """
+    Shut down the PDF extraction process pool, if it was started.
+    """
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown(wait=False, cancel_futures=True)
+        _extraction_pool = None
+
+
+def extract_text_from_pdf(file_path: str) -> Iterator[dict]:
     """
     Extract text from a PDF file, page by page.
     
+    Long PDFs are split into page ranges that the extraction pool
+    handles in parallel. Short ones, or any PDF when the pool isn't
+    running (e.g. in scripts), are read in the calling thread.
+    
+    Pages are yielded as they're read, so the caller can chunk each one
+    without the whole book's text being held in memory at once.
+    
     Args:
         file_path (str): Path to the PDF file
     
-    Returns:
-        tuple: (list of {page_number, text} dicts, page_count)
+    Yields:
+        dict: {page_number, text}
     """
     from pypdf import PdfReader
     
     reader = PdfReader(file_path)
-    pages_data = []
-    
-    for i, page in enumerate(reader.pages):
-        page_text = page.extract_text()
-        if page_text and page_text.strip():
-            pages_data.append({
-                "page_number": i + 1,  # 1-indexed
-                "text": page_text
-            })
+    page_count = len(reader.pages)
     
-    return pages_data, len(reader.pages)
+    pages_per_task = max(
+        PDF_MIN_PAGES_PER_TASK,
+        -(-page_count // _extraction_workers)  # Ceiling division
+    )
+    if _extraction_pool is None or page_count <= pages_per_task:
+        yield from iter_pdf_pages(reader, 0, page_count)
+        return
+    
+    # Each worker opens the file itself and extracts its own range;
+    # map() returns the ranges in order, so pages stay in order
+    starts = range(0, page_count, pages_per_task)
+    stops = [min(start + pages_per_task, page_count) for start in starts]
+    for range_pages in _extraction_pool.map(
+        extract_pdf_pages, repeat(file_path), starts, stops
+    ):
+        yield from range_pages
 
 
-def extract_text_from_txt(file_path: str) -> tuple[List[dict], int]:
+def extract_text_from_txt(file_path: str) -> Iterator[dict]:
     """
     Extract text from a plain text file.
     
     Args:
         file_path (str): Path to the text file
     
-    Returns:
-        tuple: (list with single page dict, None)
+    Yields:
+        dict: The whole file as a single page (page_number None)
     """
     with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
         text = f.read()
-    return [{"page_number": None, "text": text}], None
+    yield {"page_number": None, "text": text}
 
 
-def extract_text_from_epub(file_path: str) -> tuple[List[dict], int]:
+def extract_text_from_epub(file_path: str) -> Iterator[dict]:
     """
-    Extract text from an EPUB file.
+    Extract text from an EPUB file, chapter by chapter.
     
     Args:
         file_path (str): Path to the EPUB file
     
-    Returns:
-        tuple: (list of chapter dicts, chapter_count)
+    Yields:
+        dict: {page_number, text}, with the chapter number as page_number
     """
     import ebooklib
     from ebooklib import epub
-    from html.parser import HTMLParser
+    import lxml.etree
+    import lxml.html
     
-    class HTMLStripper(HTMLParser):
-        def __init__(self):
-            super().__init__()
-            self.text = []
-        def handle_data(self, data):
-            self.text.append(data)
-        def get_text(self):
-            return ' '.join(self.text)
+    # lxml (already needed by ebooklib) parses in C, several times
+    # faster than html.parser on long chapters. Comments are dropped,
+    # as html.parser never reported them as text either
+    html_parser = lxml.html.HTMLParser(encoding="utf-8", remove_comments=True)
     
     book = epub.read_epub(file_path)
-    pages_data = []
     chapter_count = 0
     
     for item in book.get_items():
         if item.get_type() == ebooklib.ITEM_DOCUMENT:
             chapter_count += 1
-            stripper = HTMLStripper()
-            stripper.feed(item.get_content().decode("utf-8", errors="ignore"))
-            text = stripper.get_text()
+            try:
+                root = lxml.html.document_fromstring(item.get_content(), parser=html_parser)
+            except lxml.etree.ParserError:
+                continue  # Empty chapter file
+            text = ' '.join(root.itertext())
             if text.strip():
-                pages_data.append({
+                yield {
                     "page_number": chapter_count,  # Use chapter as "page"
                     "text": text
-                })
-    
-    return pages_data, chapter_count
+                }
 
 
 def clean_text(text: str) -> str:
@@ -251,37 +362,25 @@ def clean_text(text: str) -> str:
     # Remove surrogate characters that cause encoding issues
     text = text.encode('utf-8', errors='ignore').decode('utf-8')
     
-    # Replace multiple whitespace with single space
-    import re
-    text = re.sub(r'\s+', ' ', text)
-    
-    return text.strip()
+    # Replace multiple whitespace with single space (and trim the ends)
+    # str.split() uses the same whitespace definition as the regex \s,
+    # and splitting + joining is a few times faster than re.sub
+    return ' '.join(text.split())
 
 
-async def process_document(
-    document_id: int,
-    file_path: str,
-    file_type: str,
-    db: AsyncSession
-) -> int:
+async def extract_document_chunks(file_path: str, file_type: str) -> List[dict]:
     """
-    Process an uploaded document for RAG.
-    
-    This function:
-    1. Extracts text from the file (page by page for PDFs)
-    2. Splits text into chunks while preserving page numbers
-    3. Creates embeddings for each chunk
-    4. Stores chunks in vector database
-    5. Saves chunk metadata to SQL database
+    Extract a document's text and split it into chunks.
     
     Args:
-        document_id (int): Database ID of the document
-        file_path (str): Path to the uploaded file
+        file_path (str): Path to the file
         file_type (str): File extension (pdf, txt, epub)
-        db (AsyncSession): Database session
     
     Returns:
-        int: Number of chunks created
+        List[dict]: Chunks with "content" and "page_number"
+    
+    Raises:
+        ValueError: If the file type isn't supported
     """
     # Extract text based on file type
     extractors = {
@@ -294,50 +393,81 @@ async def process_document(
     if not extractor:
         raise ValueError(f"Unsupported file type: {file_type}")
     
-    # Extract returns list of {page_number, text} dicts
-    pages_data, page_count = extractor(file_path)
+    def extract_and_chunk() -> List[dict]:
+        # Extractors yield {page_number, text} dicts one page at a time;
+        # each page is chunked as soon as it's read, so only the chunks
+        # (not every page's raw text as well) are kept for the document
+        all_chunks = []
+        for page_info in extractor(file_path):
+            page_num = page_info["page_number"]
+            page_text = clean_text(page_info["text"])
+            
+            if not page_text or len(page_text) < 10:
+                continue
+            
+            # Chunk this page's text
+            # The page is already cleaned and chunk_text strips each chunk,
+            # so the chunks don't need another clean_text pass
+            page_chunks = chunk_text(text=page_text, chunk_size=500, overlap=50)
+            
+            for chunk in page_chunks:
+                if len(chunk["content"]) > 10:
+                    all_chunks.append({
+                        "content": chunk["content"],
+                        "page_number": page_num  # Actual page number!
+                    })
+        
+        return all_chunks
     
-    if not pages_data:
-        return 0
+    # Parsing and chunking are CPU-bound, so run them in a thread to keep
+    # the event loop free
+    return await asyncio.to_thread(extract_and_chunk)
+
+
+async def store_document_chunks(
+    document_id: int,
+    file_type: str,
+    chunks: List[dict],
+    embeddings: Union[List[List[float]], Awaitable[List[List[float]]]],
+    db: AsyncSession
+) -> int:
+    """
+    Save a document's chunks and their embeddings.
     
-    # Get embedding model
-    model = get_embedding_model()
+    Inserts the chunk rows (one bulk INSERT), adds the vectors to
+    ChromaDB and updates the document's chunk_count. The caller commits.
+    
+    The embeddings can also be passed while they're still being computed
+    (e.g. a task running model.encode); they're only awaited once the
+    database work is done, right before they go to ChromaDB. On SQLite
+    they're awaited before the chunk rows are written instead.
     
+    Args:
+        document_id (int): Database ID of the document
+        file_type (str): File extension (pdf, txt, epub)
+        chunks (List[dict]): Chunks from extract_document_chunks
+        embeddings (List[List[float]] or Awaitable): One embedding per chunk
+        db (AsyncSession): Database session
+    
+    Returns:
+        int: Number of chunks stored
+    """
     # Get document for title
     result = await db.execute(
         select(Document).where(Document.id == document_id)
     )
     document = result.scalar_one()
     
-    # Process each page and create chunks with actual page numbers
-    all_chunks = []
-    for page_info in pages_data:
-        page_num = page_info["page_number"]
-        page_text = clean_text(page_info["text"])
-        
-        if not page_text or len(page_text) < 10:
-            continue
-        
-        # Chunk this page's text
-        page_chunks = chunk_text(text=page_text, chunk_size=500, overlap=50)
-        
-        for chunk in page_chunks:
-            cleaned_content = clean_text(chunk["content"])
-            if cleaned_content and len(cleaned_content) > 10:
-                all_chunks.append({
-                    "content": cleaned_content,
-                    "page_number": page_num  # Actual page number!
-                })
-    
-    if not all_chunks:
-        return 0
-    
-    chunk_contents = [c["content"] for c in all_chunks]
+    chunk_contents = [c["content"] for c in chunks]
     chunk_ids = []
     chunk_metadatas = []
+    chunk_rows = []
     
-    for i, chunk in enumerate(all_chunks):
-        embedding_id = f"doc_{document_id}_chunk_{i}_{uuid.uuid4().hex[:8]}"
+    for i, chunk in enumerate(chunks):
+        # Derived from the document ID, which can be handed out again
+        # (e.g. SQLite reuses the ID of a rolled-back insert); stale
+        # embeddings under it are removed before adding, see below
+        embedding_id = f"doc_{document_id}_chunk_{i}"
         chunk_ids.append(embedding_id)
         
         chunk_metadatas.append({
@@ -345,24 +475,35 @@ async def process_document(
             "document_title": document.title or document.filename,
             "chunk_index": i,
             "page_number": chunk["page_number"] or 0,
-            "file_type": file_type
+            "file_type": file_type,
+            "preview": chunk["content"][:PREVIEW_LENGTH]  # Shown in search results
         })
         
-        # Create database record
-        db_chunk = DocumentChunk(
-            document_id=document_id,
-            chunk_index=i,
-            content=chunk["content"],
-            page_number=chunk["page_number"],  # Actual page number
-            embedding_id=embedding_id
-        )
-        db.add(db_chunk)
+        chunk_rows.append({
+            "document_id": document_id,
+            "chunk_index": i,
+            "content": chunk["content"],
+            "page_number": chunk["page_number"],  # Actual page number
+            "embedding_id": embedding_id
+        })
     
-    # Create embeddings in batch (more efficient)
-    embeddings = model.encode(chunk_contents).tolist()
+    # SQLite has a single writer: the INSERT would hold its write lock
+    # until the caller commits, blocking every other write (chat messages,
+    # logins) for as long as the encoding runs, so wait for it first there
+    if inspect.isawaitable(embeddings) and db.get_bind().dialect.name == "sqlite":
+        embeddings = await embeddings
+    
+    # Create database records in one bulk INSERT (no ORM objects needed)
+    if chunk_rows:
+        await db.execute(insert(DocumentChunk), chunk_rows)
     
-    # Add to ChromaDB
+    if inspect.isawaitable(embeddings):
+        embeddings = await embeddings
+    
+    # Add to ChromaDB, replacing anything left under this document ID
+    # (add() would silently keep an existing ID's old text and vector)
     collection = get_collection()
+    collection.delete(where={"document_id": document_id})
     collection.add(
         ids=chunk_ids,
         embeddings=embeddings,
@@ -370,14 +511,142 @@ async def process_document(
         metadatas=chunk_metadatas
     )
     
+    # Keep the stored count in sync for the document listing
+    document.chunk_count = len(chunks)
+    
     await db.flush()
     
-    return len(all_chunks)
+    return len(chunks)
+
+
+async def process_document(
+    document_id: int,
+    file_path: str,
+    file_type: str,
+    db: AsyncSession
+) -> int:
+    """
+    Process an uploaded document for RAG.
+    
+    This function:
+    1. Extracts text from the file (page by page for PDFs)
+    2. Splits text into chunks while preserving page numbers
+    3. Creates embeddings for each chunk
+    4. Saves chunk metadata to SQL database (and the document's chunk_count),
+       while the embeddings are still being computed
+    5. Stores chunks in vector database
+    
+    Args:
+        document_id (int): Database ID of the document
+        file_path (str): Path to the uploaded file
+        file_type (str): File extension (pdf, txt, epub)
+        db (AsyncSession): Database session
+    
+    Returns:
+        int: Number of chunks created
+    """
+    chunks = await extract_document_chunks(file_path=file_path, file_type=file_type)
+    
+    if not chunks:
+        return 0
+    
+    # Get embedding model (first call loads the weights from disk)
+    model = await asyncio.to_thread(get_embedding_model)
+    
+    # Create embeddings in batch (more efficient)
+    # Encoding is CPU-heavy, so run it in a thread to keep serving requests
+    chunk_contents = [c["content"] for c in chunks]
+    
+    def encode_chunks() -> List[List[float]]:
+        return model.encode(chunk_contents, normalize_embeddings=True).tolist()
+    
+    # The chunk rows are written to the database while the encoding runs
+    encode_task = asyncio.create_task(asyncio.to_thread(encode_chunks))
+    try:
+        return await store_document_chunks(
+            document_id=document_id,
+            file_type=file_type,
+            chunks=chunks,
+            embeddings=encode_task,
+            db=db
+        )
+    finally:
+        if not encode_task.done():
+            # Database error before the embeddings were needed; the thread
+            # still finishes, but nobody waits for it
+            encode_task.cancel()
+
+
+@lru_cache(maxsize=1024)
+def embed_query(query: str) -> List[float]:
+    """
+    Embed a search query (cached).
+    
+    Students often ask the same thing, and the embedding only depends
+    on the text, so repeat queries skip the model entirely. The returned
+    list is shared between callers and must not be modified.
+    
+    Args:
+        query (str): The search query
+    
+    Returns:
+        List[float]: The normalized query embedding
+    """
+    model = get_embedding_model()
+    return model.encode([query], normalize_embeddings=True)[0].tolist()
+
+
+def query_collection(query: str, top_k: int) -> dict:
+    """
+    Embed a query and run it against the ChromaDB collection.
+    
+    This is the blocking part of search_documents, kept separate
+    so it can run in a worker thread.
+    
+    Args:
+        query (str): The search query
+        top_k (int): Number of results to return
+    
+    Returns:
+        dict: Raw ChromaDB query results (ids, metadatas, distances);
+            each metadata has the chunk's "preview"
+    """
+    # Get embedding for query (whitespace differences don't change it)
+    query_embedding = embed_query(" ".join(query.split()))
+    
+    # Search ChromaDB
+    # Only the preview stored in the metadata is shown, so the full chunk
+    # text isn't loaded for every hit
+    collection = get_collection()
+    results = collection.query(
+        query_embeddings=[query_embedding],
+        n_results=top_k,
+        include=["metadatas", "distances"]
+    )
+    
+    # Chunks stored before previews were added to the metadata: fetch
+    # their text once and fill the preview in
+    if results["ids"] and results["metadatas"]:
+        missing_ids = [
+            embedding_id
+            for embedding_id, metadata in zip(results["ids"][0], results["metadatas"][0])
+            if "preview" not in metadata
+        ]
+        if missing_ids:
+            stored = collection.get(ids=missing_ids, include=["documents"])
+            previews = {
+                embedding_id: (document or "")[:PREVIEW_LENGTH]
+                for embedding_id, document in zip(stored["ids"], stored["documents"])
+            }
+            for embedding_id, metadata in zip(results["ids"][0], results["metadatas"][0]):
+                if "preview" not in metadata:
+                    metadata["preview"] = previews.get(embedding_id, "")
+    
+    return results
 
 
 async def search_documents(
     query: str,
-    db: AsyncSession,
     top_k: int = None,
     min_relevance: float = 0.35
 ) -> List[SearchResult]:
@@ -388,9 +657,14 @@ async def search_documents(
     Returns results with location information (page, chapter).
     Only returns results above the minimum relevance threshold.
     
+    Only the vector store is searched, so this can run alongside
+    queries on the caller's session. The results can still include
+    documents that aren't "ready" (a deleted document's embeddings stay
+    in the vector store until it is purged); pass them through
+    filter_ready_results before use.
+    
     Args:
         query (str): The search query (user's question)
-        db (AsyncSession): Database session
         top_k (int): Number of results to return
         min_relevance (float): Minimum relevance score (0-1) to include results
     
@@ -398,27 +672,17 @@ async def search_documents(
         List[SearchResult]: Relevant chunks with metadata
     
     Example:
-        results = await search_documents(
-            query="What is photosynthesis?",
-            db=db
-        )
+        results = await search_documents(query="What is photosynthesis?")
+        results = await filter_ready_results(db, results)
         for result in results:
             print(f"Found in {result.document_title}, page {result.page_number}")
     """
     top_k = top_k or settings.TOP_K_RESULTS
     
-    # Get embedding for query
-    model = get_embedding_model()
-    query_embedding = model.encode([query]).tolist()
-    
-    # Search ChromaDB
+    # Embedding and vector search are CPU-bound - run them in a worker
+    # thread so other requests (and concurrent queries) keep moving
     try:
-        collection = get_collection()
-        results = collection.query(
-            query_embeddings=query_embedding,
-            n_results=top_k,
-            include=["documents", "metadatas", "distances"]
-        )
+        results = await asyncio.to_thread(query_collection, query, top_k)
     except Exception:
         # Collection might be empty
         return []
@@ -426,15 +690,19 @@ async def search_documents(
     # Convert to SearchResult objects
     search_results = []
     
+    # New collections measure cosine distance (1 - similarity); ones
+    # created before that use squared L2, which for normalized vectors
+    # is 2 - 2 * similarity
+    cosine_space = (get_collection().metadata or {}).get("hnsw:space") == "cosine"
+    
     if results and results["ids"] and results["ids"][0]:
         for i, embedding_id in enumerate(results["ids"][0]):
             metadata = results["metadatas"][0][i]
             distance = results["distances"][0][i] if results["distances"] else 0
-            content = results["documents"][0][i] if results["documents"] else ""
             
-            # Convert distance to similarity (ChromaDB returns L2 distance)
+            # Convert distance to similarity
             # Lower distance = higher similarity
-            relevance_score = max(0, 1 - (distance / 2))
+            relevance_score = 1 - distance if cosine_space else 1 - (distance / 2)
             
             # Skip results below minimum relevance threshold
             if relevance_score < min_relevance:
@@ -444,7 +712,7 @@ async def search_documents(
                 chunk_id=i,
                 document_id=metadata.get("document_id", 0),
                 document_title=metadata.get("document_title", "Unknown"),
-                content_preview=content[:300] if content else "",
+                content_preview=metadata.get("preview", ""),
                 page_number=metadata.get("page_number"),
                 chapter=metadata.get("chapter"),
                 section=metadata.get("section"),
@@ -454,30 +722,105 @@ async def search_documents(
     return search_results
 
 
+async def filter_ready_results(
+    db: AsyncSession,
+    search_results: List[SearchResult]
+) -> List[SearchResult]:
+    """
+    Drop search results from documents that aren't "ready".
+    
+    Deleting, processing and failed documents are hidden from the
+    document list, so their chunks shouldn't be used either.
+    
+    Args:
+        db (AsyncSession): Database session
+        search_results (List[SearchResult]): Results from search_documents
+    
+    Returns:
+        List[SearchResult]: The results from ready documents, in order
+    """
+    if not search_results:
+        return search_results
+    
+    result = await db.execute(
+        select(Document.id).where(
+            Document.id.in_({r.document_id for r in search_results}),
+            Document.status == "ready"
+        )
+    )
+    ready_document_ids = set(result.scalars())
+    return [r for r in search_results if r.document_id in ready_document_ids]
+
+
+def delete_embeddings_for_documents(document_ids: List[int]) -> None:
+    """
+    Delete the ChromaDB embeddings of several documents in one call.
+    
+    Matches on the document_id metadata, so there's no need to look up
+    the embedding IDs first. Blocking; run it in a worker thread.
+    
+    Args:
+        document_ids (List[int]): IDs of the documents to remove
+    """
+    if document_ids:
+        get_collection().delete(where={"document_id": {"$in": document_ids}})
+
+
 async def delete_document_embeddings(document_id: int) -> None:
     """
     Delete all embeddings for a document from ChromaDB.
     
-    Called when a document is deleted.
-    
     Args:
         document_id (int): ID of the document to remove
     """
     try:
-        # Get all embedding IDs for this document
-        collection = get_collection()
-        results = collection.get(
-            where={"document_id": document_id},
-            include=[]
-        )
-        
-        if results and results["ids"]:
-            collection.delete(ids=results["ids"])
+        await asyncio.to_thread(delete_embeddings_for_documents, [document_id])
     except Exception:
         # Silently handle if embeddings don't exist
         pass
 
 
+async def purge_deleted_documents(db: AsyncSession, batch_size: int = 100) -> int:
+    """
+    Finish deleting documents that were marked with status "deleting".
+    
+    Deleting a document only marks it (so the API call doesn't wait on
+    the vector store); this removes the embeddings and the SQL rows in
+    batches, one ChromaDB call per batch. If the vector store is down,
+    the documents stay marked and are picked up by the next purge
+    (including the one at startup).
+    
+    Args:
+        db (AsyncSession): Database session
+        batch_size (int): Documents handled per vector store call
+    
+    Returns:
+        int: Number of documents purged
+    """
+    purged = 0
+    while True:
+        result = await db.execute(
+            select(Document.id)
+            .where(Document.status == "deleting")
+            .limit(batch_size)
+        )
+        document_ids = list(result.scalars())
+        if not document_ids:
+            return purged
+        
+        await asyncio.to_thread(delete_embeddings_for_documents, document_ids)
+        
+        # Chunks first (no database-level cascade on document_chunks)
+        await db.execute(
+            delete(DocumentChunk).where(DocumentChunk.document_id.in_(document_ids))
+        )
+        await db.execute(
+            delete(Document).where(Document.id.in_(document_ids))
+        )
+        await db.commit()
+        purged += len(document_ids)
+
+
 # =============================================================================
 # FOLDER-BASED DOCUMENT LOADING
 # =============================================================================
@@ -487,6 +830,92 @@ async def delete_document_embeddings(document_id: int) -> None:
 DOCUMENTS_FOLDER = "documents"
 
 
+# How many chunks scan_documents_folder collects before embedding them
+SCAN_EMBED_BATCH_CHUNKS = 2048
+
+# How many files scan_documents_folder extracts at the same time
+SCAN_CONCURRENT_FILES = 4
+
+
+async def _store_scanned_documents(
+    pending: List[tuple],
+    db: AsyncSession,
+    errors: List[str]
+) -> int:
+    """
+    Embed the chunks of several scanned files in one go and save them.
+    
+    Each file is saved and committed on its own, so one failure doesn't
+    lose the others.
+    
+    Args:
+        pending (List[tuple]): (filename, file_type, file_path, chunks) per file
+        db (AsyncSession): Database session
+        errors (List[str]): Error messages are appended here
+    
+    Returns:
+        int: Number of documents saved
+    """
+    all_contents = [chunk["content"] for *_, chunks in pending for chunk in chunks]
+    embeddings = None
+    
+    if all_contents:
+        try:
+            model = await asyncio.to_thread(get_embedding_model)
+            # One encode call for every file (it sorts by length internally,
+            # so short and long chunks are still batched efficiently)
+            embeddings = await asyncio.to_thread(
+                model.encode, all_contents, batch_size=64, normalize_embeddings=True
+            )
+        except Exception as e:
+            logger.exception("Embedding %d scanned documents failed", len(pending))
+            for filename, *_ in pending:
+                errors.append(f"Error processing {filename}: {str(e)}")
+            return 0
+    
+    stored = 0
+    offset = 0
+    
+    for filename, ext, file_path, chunks in pending:
+        document_embeddings = embeddings[offset:offset + len(chunks)] if chunks else []
+        offset += len(chunks)
+        
+        try:
+            # Create document record (system document - no user)
+            new_doc = Document(
+                filename=filename,
+                file_type=ext,
+                file_path=file_path,
+                title=filename.rsplit(".", 1)[0],  # Use filename as title
+            )
+            db.add(new_doc)
+            await db.flush()  # Get the ID
+            
+            chunk_count = 0
+            if chunks:
+                chunk_count = await store_document_chunks(
+                    document_id=new_doc.id,
+                    file_type=ext,
+                    chunks=chunks,
+                    embeddings=document_embeddings.tolist(),
+                    db=db
+                )
+            
+            new_doc.total_pages = chunk_count  # Store chunk count as pages
+            
+            await db.commit()
+            
+            logger.info("Processed: %s (%d chunks)", filename, chunk_count)
+            stored += 1
+            
+        except Exception as e:
+            await db.rollback()
+            logger.exception("Saving scanned document %s failed", filename)
+            errors.append(f"Error processing {filename}: {str(e)}")
+    
+    return stored
+
+
 async def scan_documents_folder(db: AsyncSession) -> dict:
     """
     Scan the documents folder and process any new files.
@@ -514,10 +943,9 @@ async def scan_documents_folder(db: AsyncSession) -> dict:
     # Ensure folder exists
     os.makedirs(DOCUMENTS_FOLDER, exist_ok=True)
     
-    allowed_extensions = settings.get_allowed_extensions_list()
+    allowed_extensions = settings.allowed_extensions
     
     new_count = 0
-    existing_count = 0
     errors = []
     
     # Get all files in documents folder
@@ -526,6 +954,7 @@ async def scan_documents_folder(db: AsyncSession) -> dict:
     except Exception as e:
         return {"new_count": 0, "existing_count": 0, "errors": [str(e)]}
     
+    candidates = []
     for filename in files:
         # Skip hidden files and directories
         if filename.startswith("."):
@@ -542,48 +971,52 @@ async def scan_documents_folder(db: AsyncSession) -> dict:
         if ext not in allowed_extensions:
             continue
         
-        # Check if already processed (by filename)
-        existing = await db.execute(
-            select(Document).where(Document.filename == filename)
+        candidates.append((filename, ext, file_path))
+    
+    # Check which are already processed (by filename), in one query
+    existing_result = await db.execute(
+        select(Document.filename).where(
+            Document.filename.in_([filename for filename, _, _ in candidates])
         )
-        if existing.scalar_one_or_none():
-            existing_count += 1
-            continue
-        
-        # Process new document
+    )
+    existing_filenames = set(existing_result.scalars().all())
+    existing_count = len(existing_filenames)
+    new_files = [c for c in candidates if c[0] not in existing_filenames]
+    
+    async def extract(filename: str, ext: str, file_path: str):
         try:
-            print(f"📄 Processing: {filename}")
-            
-            # Create document record (system document - no user)
-            new_doc = Document(
-                filename=filename,
-                file_type=ext,
-                file_path=file_path,
-                title=filename.rsplit(".", 1)[0],  # Use filename as title
-            )
-            db.add(new_doc)
-            await db.flush()  # Get the ID
-            
-            # Process for RAG
-            chunk_count = await process_document(
-                document_id=new_doc.id,
-                file_path=file_path,
-                file_type=ext,
-                db=db
-            )
-            
-            new_doc.total_pages = chunk_count  # Store chunk count as pages
-            
-            await db.commit()
-            
-            print(f"✅ Processed: {filename} ({chunk_count} chunks)")
-            new_count += 1
-            
+            logger.info("Processing: %s", filename)
+            return await extract_document_chunks(file_path=file_path, file_type=ext)
         except Exception as e:
-            await db.rollback()
-            error_msg = f"Error processing {filename}: {str(e)}"
-            print(f"❌ {error_msg}")
-            errors.append(error_msg)
+            logger.exception("Extracting scanned document %s failed", filename)
+            errors.append(f"Error processing {filename}: {str(e)}")
+            return None
+    
+    # New files are extracted and chunked a few at a time in parallel
+    # (the extractors run in threads / the extraction pool), then embedded
+    # together once SCAN_EMBED_BATCH_CHUNKS chunks are waiting, so a folder
+    # of many small files fills whole encode batches instead of one short
+    # call each. Saving stays sequential on the one session
+    pending = []
+    pending_chunks = 0
+    
+    for group_start in range(0, len(new_files), SCAN_CONCURRENT_FILES):
+        group = new_files[group_start:group_start + SCAN_CONCURRENT_FILES]
+        group_chunks = await asyncio.gather(*(extract(*file_info) for file_info in group))
+        
+        for (filename, ext, file_path), chunks in zip(group, group_chunks):
+            if chunks is None:
+                continue  # Extraction failed (already reported)
+            pending.append((filename, ext, file_path, chunks))
+            pending_chunks += len(chunks)
+        
+        if pending_chunks >= SCAN_EMBED_BATCH_CHUNKS:
+            new_count += await _store_scanned_documents(pending, db, errors)
+            pending = []
+            pending_chunks = 0
+    
+    if pending:
+        new_count += await _store_scanned_documents(pending, db, errors)
     
     return {
         "new_count": new_count,
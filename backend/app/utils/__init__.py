@@ -9,9 +9,15 @@ from app.utils.helpers import (
     truncate_text,
     generate_conversation_title
 )
+from app.utils.cache import TTLCache
+from app.utils.pdf import extract_pdf_pages, iter_pdf_pages, read_pdf_pages
 
 __all__ = [
     "sanitize_filename",
     "truncate_text",
     "generate_conversation_title",
+    "extract_pdf_pages",
+    "iter_pdf_pages",
+    "read_pdf_pages",
+    "TTLCache",
 ]
@@ -0,0 +1,108 @@
+"""
+Cache Helpers Module
+
+A small in-process cache with expiring entries, used for the per-process
+caches in the services and routers (authenticated users, profile
+settings, conversation lists, chat replies).
+"""
+
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    A size-bounded dict whose entries expire after a fixed time.
+    
+    Expired entries are dropped when they're looked up. When the cache
+    is full, the oldest entry is evicted (dicts keep insertion order).
+    Not shared between processes, so every worker has its own copy.
+    
+    Attributes:
+        ttl_seconds (float): Default lifetime of an entry
+        max_size (int): Maximum number of entries
+    
+    Example:
+        cache = TTLCache(ttl_seconds=60, max_size=1024)
+        cache.set("key", "value")
+        cache.get("key")  # "value" (None once expired)
+    """
+    
+    def __init__(self, ttl_seconds: float, max_size: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value.
+        
+        Args:
+            key (Hashable): The cache key
+            default (Any): Returned when the key is missing or expired
+        
+        Returns:
+            Any: The cached value, or default
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        
+        expires_at, value = entry
+        if expires_at > time.monotonic():
+            return value
+        
+        self._entries.pop(key, None)
+        return default
+    
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Cache a value.
+        
+        Args:
+            key (Hashable): The cache key
+            value (Any): The value to cache
+            ttl_seconds (float): Lifetime of this entry (default: the
+                cache's ttl_seconds); nothing is cached if it's not positive
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return
+        
+        # A replaced entry counts as new; evict the oldest entry when full
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.max_size:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + ttl, value)
+    
+    def pop(self, key: Hashable) -> None:
+        """
+        Drop an entry, if it's cached.
+        
+        Args:
+            key (Hashable): The cache key
+        """
+        self._entries.pop(key, None)
+    
+    def pop_where(self, predicate: Callable[[Any], bool]) -> None:
+        """
+        Drop every entry whose value matches.
+        
+        Args:
+            predicate (Callable): Called with each cached value
+        """
+        stale_keys = [
+            key for key, (_, value) in self._entries.items()
+            if predicate(value)
+        ]
+        for key in stale_keys:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """
+        Drop every entry.
+        """
+        self._entries.clear()
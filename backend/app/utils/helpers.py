@@ -6,9 +6,36 @@ Utility functions used throughout the application.
 
 import re
 import os
+import string
+from collections import Counter
 from typing import Optional
 
 
+# Characters sanitize_filename replaces (anything but \w, hyphens and dots)
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w\-.]')
+
+# ASCII-only version of the same rule, as a str.translate table
+_SAFE_FILENAME_CHARS = frozenset(string.ascii_letters + string.digits + "_-.")
+_ASCII_FILENAME_TABLE = {
+    code: "_" for code in range(128) if chr(code) not in _SAFE_FILENAME_CHARS
+}
+
+# Common words ignored by extract_keywords (stopwords)
+_STOPWORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to',
+    'for', 'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are',
+    'were', 'been', 'be', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'must',
+    'what', 'which', 'who', 'whom', 'this', 'that', 'these', 'those',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her',
+    'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their',
+    'can', 'how', 'why', 'when', 'where'
+})
+
+# Words of 3+ letters, as counted by extract_keywords
+_KEYWORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+
 def sanitize_filename(filename: str) -> str:
     """
     Sanitize a filename to remove potentially dangerous characters.
@@ -31,7 +58,11 @@ def sanitize_filename(filename: str) -> str:
     
     # Remove potentially dangerous characters
     # Keep alphanumeric, dots, hyphens, underscores
-    filename = re.sub(r'[^\w\-.]', '_', filename)
+    if filename.isascii():
+        filename = filename.translate(_ASCII_FILENAME_TABLE)
+    else:
+        # Non-ASCII letters count as alphanumeric too
+        filename = _UNSAFE_FILENAME_RE.sub('_', filename)
     
     # Remove leading dots (hidden files)
     filename = filename.lstrip('.')
@@ -148,32 +179,11 @@ def extract_keywords(
     Returns:
         list[str]: List of potential keywords
     """
-    # Common words to ignore (stopwords)
-    stopwords = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to',
-        'for', 'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are',
-        'were', 'been', 'be', 'have', 'has', 'had', 'do', 'does', 'did',
-        'will', 'would', 'could', 'should', 'may', 'might', 'must',
-        'what', 'which', 'who', 'whom', 'this', 'that', 'these', 'those',
-        'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her',
-        'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their',
-        'can', 'how', 'why', 'when', 'where'
-    }
-    
-    # Extract words
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-    
     # Filter out stopwords and count occurrences
-    word_counts = {}
-    for word in words:
-        if word not in stopwords:
-            word_counts[word] = word_counts.get(word, 0) + 1
-    
-    # Sort by frequency and return top keywords
-    sorted_words = sorted(
-        word_counts.items(),
-        key=lambda x: x[1],
-        reverse=True
+    word_counts = Counter(
+        word for word in _KEYWORD_RE.findall(text.lower())
+        if word not in _STOPWORDS
     )
     
-    return [word for word, count in sorted_words[:max_keywords]]
+    # Top keywords by frequency (ties keep first-seen order)
+    return [word for word, count in word_counts.most_common(max_keywords)]
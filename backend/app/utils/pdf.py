@@ -0,0 +1,85 @@
+"""
+PDF Helpers Module
+
+Page text extraction for PDFs.
+
+Kept apart from the services so the document extraction worker
+processes (see rag_service.start_extraction_pool) only import pypdf
+and this module, not the whole application.
+"""
+
+from typing import Iterator, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+
+def iter_pdf_pages(reader: "PdfReader", start: int, stop: int) -> Iterator[dict]:
+    """
+    Extract the text of a range of pages from an open PDF, one page at a time.
+    
+    Pages without any text are skipped.
+    
+    Args:
+        reader (PdfReader): The open PDF
+        start (int): First page index (0-based)
+        stop (int): Page index to stop before
+    
+    Yields:
+        dict: {page_number, text} (page numbers are 1-indexed)
+    """
+    for i in range(start, stop):
+        page_text = reader.pages[i].extract_text()
+        if page_text and page_text.strip():
+            yield {
+                "page_number": i + 1,  # 1-indexed
+                "text": page_text
+            }
+
+
+def read_pdf_pages(reader: "PdfReader", start: int, stop: int) -> List[dict]:
+    """
+    Extract the text of a range of pages from an open PDF.
+    
+    Same as iter_pdf_pages, but returns all the pages at once.
+    
+    Args:
+        reader (PdfReader): The open PDF
+        start (int): First page index (0-based)
+        stop (int): Page index to stop before
+    
+    Returns:
+        List[dict]: {page_number, text} dicts (page numbers are 1-indexed)
+    """
+    return list(iter_pdf_pages(reader, start, stop))
+
+
+def extract_pdf_pages(
+    file_path: str,
+    start: int = 0,
+    stop: Optional[int] = None
+) -> List[dict]:
+    """
+    Open a PDF and extract the text of a range of pages.
+    
+    Used as the task for the extraction worker processes, each of which
+    opens the file itself and handles its own range of pages.
+    
+    Args:
+        file_path (str): Path to the PDF file
+        start (int): First page index (0-based)
+        stop (int): Page index to stop before (default: the last page)
+    
+    Returns:
+        List[dict]: {page_number, text} dicts (page numbers are 1-indexed)
+    
+    Example:
+        pages = extract_pdf_pages("book.pdf", 0, 50)
+        # Returns: [{"page_number": 1, "text": "..."}, ...]
+    """
+    from pypdf import PdfReader
+    
+    reader = PdfReader(file_path)
+    if stop is None:
+        stop = len(reader.pages)
+    return read_pdf_pages(reader, start, stop)
@@ -0,0 +1,92 @@
+"""
+Alembic Migration Environment
+
+Runs schema migrations against the database configured in app.config.
+The database URL comes from settings (the .env file), not alembic.ini.
+
+Usage (from the backend directory):
+    alembic upgrade head                              # Apply all migrations
+    alembic revision --autogenerate -m "add column"   # Create a new migration
+"""
+
+import asyncio
+from logging.config import fileConfig
+
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from alembic import context
+
+from app.database import Base, get_database_url
+from app.models import load_all_models
+
+# Register every model on Base.metadata
+load_all_models()
+
+# Alembic Config object (gives access to values in alembic.ini)
+config = context.config
+
+# Set up Python logging from alembic.ini
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# Model metadata used for 'autogenerate' support
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """
+    Run migrations in 'offline' mode.
+    
+    Emits the SQL to stdout instead of executing it against a database.
+    Useful for reviewing migrations before applying them in production.
+    """
+    context.configure(
+        url=get_database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,  # SQLite needs batch mode for ALTER TABLE
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    """
+    Run migrations on an open (sync) connection.
+    
+    Args:
+        connection (Connection): Database connection
+    """
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,  # SQLite needs batch mode for ALTER TABLE
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    """
+    Run migrations in 'online' mode using the app's async driver.
+    """
+    connectable = create_async_engine(
+        get_database_url(),
+        poolclass=pool.NullPool,  # One-off connection, no pooling needed
+    )
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_async_migrations())
@@ -0,0 +1,42 @@
+"""Drop redundant primary key indexes
+
+SQLite and PostgreSQL already index primary keys, so the extra ix_<table>_id
+indexes only added write cost on every INSERT.
+
+Revision ID: 1581261571f7
+Revises: 1b1df1a48d6c
+Create Date: 2026-10-15 09:38:15.177022
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1581261571f7'
+down_revision: Union[str, None] = '1b1df1a48d6c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_chat_profiles_id', table_name='chat_profiles')
+    op.drop_index('ix_conversations_id', table_name='conversations')
+    op.drop_index('ix_document_chunks_id', table_name='document_chunks')
+    op.drop_index('ix_documents_id', table_name='documents')
+    op.drop_index('ix_message_feedback_id', table_name='message_feedback')
+    op.drop_index('ix_messages_id', table_name='messages')
+    op.drop_index('ix_training_questions_id', table_name='training_questions')
+    op.drop_index('ix_users_id', table_name='users')
+
+
+def downgrade() -> None:
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_training_questions_id', 'training_questions', ['id'], unique=False)
+    op.create_index('ix_messages_id', 'messages', ['id'], unique=False)
+    op.create_index('ix_message_feedback_id', 'message_feedback', ['id'], unique=False)
+    op.create_index('ix_documents_id', 'documents', ['id'], unique=False)
+    op.create_index('ix_document_chunks_id', 'document_chunks', ['id'], unique=False)
+    op.create_index('ix_conversations_id', 'conversations', ['id'], unique=False)
+    op.create_index('ix_chat_profiles_id', 'chat_profiles', ['id'], unique=False)
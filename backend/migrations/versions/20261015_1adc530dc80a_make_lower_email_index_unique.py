@@ -0,0 +1,59 @@
+"""Make lower email index unique
+
+Recreates ix_users_email_lower as a unique index, so the database
+enforces case-insensitive email uniqueness (the app already checks it
+at registration). On PostgreSQL it also INCLUDEs the columns
+get_current_user reads, letting that lookup be an index-only scan, and
+is built CONCURRENTLY so the users table stays writable meanwhile.
+Fails if existing rows differ only in email case; merge those first.
+
+Revision ID: 1adc530dc80a
+Revises: baa8f76fe34f
+Create Date: 2026-10-15 10:06:54.506421
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1adc530dc80a'
+down_revision: Union[str, None] = 'baa8f76fe34f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_email_lower',
+            table_name='users',
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_users_email_lower',
+            'users',
+            [sa.text('lower(email)')],
+            unique=True,
+            postgresql_include=['id', 'username', 'is_active'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_email_lower',
+            table_name='users',
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_users_email_lower',
+            'users',
+            [sa.text('lower(email)')],
+            unique=False,
+            postgresql_concurrently=True
+        )
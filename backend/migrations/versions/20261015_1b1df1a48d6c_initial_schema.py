@@ -0,0 +1,163 @@
+"""Initial schema
+
+Creates all tables as of the first Alembic revision. Databases created
+earlier by create_tables() can be marked current with: alembic stamp head
+
+Revision ID: 1b1df1a48d6c
+Revises: 
+Create Date: 2026-10-15 09:37:20.637437
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '1b1df1a48d6c'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('documents',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('author', sa.String(length=255), nullable=True),
+    sa.Column('file_type', sa.String(length=20), nullable=False),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('total_pages', sa.Integer(), nullable=True),
+    sa.Column('upload_date', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_documents'))
+    )
+    op.create_index(op.f('ix_documents_id'), 'documents', ['id'], unique=False)
+
+    op.create_table('training_questions',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('question_text', sa.Text(), nullable=False),
+    sa.Column('topic_category', sa.String(length=100), nullable=True),
+    sa.Column('difficulty_inferred', sa.String(length=20), nullable=True),
+    sa.Column('was_helpful', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_training_questions'))
+    )
+    op.create_index(op.f('ix_training_questions_id'), 'training_questions', ['id'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('username', sa.String(length=100), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_users'))
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+
+    op.create_table('chat_profiles',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('learning_style', sa.String(length=50), nullable=True),
+    sa.Column('difficulty_level', sa.String(length=20), nullable=True),
+    sa.Column('is_default', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_chat_profiles_user_id_users')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_chat_profiles'))
+    )
+    op.create_index(op.f('ix_chat_profiles_id'), 'chat_profiles', ['id'], unique=False)
+
+    op.create_table('conversations',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_conversations_user_id_users')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_conversations'))
+    )
+    op.create_index('ix_conv_user_updated', 'conversations', ['user_id', 'updated_at'], unique=False)
+    op.create_index(op.f('ix_conversations_id'), 'conversations', ['id'], unique=False)
+
+    op.create_table('document_chunks',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('chunk_index', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('page_number', sa.Integer(), nullable=True),
+    sa.Column('chapter', sa.String(length=255), nullable=True),
+    sa.Column('section', sa.String(length=255), nullable=True),
+    sa.Column('embedding_id', sa.String(length=100), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], name=op.f('fk_document_chunks_document_id_documents')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_document_chunks'))
+    )
+    op.create_index('ix_chunks_doc_order', 'document_chunks', ['document_id', 'chunk_index'], unique=False)
+    op.create_index(op.f('ix_document_chunks_embedding_id'), 'document_chunks', ['embedding_id'], unique=True)
+    op.create_index(op.f('ix_document_chunks_id'), 'document_chunks', ['id'], unique=False)
+
+    op.create_table('messages',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('conversation_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('is_voice', sa.Boolean(), nullable=True),
+    sa.Column('source_references', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=True),
+    sa.Column('avg_relevance_score', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], name=op.f('fk_messages_conversation_id_conversations')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_messages'))
+    )
+    op.create_index('ix_messages_conv_created', 'messages', ['conversation_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_messages_id'), 'messages', ['id'], unique=False)
+
+    op.create_table('message_feedback',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('message_id', sa.Integer(), nullable=False),
+    sa.Column('is_helpful', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['message_id'], ['messages.id'], name=op.f('fk_message_feedback_message_id_messages')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_message_feedback')),
+    sa.UniqueConstraint('message_id', name=op.f('uq_message_feedback_message_id'))
+    )
+    op.create_index(op.f('ix_message_feedback_id'), 'message_feedback', ['id'], unique=False)
+
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_message_feedback_id'), table_name='message_feedback')
+
+    op.drop_table('message_feedback')
+    op.drop_index(op.f('ix_messages_id'), table_name='messages')
+    op.drop_index('ix_messages_conv_created', table_name='messages')
+
+    op.drop_table('messages')
+    op.drop_index(op.f('ix_document_chunks_id'), table_name='document_chunks')
+    op.drop_index(op.f('ix_document_chunks_embedding_id'), table_name='document_chunks')
+    op.drop_index('ix_chunks_doc_order', table_name='document_chunks')
+
+    op.drop_table('document_chunks')
+    op.drop_index(op.f('ix_conversations_id'), table_name='conversations')
+    op.drop_index('ix_conv_user_updated', table_name='conversations')
+
+    op.drop_table('conversations')
+    op.drop_index(op.f('ix_chat_profiles_id'), table_name='chat_profiles')
+
+    op.drop_table('chat_profiles')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+
+    op.drop_table('users')
+    op.drop_index(op.f('ix_training_questions_id'), table_name='training_questions')
+
+    op.drop_table('training_questions')
+    op.drop_index(op.f('ix_documents_id'), table_name='documents')
+
+    op.drop_table('documents')
@@ -0,0 +1,40 @@
+"""Add document chunk count
+
+Stores the number of chunks on each document so listings don't have to
+count document_chunks with a join and GROUP BY. Existing rows are
+backfilled from the current chunk counts.
+
+Revision ID: 2603e9159186
+Revises: aea44129234c
+Create Date: 2026-10-15 09:55:50.384805
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2603e9159186'
+down_revision: Union[str, None] = 'aea44129234c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('chunk_count', sa.Integer(), server_default='0', nullable=False))
+    
+    # Backfill from the chunks that already exist
+    op.execute(
+        "UPDATE documents SET chunk_count = ("
+        "SELECT COUNT(*) FROM document_chunks "
+        "WHERE document_chunks.document_id = documents.id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_column('chunk_count')
+
@@ -0,0 +1,30 @@
+"""Add profile list index
+
+Composite index on chat_profiles(user_id, created_at) for the profile
+list, which filters by user and orders by created_at. The index is
+ascending; PostgreSQL scans it backwards for the DESC ordering.
+
+Revision ID: 7910e93247e0
+Revises: faa0e69ee31d
+Create Date: 2026-10-15 09:56:54.455172
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7910e93247e0'
+down_revision: Union[str, None] = 'faa0e69ee31d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_chat_profiles_user_created', 'chat_profiles', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_profiles_user_created', table_name='chat_profiles')
+
@@ -0,0 +1,32 @@
+"""Add document status
+
+Adds documents.status so uploads can report RAG processing progress.
+Existing rows are already processed, so they default to 'ready'.
+
+Revision ID: aea44129234c
+Revises: f1bb930168ba
+Create Date: 2026-10-15 09:55:02.369783
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'aea44129234c'
+down_revision: Union[str, None] = 'f1bb930168ba'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=20), server_default='ready', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_column('status')
+
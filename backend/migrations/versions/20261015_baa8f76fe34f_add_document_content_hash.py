@@ -0,0 +1,34 @@
+"""Add document content hash
+
+Adds documents.content_sha256 with a unique index so uploading the same
+file twice returns the existing document instead of re-embedding it.
+Existing rows stay NULL (NULLs don't conflict in a unique index).
+
+Revision ID: baa8f76fe34f
+Revises: 7910e93247e0
+Create Date: 2026-10-15 09:58:17.623816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'baa8f76fe34f'
+down_revision: Union[str, None] = '7910e93247e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_sha256', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_documents_content_sha256'), ['content_sha256'], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_documents_content_sha256'))
+        batch_op.drop_column('content_sha256')
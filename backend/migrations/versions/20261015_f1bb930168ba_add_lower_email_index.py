@@ -0,0 +1,35 @@
+"""Add lower email index
+
+Expression index on lower(email) for case-insensitive login and
+registration lookups. Alembic autogenerate doesn't detect expression
+indexes, so this one is written by hand.
+
+Revision ID: f1bb930168ba
+Revises: f81860dfb8aa
+Create Date: 2026-10-15 09:47:41.832442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1bb930168ba'
+down_revision: Union[str, None] = 'f81860dfb8aa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_users_email_lower',
+        'users',
+        [sa.text('lower(email)')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower', table_name='users')
@@ -0,0 +1,41 @@
+"""Cascade message deletes
+
+Adds ON DELETE CASCADE to messages.conversation_id and
+message_feedback.message_id so a conversation can be deleted with a
+single DELETE statement. Batch mode is needed to alter FKs on SQLite.
+
+Revision ID: f81860dfb8aa
+Revises: 1581261571f7
+Create Date: 2026-10-15 09:46:14.756952
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f81860dfb8aa'
+down_revision: Union[str, None] = '1581261571f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('message_feedback', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_message_feedback_message_id_messages', type_='foreignkey')
+        batch_op.create_foreign_key(batch_op.f('fk_message_feedback_message_id_messages'), 'messages', ['message_id'], ['id'], ondelete='CASCADE')
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_messages_conversation_id_conversations', type_='foreignkey')
+        batch_op.create_foreign_key(batch_op.f('fk_messages_conversation_id_conversations'), 'conversations', ['conversation_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_messages_conversation_id_conversations'), type_='foreignkey')
+        batch_op.create_foreign_key('fk_messages_conversation_id_conversations', 'conversations', ['conversation_id'], ['id'])
+
+    with op.batch_alter_table('message_feedback', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_message_feedback_message_id_messages'), type_='foreignkey')
+        batch_op.create_foreign_key('fk_message_feedback_message_id_messages', 'messages', ['message_id'], ['id'])
@@ -0,0 +1,30 @@
+"""Add default profile index
+
+Partial index on chat_profiles(user_id) WHERE is_default, used when
+clearing a user's previous default profile.
+
+Revision ID: faa0e69ee31d
+Revises: 2603e9159186
+Create Date: 2026-10-15 09:56:27.239468
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'faa0e69ee31d'
+down_revision: Union[str, None] = '2603e9159186'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_chat_profiles_user_default', 'chat_profiles', ['user_id'], unique=False, postgresql_where=sa.text('is_default'), sqlite_where=sa.text('is_default'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_profiles_user_default', table_name='chat_profiles')
+
@@ -0,0 +1,114 @@
+"""
+Shared Test Fixtures
+
+The app is configured through environment variables before it's
+imported: a throwaway SQLite database and upload folder, the cheapest
+bcrypt work factor and no Mistral API key. Tests that need the API
+install a fake one with the `mistral` fixture.
+
+Run from the backend folder: python -m pytest
+"""
+
+import os
+import tempfile
+
+_TEST_DIR = tempfile.mkdtemp(prefix="learning-bot-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_DIR, 'test.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(_TEST_DIR, "uploads")
+os.environ["SECRET_KEY"] = "test-secret-key"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["MISTRAL_API_KEY"] = ""
+
+from typing import Callable
+
+import httpx
+import pytest
+
+from app.database import Base, engine
+from app.main import app
+from app.models import load_all_models
+from app.routers import chat as chat_router
+from app.services import auth_service, llm_service
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty per-process caches."""
+    auth_service._user_cache.clear()
+    llm_service._profile_settings_cache.clear()
+    llm_service._response_cache.clear()
+    chat_router._conversation_list_cache.clear()
+
+
+@pytest.fixture
+async def client():
+    """
+    HTTP client for the app, on fresh database tables.
+
+    The lifespan isn't run (no process pools, embedding model or
+    document scan); the routes and the database are all these tests need.
+    """
+    load_all_models()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as test_client:
+        yield test_client
+
+    # Pooled connections belong to this test's event loop
+    await engine.dispose()
+
+
+@pytest.fixture
+async def auth_headers(client: httpx.AsyncClient) -> dict:
+    """Register and log in a user; returns the Authorization header."""
+    response = await client.post("/api/auth/register", json={
+        "email": "student@example.com",
+        "username": "student",
+        "password": "secret123"
+    })
+    assert response.status_code == 201, response.text
+
+    response = await client.post("/api/auth/login", data={
+        "username": "student@example.com",
+        "password": "secret123"
+    })
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(autouse=True)
+def no_document_search(monkeypatch):
+    """Chat turns find no documents (no vector store or embedding model)."""
+    async def search_documents(query, top_k=None, min_relevance=0.35):
+        return []
+
+    monkeypatch.setattr(chat_router, "search_documents", search_documents)
+
+
+@pytest.fixture
+def mistral(monkeypatch) -> Callable[[Callable[[httpx.Request], httpx.Response]], list]:
+    """
+    Fake the Mistral API.
+
+    Call the fixture with a handler (request -> response); it returns
+    the list the received requests are recorded in.
+
+    Example:
+        requests = mistral(lambda request: httpx.Response(200, json={...}))
+    """
+    def install(handler: Callable[[httpx.Request], httpx.Response]) -> list:
+        received = []
+
+        def record(request: httpx.Request) -> httpx.Response:
+            received.append(request)
+            return handler(request)
+
+        fake_client = httpx.AsyncClient(transport=httpx.MockTransport(record))
+        monkeypatch.setattr(llm_service.settings, "MISTRAL_API_KEY", "test-key")
+        monkeypatch.setattr(llm_service, "get_mistral_client", lambda: fake_client)
+        return received
+
+    return install
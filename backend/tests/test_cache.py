@@ -0,0 +1,118 @@
+"""Tests for the TTLCache helper."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch) -> SimpleNamespace:
+    """A monotonic clock the test moves by hand (clock.now)."""
+    fake_clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        cache_module,
+        "time",
+        SimpleNamespace(monotonic=lambda: fake_clock.now)
+    )
+    return fake_clock
+
+
+@pytest.mark.parametrize("elapsed, expected", [
+    (0, "value"),
+    (59.9, "value"),
+    (60, None),
+    (3600, None),
+])
+def test_entries_expire_after_ttl(clock, elapsed, expected):
+    cache = TTLCache(ttl_seconds=60, max_size=10)
+    cache.set("key", "value")
+
+    clock.now += elapsed
+
+    assert cache.get("key") == expected
+
+
+def test_expired_entry_is_dropped_on_lookup(clock):
+    cache = TTLCache(ttl_seconds=60, max_size=10)
+    cache.set("key", "value")
+
+    clock.now += 60
+
+    assert cache.get("key", "default") == "default"
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize("ttl_seconds, elapsed, expected", [
+    (5, 4, "value"),
+    (5, 5, None),
+    (120, 90, "value"),
+])
+def test_per_entry_ttl_overrides_default(clock, ttl_seconds, elapsed, expected):
+    cache = TTLCache(ttl_seconds=60, max_size=10)
+    cache.set("key", "value", ttl_seconds=ttl_seconds)
+
+    clock.now += elapsed
+
+    assert cache.get("key") == expected
+
+
+@pytest.mark.parametrize("ttl_seconds", [0, -1])
+def test_non_positive_ttl_is_not_cached(clock, ttl_seconds):
+    cache = TTLCache(ttl_seconds=60, max_size=10)
+    cache.set("key", "value", ttl_seconds=ttl_seconds)
+
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_oldest_entry_is_evicted_when_full(clock):
+    cache = TTLCache(ttl_seconds=60, max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get("c") == 3
+
+
+def test_replaced_entry_counts_as_new(clock):
+    cache = TTLCache(ttl_seconds=60, max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)  # "a" is now the newest, so "b" goes next
+    cache.set("c", 3)
+
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_pop_and_clear(clock):
+    cache = TTLCache(ttl_seconds=60, max_size=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.pop("a")
+    cache.pop("missing")  # No error for a missing key
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_pop_where_drops_matching_values(clock):
+    cache = TTLCache(ttl_seconds=60, max_size=10)
+    cache.set("token-1", SimpleNamespace(user_id=1))
+    cache.set("token-2", SimpleNamespace(user_id=2))
+    cache.set("token-3", SimpleNamespace(user_id=1))
+
+    cache.pop_where(lambda user: user.user_id == 1)
+
+    assert cache.get("token-1") is None
+    assert cache.get("token-3") is None
+    assert cache.get("token-2").user_id == 2
@@ -0,0 +1,225 @@
+"""Tests for the chat endpoints: feedback batches and the SSE stream."""
+
+from typing import List, Optional, Tuple
+
+import httpx
+import orjson
+import pytest
+
+
+def completion(text: str) -> httpx.Response:
+    """A non-streaming Mistral reply."""
+    return httpx.Response(200, json={"choices": [{"message": {"content": text}}]})
+
+
+def stream_body(*tokens: str, fail: bool = False):
+    """A streaming Mistral reply; raises a read error after the tokens if fail."""
+    async def body():
+        for token in tokens:
+            delta = orjson.dumps({"choices": [{"delta": {"content": token}}]})
+            yield b"data: " + delta + b"\n\n"
+        if fail:
+            raise httpx.ReadError("connection reset")
+        yield b"data: [DONE]\n\n"
+
+    return body()
+
+
+def parse_sse(text: str) -> List[Tuple[Optional[str], dict]]:
+    """Split an SSE body into (event, data) frames."""
+    frames = []
+    for block in text.split("\n\n"):
+        if not block:
+            continue
+        event = None
+        data = None
+        for line in block.split("\n"):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = orjson.loads(line[len("data: "):])
+        frames.append((event, data))
+    return frames
+
+
+async def get_messages(client, auth_headers, conversation_id: int) -> list:
+    response = await client.get(
+        f"/api/chat/conversations/{conversation_id}", headers=auth_headers
+    )
+    assert response.status_code == 200
+    return response.json()["messages"]
+
+
+# ====================
+# Feedback
+# ====================
+
+@pytest.fixture
+async def assistant_messages(client, auth_headers, mistral) -> Tuple[int, int, int]:
+    """Two chat turns; returns (first reply ID, second reply ID, a user message ID)."""
+    mistral(lambda request: completion("Have a look at chapter 2."))
+
+    response = await client.post(
+        "/api/chat/send", json={"message": "What is a cell?"}, headers=auth_headers
+    )
+    conversation_id = response.json()["conversation_id"]
+    await client.post(
+        "/api/chat/send",
+        json={"message": "And a tissue?", "conversation_id": conversation_id},
+        headers=auth_headers
+    )
+
+    messages = await get_messages(client, auth_headers, conversation_id)
+    replies = [m["id"] for m in messages if m["role"] == "assistant"]
+    questions = [m["id"] for m in messages if m["role"] == "user"]
+    return replies[0], replies[1], questions[0]
+
+
+async def test_feedback_batch_saves_every_rating(client, auth_headers, assistant_messages):
+    first, second, _ = assistant_messages
+
+    response = await client.post("/api/chat/feedback/batch", json={"items": [
+        {"message_id": first, "is_helpful": True},
+        {"message_id": second, "is_helpful": False},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 200
+    saved = {item["message_id"]: item["is_helpful"] for item in response.json()}
+    assert saved == {first: True, second: False}
+
+
+async def test_feedback_batch_last_rating_wins(client, auth_headers, assistant_messages):
+    first, _, _ = assistant_messages
+
+    response = await client.post("/api/chat/feedback/batch", json={"items": [
+        {"message_id": first, "is_helpful": True},
+        {"message_id": first, "is_helpful": False},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [(item["message_id"], item["is_helpful"]) for item in response.json()] == [(first, False)]
+
+
+async def test_feedback_batch_updates_existing_rating(client, auth_headers, assistant_messages):
+    first, _, _ = assistant_messages
+
+    for is_helpful in (True, False):
+        response = await client.post("/api/chat/feedback/batch", json={"items": [
+            {"message_id": first, "is_helpful": is_helpful},
+        ]}, headers=auth_headers)
+        assert response.status_code == 200
+
+    response = await client.post("/api/chat/feedback", json={
+        "message_id": first, "is_helpful": False
+    }, headers=auth_headers)
+    assert response.json()["is_helpful"] is False
+
+
+@pytest.mark.parametrize("bad_item, status_code", [
+    ("user_message", 400),
+    ("missing_message", 404),
+])
+async def test_feedback_batch_is_all_or_nothing(
+    client, auth_headers, assistant_messages, bad_item, status_code
+):
+    first, _, user_message = assistant_messages
+    bad_id = user_message if bad_item == "user_message" else 999_999
+
+    response = await client.post("/api/chat/feedback/batch", json={"items": [
+        {"message_id": first, "is_helpful": True},
+        {"message_id": bad_id, "is_helpful": True},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == status_code
+    response = await client.get("/api/chat/conversations", headers=auth_headers)
+    messages = await get_messages(client, auth_headers, response.json()[0]["id"])
+    assert all(m.get("feedback") is None for m in messages)
+
+
+@pytest.mark.parametrize("items", [[], [{"message_id": 1, "is_helpful": True}] * 101])
+async def test_feedback_batch_size_is_validated(client, auth_headers, items):
+    response = await client.post(
+        "/api/chat/feedback/batch", json={"items": items}, headers=auth_headers
+    )
+
+    assert response.status_code == 422
+
+
+# ====================
+# Streaming
+# ====================
+
+async def test_stream_sends_tokens_then_done(client, auth_headers, mistral):
+    mistral(lambda request: httpx.Response(200, content=stream_body("Look ", "in chapter 3.")))
+
+    response = await client.post(
+        "/api/chat/send/stream", json={"message": "What is osmosis?"}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = parse_sse(response.text)
+    assert frames[:2] == [(None, {"token": "Look "}), (None, {"token": "in chapter 3."})]
+    event, done = frames[2]
+    assert event == "done"
+    assert done["message"] == "Look in chapter 3."
+    assert done["topic_hint"] == "Osmosis"
+    assert len(frames) == 3
+
+    messages = await get_messages(client, auth_headers, done["conversation_id"])
+    assert [(m["role"], m["content"]) for m in messages] == [
+        ("user", "What is osmosis?"),
+        ("assistant", "Look in chapter 3."),
+    ]
+
+
+async def test_stream_failure_mid_reply_saves_partial_text(client, auth_headers, mistral):
+    mistral(lambda request: httpx.Response(200, content=stream_body("Look ", fail=True)))
+
+    response = await client.post(
+        "/api/chat/send/stream", json={"message": "What is osmosis?"}, headers=auth_headers
+    )
+
+    frames = parse_sse(response.text)
+    assert frames[0] == (None, {"token": "Look "})
+    event, error = frames[-1]
+    assert event == "error"
+    assert "detail" in error
+    assert all(event != "done" for event, _ in frames)
+
+    messages = await get_messages(client, auth_headers, error["conversation_id"])
+    assert [(m["role"], m["content"]) for m in messages] == [
+        ("user", "What is osmosis?"),
+        ("assistant", "Look "),
+    ]
+
+
+async def test_stream_failure_before_reply_discards_new_conversation(client, auth_headers, mistral):
+    mistral(lambda request: httpx.Response(503, content=b"{}"))
+
+    response = await client.post(
+        "/api/chat/send/stream", json={"message": "What is osmosis?"}, headers=auth_headers
+    )
+
+    frames = parse_sse(response.text)
+    assert len(frames) == 1
+    event, error = frames[0]
+    assert event == "error"
+    assert "conversation_id" not in error
+
+    response = await client.get("/api/chat/conversations", headers=auth_headers)
+    assert response.json() == []
+
+
+async def test_stream_replays_cached_reply_as_one_token(client, auth_headers, mistral):
+    received = mistral(lambda request: httpx.Response(200, content=stream_body("Look ", "here.")))
+
+    for _ in range(2):
+        response = await client.post(
+            "/api/chat/send/stream", json={"message": "What is osmosis?"}, headers=auth_headers
+        )
+        frames = parse_sse(response.text)
+
+    assert len(received) == 1
+    assert frames[0] == (None, {"token": "Look here."})
+    assert frames[-1][0] == "done"
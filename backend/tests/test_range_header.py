@@ -0,0 +1,49 @@
+"""Tests for Range header parsing on the document file download."""
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers.documents import parse_range_header
+
+FILE_SIZE = 5000
+
+
+@pytest.mark.parametrize("range_header, expected", [
+    ("bytes=0-1023", (0, 1023)),
+    ("bytes=100-100", (100, 100)),
+    ("bytes=4000-", (4000, 4999)),
+    ("bytes=-500", (4500, 4999)),
+    ("bytes=-9999", (0, 4999)),        # Suffix longer than the file
+    ("bytes=0-99999", (0, 4999)),      # End past the file is clamped
+    (" bytes = 10-20 ", (10, 20)),
+])
+def test_single_range(range_header, expected):
+    assert parse_range_header(range_header, FILE_SIZE) == expected
+
+
+@pytest.mark.parametrize("range_header", [
+    "items=0-10",          # Other unit
+    "bytes=0-10,20-30",    # Multiple ranges
+    "bytes=abc-",          # Not a number
+    "bytes=10-x",
+    "bytes=-",
+    "bytes=-0",            # Empty suffix
+    "bytes=20-10",         # Ends before it starts
+    "bytes",
+])
+def test_unsupported_or_malformed_range_serves_whole_file(range_header):
+    assert parse_range_header(range_header, FILE_SIZE) is None
+
+
+@pytest.mark.parametrize("range_header, file_size", [
+    ("bytes=5000-", 5000),
+    ("bytes=6000-7000", 5000),
+    ("bytes=0-", 0),
+    ("bytes=-10", 0),
+])
+def test_range_past_end_of_file_is_416(range_header, file_size):
+    with pytest.raises(HTTPException) as exc_info:
+        parse_range_header(range_header, file_size)
+
+    assert exc_info.value.status_code == 416
+    assert exc_info.value.headers["Content-Range"] == f"bytes */{file_size}"
@@ -0,0 +1,44 @@
+"""Tests for trimming the conversation history to the token budget."""
+
+import pytest
+
+from app.services.llm_service import trim_history
+
+
+def make_history(*token_counts: int) -> list:
+    """History whose messages use the given (estimated) token counts."""
+    return [
+        {
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"{i}".ljust(tokens * 4, ".")  # ~4 characters per token
+        }
+        for i, tokens in enumerate(token_counts)
+    ]
+
+
+@pytest.mark.parametrize("token_counts, max_tokens, kept", [
+    ((10, 10, 10), 30, 3),      # Exactly fits
+    ((10, 10, 10), 1000, 3),
+    ((10, 10, 10), 29, 2),      # Oldest message dropped first
+    ((10, 10, 10), 20, 2),
+    ((10, 10, 10), 10, 1),
+    ((10, 10, 10), 9, 0),       # Not even the newest message fits
+    ((50, 5, 5), 20, 2),        # One long old message
+    ((5, 50, 5), 20, 1),        # Stops at the first message that doesn't fit
+    ((), 100, 0),
+])
+def test_keeps_newest_messages_that_fit(token_counts, max_tokens, kept):
+    history = make_history(*token_counts)
+
+    trimmed = trim_history(history, max_tokens=max_tokens)
+
+    assert trimmed == history[len(history) - kept:]
+
+
+def test_default_budget_comes_from_settings(monkeypatch):
+    from app.services import llm_service
+
+    monkeypatch.setattr(llm_service.settings, "MAX_HISTORY_TOKENS", 15)
+    history = make_history(10, 10)
+
+    assert trim_history(history) == history[1:]
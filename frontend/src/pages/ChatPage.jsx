@@ -9,7 +9,7 @@ import { useState, useEffect, useRef } from 'react'
 import { useParams, useNavigate, useOutletContext } from 'react-router-dom'
 import { createPortal } from 'react-dom'
 import {
-  sendMessage,
+  sendMessageStream,
   getConversations,
   getConversation,
   deleteConversation
@@ -123,6 +123,7 @@ function ChatPage() {
   const [selectedProfileId, setSelectedProfileId] = useState(null)
   const [loading, setLoading] = useState(true)
   const [sending, setSending] = useState(false)
+  const [streamingMessageId, setStreamingMessageId] = useState(null)
   const [showProfileSelect, setShowProfileSelect] = useState(false)
   const [speakingMessageId, setSpeakingMessageId] = useState(null)
 
@@ -232,24 +233,53 @@ function ChatPage() {
     }
     setMessages(prev => [...prev, userMessage])
 
+    // The reply is shown as it streams in, then replaced by the final message
+    const assistantId = Date.now() + 1
+
+    /**
+     * Append a piece of the streamed reply to the assistant message
+     * 
+     * @param {string} token - Next piece of the reply
+     */
+    const handleToken = (token) => {
+      setStreamingMessageId(assistantId)
+      setMessages(prev => {
+        if (!prev.some(msg => msg.id === assistantId)) {
+          return [...prev, {
+            id: assistantId,
+            role: 'assistant',
+            content: token,
+            created_at: new Date().toISOString(),
+          }]
+        }
+        return prev.map(msg =>
+          msg.id === assistantId ? { ...msg, content: msg.content + token } : msg
+        )
+      })
+    }
+
     try {
-      const response = await sendMessage(
+      const response = await sendMessageStream(
         text,
         currentConversation?.id || null,
         selectedProfileId,
         isVoice,
-        images
+        images,
+        handleToken
       )
 
-      // Add assistant message
+      // Replace the streamed text with the final message (adds sources)
       const assistantMessage = {
-        id: Date.now() + 1,
+        id: assistantId,
         role: 'assistant',
         content: response.message,
         source_references: response.source_references,
         created_at: new Date().toISOString(),
       }
-      setMessages(prev => [...prev, assistantMessage])
+      setMessages(prev => [
+        ...prev.filter(msg => msg.id !== assistantId),
+        assistantMessage
+      ])
 
       // Update conversation
       if (!currentConversation) {
@@ -267,10 +297,23 @@ function ChatPage() {
       }
     } catch (error) {
       console.error('Failed to send message:', error)
-      // Remove the user message on error
-      setMessages(prev => prev.slice(0, -1))
+      if (error.conversationId) {
+        // The reply was cut off, but the question and the partial reply
+        // were saved - keep them on screen
+        if (!currentConversation) {
+          navigate(`/chat/${error.conversationId}`)
+          const newConversations = await getConversations()
+          setConversations(newConversations)
+        }
+      } else {
+        // Remove the user message (and any partial reply) on error
+        setMessages(prev => prev.filter(msg =>
+          msg.id !== userMessage.id && msg.id !== assistantId
+        ))
+      }
     } finally {
       setSending(false)
+      setStreamingMessageId(null)
     }
   }
 
@@ -433,8 +476,8 @@ function ChatPage() {
           ))
         )}
 
-        {/* Loading indicator */}
-        {sending && (
+        {/* Loading indicator (until the reply starts streaming in) */}
+        {sending && !streamingMessageId && (
           <div className="flex gap-3">
             <div className="w-8 h-8 bg-green-100 rounded-full flex items-center justify-center">
               <span className="text-green-600 text-sm">🤖</span>
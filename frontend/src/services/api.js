@@ -38,6 +38,21 @@ api.interceptors.request.use(
   }
 )
 
+/**
+ * Clear the stored token and send the user to the login page
+ * 
+ * Used for 401 responses (token expired/invalid), including requests
+ * made with fetch instead of this Axios instance.
+ */
+export function handleUnauthorized() {
+  localStorage.removeItem('token')
+
+  // Redirect to login if not already there
+  if (window.location.pathname !== '/login') {
+    window.location.href = '/login'
+  }
+}
+
 /**
  * Response interceptor
  * 
@@ -49,13 +64,7 @@ api.interceptors.response.use(
   (response) => response,
   (error) => {
     if (error.response?.status === 401) {
-      // Token expired or invalid
-      localStorage.removeItem('token')
-
-      // Redirect to login if not already there
-      if (window.location.pathname !== '/login') {
-        window.location.href = '/login'
-      }
+      handleUnauthorized()
     }
 
     return Promise.reject(error)
@@ -4,7 +4,7 @@
  * Functions for interacting with chat-related API endpoints.
  */
 
-import api from './api'
+import api, { handleUnauthorized } from './api'
 
 /**
  * Send a message and get a learning response
@@ -30,6 +30,100 @@ export async function sendMessage(message, conversationId = null, profileId = nu
   return response.data
 }
 
+/**
+ * Send a message and receive the reply as it is generated
+ * 
+ * Reads the Server-Sent Events stream from /chat/send/stream: each
+ * "message" event carries a piece of the reply, and the final "done"
+ * event carries the full ChatResponse (with source references).
+ * If the reply fails part way, an "error" event is sent instead of
+ * "done"; it's thrown as an Error whose conversationId is set when the
+ * partial reply was saved.
+ * Uses fetch because Axios can't read a response body incrementally.
+ * 
+ * @param {string} message - The user's question
+ * @param {number|null} conversationId - Existing conversation ID (optional)
+ * @param {number|null} profileId - Chat profile ID to use (optional)
+ * @param {boolean} isVoice - Whether this was voice input
+ * @param {Array<{base64: string, type: string}>} images - Array of images to send (optional)
+ * @param {Function} onToken - Called with each piece of the reply as it arrives
+ * @returns {Promise<Object>} The complete chat response
+ */
+export async function sendMessageStream(
+  message,
+  conversationId = null,
+  profileId = null,
+  isVoice = false,
+  images = [],
+  onToken = () => {}
+) {
+  const token = localStorage.getItem('token')
+  const response = await fetch('/api/chat/send/stream', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify({
+      message,
+      conversation_id: conversationId,
+      profile_id: profileId,
+      is_voice: isVoice,
+      images: images.map(img => ({
+        data: img.base64,  // Full data URL (data:image/jpeg;base64,...)
+        type: img.type     // MIME type
+      }))
+    }),
+  })
+
+  if (!response.ok) {
+    if (response.status === 401) {
+      handleUnauthorized()
+    }
+    throw new Error(`Chat request failed with status ${response.status}`)
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buffer = ''
+  let result = null
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += value
+
+    // Events are separated by a blank line
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+
+      let event = 'message'
+      let data = ''
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice('event: '.length)
+        else if (line.startsWith('data: ')) data += line.slice('data: '.length)
+      }
+
+      const payload = JSON.parse(data)
+      if (event === 'done') {
+        result = payload
+      } else if (event === 'error') {
+        const error = new Error(payload.detail || 'Chat stream failed')
+        error.conversationId = payload.conversation_id ?? null
+        throw error
+      } else {
+        onToken(payload.token)
+      }
+    }
+  }
+
+  if (!result) {
+    throw new Error('Chat stream ended before the response was complete')
+  }
+  return result
+}
+
 /**
  * Get all conversations for the current user
  * 
@@ -61,17 +155,60 @@ export async function deleteConversation(conversationId) {
   await api.delete(`/chat/conversations/${conversationId}`)
 }
 
+// Feedback clicks are collected briefly and sent as one batch request
+const FEEDBACK_FLUSH_DELAY_MS = 500
+const FEEDBACK_BATCH_LIMIT = 100  // Server-side maximum per batch
+let pendingFeedback = new Map()   // messageId -> { isHelpful, waiters }
+let feedbackTimer = null
+
+/**
+ * Send all pending feedback in one request and settle the waiting callers
+ */
+async function flushFeedback() {
+  const batch = pendingFeedback
+  pendingFeedback = new Map()
+  clearTimeout(feedbackTimer)
+  feedbackTimer = null
+
+  const items = [...batch].map(([messageId, entry]) => ({
+    message_id: messageId,
+    is_helpful: entry.isHelpful,
+  }))
+
+  try {
+    const response = await api.post('/chat/feedback/batch', { items })
+    const saved = new Map(response.data.map(item => [item.message_id, item]))
+    batch.forEach((entry, messageId) => {
+      entry.waiters.forEach(({ resolve }) => resolve(saved.get(messageId)))
+    })
+  } catch (error) {
+    batch.forEach(entry => {
+      entry.waiters.forEach(({ reject }) => reject(error))
+    })
+  }
+}
+
 /**
  * Submit feedback on a response
  * 
+ * Calls made within a short window are sent together in one batch
+ * request. If the same message is rated twice, the last rating wins.
+ * 
  * @param {number} messageId - Message ID to give feedback on
  * @param {boolean} isHelpful - True = thumbs up, False = thumbs down
  * @returns {Promise<Object>} Confirmation with feedback details
  */
-export async function submitFeedback(messageId, isHelpful) {
-  const response = await api.post('/chat/feedback', {
-    message_id: messageId,
-    is_helpful: isHelpful,
+export function submitFeedback(messageId, isHelpful) {
+  return new Promise((resolve, reject) => {
+    const entry = pendingFeedback.get(messageId) || { waiters: [] }
+    entry.isHelpful = isHelpful
+    entry.waiters.push({ resolve, reject })
+    pendingFeedback.set(messageId, entry)
+
+    if (pendingFeedback.size >= FEEDBACK_BATCH_LIMIT) {
+      flushFeedback()
+    } else if (!feedbackTimer) {
+      feedbackTimer = setTimeout(flushFeedback, FEEDBACK_FLUSH_DELAY_MS)
+    }
   })
-  return response.data
 }